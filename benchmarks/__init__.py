@@ -0,0 +1 @@
+"""Offline benchmarks for the pipeline stages, run on a synthetic corpus (see README)."""
@@ -0,0 +1,53 @@
+import argparse
+
+from .corpus import SEED, write_corpus
+from .suite import (DEFAULT_POSTS, LATENCY_SAMPLE, RESULTS_PATH, STAGES, TOLERANCE, load_results,
+                    report_regressions, run_suite, save_results)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmarks", description="Offline benchmarks of the pipeline stages.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("generate", help="Write a synthetic corpus modeled on the bundled data")
+    command.add_argument("--posts", type=int, default=DEFAULT_POSTS, help="Number of posts (e.g. 10000 to 1000000)")
+    command.add_argument("--seed", type=int, default=SEED)
+    command.add_argument("--output", required=True, help="Parquet file to write")
+
+    command = commands.add_parser("run", help="Benchmark the stages and save the results as JSON")
+    command.add_argument("--posts", type=int, default=DEFAULT_POSTS, help="Size of the synthetic corpus")
+    command.add_argument("--seed", type=int, default=SEED)
+    command.add_argument("--corpus", help="Benchmark this dataset instead of generating one")
+    command.add_argument("--stages", nargs="+", choices=list(STAGES),
+                         help="Only these stages (and the ones they read from)")
+    command.add_argument("--latency-sample", type=int, default=LATENCY_SAMPLE,
+                         help="Posts timed one by one for the p50/p99 latencies")
+    command.add_argument("--output", default=RESULTS_PATH, help="Where to write the results")
+    command.add_argument("--baseline", help="Earlier results to check for regressions")
+    command.add_argument("--tolerance", type=float, default=TOLERANCE,
+                         help="Allowed relative change before a stage counts as regressed (default 0.2)")
+
+    command = commands.add_parser("compare", help="Check saved results against a baseline")
+    command.add_argument("results")
+    command.add_argument("baseline")
+    command.add_argument("--tolerance", type=float, default=TOLERANCE)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "generate":
+        write_corpus(args.output, args.posts, args.seed)
+        return 0
+    if args.command == "compare":
+        return report_regressions(load_results(args.results), args.baseline, args.tolerance)
+
+    results = run_suite(args.posts, args.seed, args.corpus, args.stages, args.latency_sample)
+    save_results(results, args.output)
+    if args.baseline:
+        return report_regressions(results, args.baseline, args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,181 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from crisis_pipeline.paths import data_path
+
+SOURCE_PATH = data_path("reddit_mental_health_cleaned.csv")
+SEED = 42
+CHUNK_SIZE = 10000
+# Places the generated posts mention, with the coordinates the stub geocoder returns for them
+PLACES = {
+    "London": (51.5074, -0.1278), "Manchester": (53.4808, -2.2426), "Dublin": (53.3498, -6.2603),
+    "Paris": (48.8566, 2.3522), "Berlin": (52.52, 13.405), "Madrid": (40.4168, -3.7038),
+    "Toronto": (43.6532, -79.3832), "Vancouver": (49.2827, -123.1207), "Saskatchewan": (52.9399, -106.4509),
+    "New York": (40.7128, -74.006), "Chicago": (41.8781, -87.6298), "Cincinnati": (39.1031, -84.512),
+    "Texas": (31.9686, -99.9018), "California": (36.7783, -119.4179), "Florida": (27.6648, -81.5158),
+    "Mexico": (23.6345, -102.5528), "Argentina": (-38.4161, -63.6167), "Brazil": (-14.235, -51.9253),
+    "India": (20.5937, 78.9629), "Mumbai": (19.076, 72.8777), "Japan": (36.2048, 138.2529),
+    "Tokyo": (35.6762, 139.6503), "Manila": (14.5995, 120.9842), "Sydney": (-33.8688, 151.2093),
+    "Melbourne": (-37.8136, 144.9631), "Lagos": (6.5244, 3.3792), "Nairobi": (-1.2921, 36.8219),
+    "Germany": (51.1657, 10.4515), "France": (46.2276, 2.2137), "Ireland": (53.1424, -7.6921),
+    "Canada": (56.1304, -106.3468), "America": (37.0902, -95.7129), "Australia": (-25.2744, 133.7751),
+}
+PLACE_PREPOSITIONS = ["in", "from", "at"]
+URL_TEMPLATES = ["https://www.example.com/{}", "https://i.redd.it/{}.jpg", "www.example.org/{}"]
+URL_PATTERN = re.compile(r'(?:http\S+|www\S+)')
+EMOJI_PATTERN = re.compile('[☀-➿\U0001f300-\U0001faff]')
+
+
+class CorpusProfile:
+    """Distributions measured on a real dataset, which synthetic posts are drawn from.
+
+    Word counts, title lengths, subreddits, scores and comment counts are resampled as
+    observed. Body words are drawn from the dataset's word frequencies; emoji, URLs, risk
+    phrases (per Task 2 tier), place mentions and reposts are injected at the observed rates.
+    """
+
+    def __init__(self, path=SOURCE_PATH):
+        from crisis_pipeline.dedup import cluster_posts
+        from crisis_pipeline.storage import read_dataset
+        from crisis_pipeline.task2_sentiment_risk import get_risk_lexicon
+
+        posts = read_dataset(path)
+        content = posts['Content'].fillna('').astype(str)
+        title = posts['Title'].fillna('').astype(str)
+        body = [text[len(head):] if text.startswith(head) else text for text, head in zip(content, title)]
+
+        self.source = path
+        self.n_posts = len(posts)
+        self.body_words = np.array([len(text.split()) for text in body])
+        self.title_words = np.maximum(np.array([len(text.split()) for text in title]), 1)
+        self.subreddits = posts['Subreddit'].astype(str).to_numpy()
+        self.scores = posts['Score'].fillna(0).astype(np.int64).to_numpy()
+        self.comments = posts['Comments'].fillna(0).astype(np.int64).to_numpy()
+        timestamps = pd.to_datetime(posts['Timestamp'], errors='coerce').dropna()
+        self.time_range = (timestamps.min().timestamp(), timestamps.max().timestamp())
+
+        # Body vocabulary without the URLs and emoji, which are injected at their own rates
+        counts = pd.Series(' '.join(body).split()).value_counts()
+        keep = ~counts.index.str.contains(URL_PATTERN) & ~counts.index.str.contains(EMOJI_PATTERN)
+        counts = counts[keep]
+        self.vocabulary = counts.index.to_numpy(dtype=object)
+        self.word_weights = (counts / counts.sum()).to_numpy()
+        self.emoji = np.array(sorted(set(EMOJI_PATTERN.findall(' '.join(content)))) or ['\U0001f622'], dtype=object)
+
+        self.emoji_rate = content.str.contains(EMOJI_PATTERN).mean()
+        self.url_rate = content.str.contains(URL_PATTERN).mean()
+        place_pattern = re.compile(r'\b(?:' + '|'.join(re.escape(place) for place in PLACES) + r')\b')
+        self.place_rate = content.str.contains(place_pattern).mean()
+
+        # Share of posts in each risk tier, and the phrases that put a post there
+        risk_lexicon = get_risk_lexicon()
+        levels = content.map(risk_lexicon.classify).value_counts(normalize=True)
+        self.risk_phrases = {label: list(phrases) for label, _, phrases in risk_lexicon.tiers}
+        self.risk_rates = {label: float(levels.get(label, 0.0)) for label in self.risk_phrases}
+
+        cleaned = posts[['PostID', 'Content']].assign(Cleaned_Content=posts['Cleaned_Content'].fillna(''))
+        clusters = cluster_posts(cleaned)
+        self.repost_rate = 1.0 - clusters['Cluster_ID'].nunique() / max(len(posts), 1)
+
+    def summary(self):
+        """The measured rates, for the benchmark report."""
+        return {
+            'source': self.source,
+            'source_posts': int(self.n_posts),
+            'mean_body_words': round(float(self.body_words.mean()), 1),
+            'vocabulary': int(len(self.vocabulary)),
+            'emoji_rate': round(float(self.emoji_rate), 4),
+            'url_rate': round(float(self.url_rate), 4),
+            'place_rate': round(float(self.place_rate), 4),
+            'risk_rates': {label: round(rate, 4) for label, rate in self.risk_rates.items()},
+            'repost_rate': round(float(self.repost_rate), 4),
+        }
+
+
+def _insert(words, rng, token):
+    words.insert(int(rng.integers(0, len(words) + 1)), token)
+
+
+def generate_chunk(profile, rng, first_id, n):
+    """n synthetic posts in the raw Task 1 format (the columns written by fetch_posts)."""
+    body_lengths = rng.choice(profile.body_words, n)
+    title_lengths = rng.choice(profile.title_words, n)
+    words = rng.choice(profile.vocabulary, int(body_lengths.sum() + title_lengths.sum()), p=profile.word_weights)
+    ends = np.cumsum(body_lengths + title_lengths)
+
+    places = list(PLACES)
+    tiers = list(profile.risk_rates)
+    tier_p = np.array([profile.risk_rates[tier] for tier in tiers] + [1.0 - sum(profile.risk_rates.values())])
+    tier_of = rng.choice(len(tier_p), n, p=np.clip(tier_p, 0, None) / np.clip(tier_p, 0, None).sum())
+    has_emoji = rng.random(n) < profile.emoji_rate
+    has_url = rng.random(n) < profile.url_rate
+    has_place = rng.random(n) < profile.place_rate
+    is_repost = rng.random(n) < profile.repost_rate
+
+    post_ids = [np.base_repr(first_id + i, 36).lower() for i in range(n)]
+    subreddits = rng.choice(profile.subreddits, n)
+    created = rng.uniform(*profile.time_range, n).round()
+    titles, contents = [], []
+    for i in range(n):
+        start = ends[i - 1] if i else 0
+        title = ' '.join(words[start:start + title_lengths[i]])
+        body = list(words[start + title_lengths[i]:ends[i]])
+        if tier_of[i] < len(tiers):
+            _insert(body, rng, str(rng.choice(profile.risk_phrases[tiers[tier_of[i]]])))
+        if has_place[i]:
+            _insert(body, rng, f"{rng.choice(PLACE_PREPOSITIONS)} {rng.choice(places)}")
+        if has_url[i]:
+            _insert(body, rng, str(rng.choice(URL_TEMPLATES)).format(post_ids[i]))
+        if has_emoji[i]:
+            for _ in range(int(rng.integers(1, 4))):
+                _insert(body, rng, str(rng.choice(profile.emoji)))
+        content = title + ' ' + ' '.join(body)
+        if is_repost[i] and i:
+            # A repost copies an earlier post of the chunk, half the time with a word appended
+            source = int(rng.integers(0, i))
+            title, content = titles[source], contents[source]
+            if rng.random() < 0.5:
+                content += ' ' + str(rng.choice(profile.vocabulary))
+        titles.append(title)
+        contents.append(content)
+
+    return pd.DataFrame({
+        'PostID': post_ids,
+        'Timestamp': pd.to_datetime(created, unit='s'),
+        'Subreddit': subreddits,
+        'Title': titles,
+        'Content': contents,
+        'Score': rng.choice(profile.scores, n),
+        'Comments': rng.choice(profile.comments, n),
+        'URL': [f"https://www.reddit.com/r/{sub}/comments/{post_id}/" for sub, post_id in zip(subreddits, post_ids)],
+        'CreatedUTC': created,
+    })
+
+
+def generate_corpus(n_posts, seed=SEED, profile=None, chunk_size=CHUNK_SIZE):
+    """Yields the synthetic corpus in DataFrame chunks; the same seed always gives the same posts."""
+    profile = profile or CorpusProfile()
+    rng = np.random.default_rng(seed)
+    for first in range(0, n_posts, chunk_size):
+        yield generate_chunk(profile, rng, first, min(chunk_size, n_posts - first))
+
+
+def write_corpus(path, n_posts, seed=SEED, profile=None, chunk_size=CHUNK_SIZE):
+    """Writes a synthetic corpus of n_posts to a Parquet file, one chunk at a time."""
+    import pyarrow.parquet as pq
+    from crisis_pipeline.storage import to_table
+
+    writer = None
+    try:
+        for chunk in generate_corpus(n_posts, seed, profile, chunk_size):
+            table = to_table(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression='zstd')
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    print(f"Synthetic corpus of {n_posts} posts (seed {seed}) written to '{path}'.")
+    return path
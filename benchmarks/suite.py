@@ -0,0 +1,336 @@
+import datetime as dt
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from .corpus import PLACES, SEED, write_corpus
+
+DEFAULT_POSTS = 10000
+# Posts timed one by one for the p50/p99 latencies (the batch timing covers the whole corpus)
+LATENCY_SAMPLE = 1000
+# A stage regresses when its throughput drops, or its p99 latency or peak RSS grows, by more than this
+TOLERANCE = 0.2
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "latest.json")
+
+
+def peak_rss_mb():
+    """This process' peak resident set size in MB (None where the resource module is missing)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0), 1)
+
+
+def timed(function, items):
+    """Per-item wall-clock seconds of function(item), after one untimed call that loads any models."""
+    items = list(items)
+    if items:
+        function(items[0])
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        function(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def use_offline_backends(workdir):
+    """Points Task 3 at the stub geocoder (no gazetteer, no network) and returns the NER backend used.
+
+    The installed spaCy model is used when there is one; otherwise an entity ruler that tags
+    the corpus places as GPE stands in, so the NER fallback still runs without a download.
+    """
+    import spacy
+
+    from crisis_pipeline import task3_geolocation_mapping as task3
+    from crisis_pipeline.geocode_cache import GeocodeCache, StubGeocoder
+
+    task3.GAZETTEER_PATH = os.path.join(workdir, "no_gazetteer")
+    geocode_cache = GeocodeCache(StubGeocoder(PLACES), path=os.path.join(workdir, "geocode_cache.sqlite"), min_delay=0)
+    task3.get_geocode_cache = lambda: geocode_cache
+    if spacy.util.is_package(task3.SPACY_MODEL):
+        return task3.SPACY_MODEL
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("entity_ruler").add_patterns([{"label": "GPE", "pattern": place} for place in PLACES])
+    task3.get_nlp = functools.lru_cache(maxsize=None)(lambda: nlp)
+    return "entity_ruler"
+
+
+# Each stage reads its input from the work directory (written by an earlier stage, see STAGES),
+# times the batch call the pipeline makes, and times `sample` posts one by one where the
+# stage has a per-post function. Loading inputs and writing outputs are not timed.
+def bench_harvest(workdir, sample):
+    import pandas as pd
+    from crisis_pipeline.reddit_harvester import FakeReddit, FakeSubmission, harvest
+    from crisis_pipeline.storage import read_dataset
+    from crisis_pipeline.task1_extraction import SEARCH_QUERY
+
+    corpus = read_dataset(os.path.join(workdir, "corpus.parquet"))
+    if "CreatedUTC" not in corpus:
+        # Cleaned and analyzed datasets (e.g. the bundled CSVs) only keep the Timestamp, in UTC
+        if "Timestamp" not in corpus:
+            raise ValueError("the corpus has neither CreatedUTC nor Timestamp, which the harvest stage needs")
+        timestamps = pd.to_datetime(corpus["Timestamp"], errors="coerce")
+        corpus["CreatedUTC"] = ((timestamps - pd.Timestamp(0)).dt.total_seconds()).fillna(0)
+    posts_by_subreddit = {}
+    for post in corpus.itertuples():
+        posts_by_subreddit.setdefault(post.Subreddit, []).append(FakeSubmission(
+            post.PostID, post.CreatedUTC, post.Title, post.Content[len(post.Title) + 1:],
+            post.Score, post.Comments, post.URL))
+    reddit = FakeReddit(posts_by_subreddit)
+
+    start = time.perf_counter()
+    written = harvest(lambda: reddit, list(posts_by_subreddit), SEARCH_QUERY, None,
+                      os.path.join(workdir, "raw.csv"), state_path=os.path.join(workdir, "harvest_state.json"),
+                      rate=1e9)
+    return {"posts": written, "seconds": time.perf_counter() - start, "latencies": None}
+
+
+def bench_preprocess(workdir, sample):
+    from crisis_pipeline.storage import read_dataset, write_dataset
+    from crisis_pipeline.task1_extraction import clean_posts
+    from crisis_pipeline.text_normalizer import normalize_text
+
+    posts = read_dataset(os.path.join(workdir, "corpus.parquet"), columns=["PostID", "Content"])
+    latencies = timed(normalize_text, posts["Content"].head(sample))
+    start = time.perf_counter()
+    cleaned = clean_posts(posts)
+    seconds = time.perf_counter() - start
+    write_dataset(posts.join(cleaned), os.path.join(workdir, "cleaned.parquet"))
+    return {"posts": len(posts), "seconds": seconds, "latencies": latencies}
+
+
+def bench_dedup(workdir, sample):
+    from crisis_pipeline.dedup import cluster_posts
+    from crisis_pipeline.storage import read_dataset, write_dataset
+
+    posts = read_dataset(os.path.join(workdir, "cleaned.parquet"))
+    start = time.perf_counter()
+    clusters = cluster_posts(posts)
+    seconds = time.perf_counter() - start
+    write_dataset(posts[["PostID", "Content"]].join(clusters), os.path.join(workdir, "clusters.parquet"))
+    return {"posts": len(posts), "seconds": seconds, "latencies": None}
+
+
+def bench_sentiment(workdir, sample):
+    from crisis_pipeline.sentiment_engine import score_sentiment
+    from crisis_pipeline.storage import read_dataset
+    from crisis_pipeline.task2_sentiment_risk import SENTIMENT_WORKERS, get_sentiment
+
+    posts = read_dataset(os.path.join(workdir, "cleaned.parquet"), columns=["Cleaned_Content"])
+    texts = posts["Cleaned_Content"].fillna("")
+    latencies = timed(get_sentiment, texts.head(sample))
+    start = time.perf_counter()
+    score_sentiment(texts, n_workers=SENTIMENT_WORKERS)
+    return {"posts": len(posts), "seconds": time.perf_counter() - start, "latencies": latencies}
+
+
+def bench_risk(workdir, sample):
+    from crisis_pipeline.storage import read_dataset, write_dataset
+    from crisis_pipeline.task2_sentiment_risk import classify_risk, score_risk
+
+    posts = read_dataset(os.path.join(workdir, "corpus.parquet"), columns=["PostID", "Content"])
+    latencies = timed(classify_risk, posts["Content"].head(sample))
+    start = time.perf_counter()
+    risk = score_risk(posts)
+    seconds = time.perf_counter() - start
+    write_dataset(posts[["PostID"]].join(risk), os.path.join(workdir, "risk.parquet"))
+    return {"posts": len(posts), "seconds": seconds, "latencies": latencies}
+
+
+def bench_geolocate(workdir, sample):
+    from crisis_pipeline.dedup import fan_out, representatives
+    from crisis_pipeline.storage import read_dataset, write_dataset
+    from crisis_pipeline.task3_geolocation_mapping import GEOLOCATION_COLUMNS, extract_locations, geolocate_posts
+
+    posts = read_dataset(os.path.join(workdir, "clusters.parquet"))
+    latencies = timed(extract_locations, posts["Content"].head(sample))
+    # As in Task 3: one lookup per repost cluster, copied to the other members
+    start = time.perf_counter()
+    posts[GEOLOCATION_COLUMNS] = fan_out(posts, geolocate_posts(representatives(posts)))
+    seconds = time.perf_counter() - start
+    write_dataset(posts[["PostID"] + GEOLOCATION_COLUMNS], os.path.join(workdir, "geocoded.parquet"))
+    return {"posts": len(posts), "seconds": seconds, "latencies": latencies}
+
+
+def bench_binning(workdir, sample):
+    from crisis_pipeline.spatial_bins import aggregate_cells
+    from crisis_pipeline.storage import read_dataset
+
+    posts = read_dataset(os.path.join(workdir, "geocoded.parquet"))
+    posts = posts.join(read_dataset(os.path.join(workdir, "risk.parquet"), columns=["Risk_Level"]))
+    posts = posts.join(read_dataset(os.path.join(workdir, "corpus.parquet"), columns=["Timestamp"]))
+    start = time.perf_counter()
+    aggregate_cells(posts, time_slice="day")
+    return {"posts": len(posts), "seconds": time.perf_counter() - start, "latencies": None}
+
+
+# name -> (task, benchmark function, stages whose outputs it reads); listed in run order
+STAGES = {
+    "harvest": ("task1", bench_harvest, []),
+    "preprocess": ("task1", bench_preprocess, []),
+    "dedup": ("task1", bench_dedup, ["preprocess"]),
+    "sentiment": ("task2", bench_sentiment, ["preprocess"]),
+    "risk": ("task2", bench_risk, []),
+    "geolocate": ("task3", bench_geolocate, ["dedup"]),
+    "binning": ("task3", bench_binning, ["geolocate", "risk"]),
+}
+
+
+def with_dependencies(stages):
+    """The requested stages plus every stage they read from, in run order."""
+    needed = set()
+
+    def add(name):
+        if name not in needed:
+            needed.add(name)
+            for dependency in STAGES[name][2]:
+                add(dependency)
+
+    for name in stages:
+        if name not in STAGES:
+            raise ValueError(f"Unknown stage {name!r}; expected one of {tuple(STAGES)}")
+        add(name)
+    return [name for name in STAGES if name in needed]
+
+
+def run_stage(name, workdir, sample):
+    """Runs one stage benchmark; called in a fresh process so its peak RSS is the stage's own."""
+    from crisis_pipeline.live_monitor import percentiles
+
+    task, bench, _ = STAGES[name]
+    # Only Task 3 needs the stubs; loading spaCy elsewhere would inflate the other stages' RSS
+    ner_backend = use_offline_backends(workdir) if task == "task3" else None
+    result = bench(workdir, sample)
+    seconds = result["seconds"]
+    return {
+        "task": task,
+        "posts": int(result["posts"]),
+        "seconds": round(seconds, 3),
+        "posts_per_second": round(result["posts"] / seconds, 1) if seconds > 0 else None,
+        "latency_ms": percentiles(result["latencies"], points=(50, 99)) if result["latencies"] else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "ner_backend": ner_backend,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(n_posts=DEFAULT_POSTS, seed=SEED, corpus_path=None, stages=None, sample=LATENCY_SAMPLE, workdir=None):
+    """Benchmarks the stages on a synthetic corpus and returns the results (see README for the format)."""
+    from .corpus import CorpusProfile
+
+    with tempfile.TemporaryDirectory(prefix="crisis_bench_") as scratch:
+        workdir = workdir or scratch
+        os.makedirs(workdir, exist_ok=True)
+        profile = CorpusProfile()
+        corpus = os.path.join(workdir, "corpus.parquet")
+        start = time.perf_counter()
+        if corpus_path:
+            from crisis_pipeline.storage import read_dataset, write_dataset
+
+            write_dataset(read_dataset(corpus_path), corpus)
+        else:
+            write_corpus(corpus, n_posts, seed, profile)
+        generation_seconds = time.perf_counter() - start
+
+        results = {}
+        for name in with_dependencies(stages or list(STAGES)):
+            print(f"Benchmarking {name}...")
+            # A new interpreter per stage: models and peak memory do not carry over between stages
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                results[name] = executor.submit(run_stage, name, workdir, sample).result()
+            print(f"-> {name}: {format_stage(results[name])}")
+
+    return {
+        "meta": {
+            "created": dt.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "posts": next(iter(results.values()))["posts"] if results else n_posts,
+            "seed": None if corpus_path else seed,
+            "corpus": corpus_path or "synthetic",
+            "generation_seconds": round(generation_seconds, 3),
+            "latency_sample": sample,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "profile": profile.summary(),
+        },
+        "stages": results,
+    }
+
+
+def format_stage(stage):
+    latency = stage["latency_ms"] or {}
+    parts = [f"{stage['posts_per_second']} posts/s"]
+    if latency:
+        parts.append(f"p50 {latency['p50']} ms, p99 {latency['p99']} ms")
+    parts.append(f"peak RSS {stage['peak_rss_mb']} MB")
+    return ", ".join(parts)
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Regressions of `results` against `baseline`, as readable lines (empty if there are none)."""
+    regressions = []
+    for key in ("posts", "latency_sample"):
+        if results["meta"].get(key) != baseline["meta"].get(key):
+            print(f"Warning: {key} differs from the baseline "
+                  f"({results['meta'].get(key)} vs {baseline['meta'].get(key)}); numbers may not be comparable.")
+    for name, stage in results["stages"].items():
+        base = baseline["stages"].get(name)
+        if base is None:
+            continue
+        if stage["task"] == "task3" and stage.get("ner_backend") != base.get("ner_backend"):
+            print(f"Warning: {name} used NER backend {stage.get('ner_backend')}, the baseline {base.get('ner_backend')}.")
+        checks = [("posts/s", stage["posts_per_second"], base["posts_per_second"], -1),
+                  ("peak RSS MB", stage["peak_rss_mb"], base["peak_rss_mb"], 1)]
+        if stage["latency_ms"] and base["latency_ms"]:
+            checks.append(("p99 ms", stage["latency_ms"]["p99"], base["latency_ms"]["p99"], 1))
+        for label, value, reference, direction in checks:
+            if value is None or not reference:
+                continue
+            change = (value - reference) / reference
+            if change * direction > tolerance:
+                regressions.append(f"{name}: {label} {reference} -> {value} ({change:+.0%})")
+    return regressions
+
+
+def save_results(results, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to '{path}'.")
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def report_regressions(results, baseline_path, tolerance=TOLERANCE):
+    """Prints the comparison with a baseline file; returns the exit status (1 if anything regressed)."""
+    regressions = compare(results, load_results(baseline_path), tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {tolerance:.0%} against '{baseline_path}':")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"No regressions beyond {tolerance:.0%} against '{baseline_path}'.")
+    return 0
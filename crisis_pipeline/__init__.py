@@ -0,0 +1,6 @@
+"""Extraction, sentiment/risk scoring and geolocation of mental-health crisis posts.
+
+Importing the package or any of its modules has no side effects: models, NLTK data
+and plotting libraries are only loaded when first used. Run `python -m crisis_pipeline`
+for the command-line interface.
+"""
@@ -0,0 +1,191 @@
+import argparse
+
+from . import metrics
+from .paths import data_path, visualization_path
+
+# Task modules are imported by the command that needs them, so `--help` and
+# single-stage runs never pay for the other stages' dependencies.
+
+
+def extract(args):
+    from .task1_extraction import DEDUP_THRESHOLD, run
+
+    return run(harvest_mode=args.harvest, incremental=args.incremental, export_csv=args.export_csv,
+               dedup_threshold=args.dedup_threshold or DEDUP_THRESHOLD)
+
+
+def dedup(args):
+    from .dedup import DEFAULT_THRESHOLD, run
+
+    return run(threshold=args.dedup_threshold or DEFAULT_THRESHOLD)
+
+
+def analyze(args):
+    from .task2_sentiment_risk import run
+
+    return run(incremental=args.incremental, export_csv=args.export_csv)
+
+
+def binning(args):
+    """(bin_mode, bin_resolution, time_slice) from the heatmap options."""
+    if args.geohash_precision is not None:
+        return "geohash", args.geohash_precision, args.time_slice
+    return "grid", args.grid_degrees, args.time_slice
+
+
+def geolocate(args):
+    from .task3_geolocation_mapping import run
+
+    bin_mode, bin_resolution, time_slice = binning(args)
+    return run(incremental=args.incremental, export_csv=args.export_csv,
+               bin_mode=bin_mode, bin_resolution=bin_resolution, time_slice=time_slice)
+
+
+def run_all(args):
+    """Runs the three stages in one process, so every model is loaded at most once."""
+    if args.skip_extract:
+        print("Skipping extraction; using the existing cleaned dataset.")
+    elif extract(args) is None:
+        return None
+    analyze(args)
+    return geolocate(args)
+
+
+def stream(args):
+    from .stream_pipeline import run_stream
+
+    bin_mode, bin_resolution, time_slice = binning(args)
+    return run_stream(args.input, args.output, args.chunk_size, geolocate=not args.skip_geolocation,
+                      heatmap_path=args.heatmap, cells_path=args.cells, bin_mode=bin_mode,
+                      bin_resolution=bin_resolution, time_slice=time_slice, time_heatmap_path=args.time_heatmap)
+
+
+def monitor(args):
+    from .live_monitor import FileSink, RedditSource, ReplaySource, StdoutSink, WebhookSink, run
+
+    sinks = []
+    for spec in args.sink or ["stdout"]:
+        kind, _, target = spec.partition(":")
+        if kind == "stdout":
+            sinks.append(StdoutSink())
+        elif kind == "file":
+            sinks.append(FileSink(target or data_path("live_alerts.jsonl")))
+        elif kind == "webhook":
+            sinks.append(WebhookSink(target or None))
+        else:
+            raise SystemExit(f"Unknown sink {spec!r}; use stdout, file[:PATH] or webhook[:URL]")
+
+    if args.replay:
+        source = ReplaySource(args.replay, rate=args.rate, limit=args.limit)
+    else:
+        from .task1_extraction import SUBREDDITS, setup_reddit_api
+        source = RedditSource(setup_reddit_api, SUBREDDITS)
+    return run(source, sinks, geolocate=not args.skip_geolocation)
+
+
+def add_stage_options(parser):
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process posts that are new or changed since the last run")
+    parser.add_argument("--export-csv", action="store_true",
+                        help="Also write the output dataset as CSV")
+
+
+def add_dedup_options(parser):
+    parser.add_argument("--dedup-threshold", type=float,
+                        help="Similarity (0-1) above which posts are grouped as reposts (default 0.85)")
+
+
+def add_heatmap_options(parser):
+    cells = parser.add_mutually_exclusive_group()
+    cells.add_argument("--grid-degrees", type=float, help="Heatmap cell size in degrees (default 0.25)")
+    cells.add_argument("--geohash-precision", type=int, help="Use geohash cells of this length instead of a grid")
+    parser.add_argument("--time-slice", choices=["day", "week"],
+                        help="Also write an animated heatmap with one frame per day or week")
+
+
+def add_metrics_options(parser):
+    parser.add_argument("--report", help="Write a JSON run report (stage timings, counters, histograms) here")
+    parser.add_argument("--prometheus-textfile",
+                        help="Write the metrics in Prometheus text format here, e.g. for node_exporter's textfile collector")
+    parser.add_argument("--profile", action="append", metavar="STAGE[:MODE]",
+                        help=f"Profile a stage ({', '.join(metrics.STAGE_NAMES)}) with "
+                             "cprofile (default) or sample; repeatable. Output goes to data/profiles/")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="crisis_pipeline",
+                                     description="Extract, score and map mental-health crisis posts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("extract", help="Fetch and preprocess Reddit posts (Task 1)")
+    command.add_argument("--harvest", action="store_true",
+                         help="Fetch subreddits concurrently and append only new posts to the raw CSV")
+    add_stage_options(command)
+    add_dedup_options(command)
+    command.set_defaults(handler=extract)
+
+    command = commands.add_parser("dedup", help="Group reposts in the existing cleaned dataset")
+    add_dedup_options(command)
+    command.set_defaults(handler=dedup)
+
+    command = commands.add_parser("analyze", help="Sentiment and crisis risk classification (Task 2)")
+    add_stage_options(command)
+    command.set_defaults(handler=analyze)
+
+    command = commands.add_parser("geolocate", help="Extract, geocode and map post locations (Task 3)")
+    add_stage_options(command)
+    add_heatmap_options(command)
+    command.set_defaults(handler=geolocate)
+
+    command = commands.add_parser("run-all", help="Run extract, analyze and geolocate in sequence")
+    command.add_argument("--harvest", action="store_true", help="Use harvest mode for extraction")
+    command.add_argument("--skip-extract", action="store_true",
+                         help="Start from the existing cleaned dataset instead of fetching posts")
+    add_stage_options(command)
+    add_dedup_options(command)
+    add_heatmap_options(command)
+    command.set_defaults(handler=run_all)
+
+    command = commands.add_parser("stream", help="Run all stages chunk by chunk over a large archive")
+    command.add_argument("--input", default=data_path("reddit_mental_health_raw.csv"),
+                         help="Posts to process (CSV or Parquet)")
+    command.add_argument("--output", default=data_path("reddit_mental_health_geocoded.parquet"),
+                         help="Where to write results (CSV or Parquet)")
+    command.add_argument("--chunk-size", type=int, default=1000, help="Posts held in memory at a time")
+    command.add_argument("--skip-geolocation", action="store_true", help="Only preprocess and score posts")
+    command.add_argument("--heatmap", default=visualization_path("crisis_heatmap.html"), help="Heatmap output path")
+    command.add_argument("--cells", default=data_path("crisis_cells.parquet"), help="Heatmap cell table output path")
+    command.add_argument("--time-heatmap", help="Time-sliced heatmap output path (default: next to --heatmap, as *_time.html)")
+    add_heatmap_options(command)
+    command.set_defaults(handler=stream)
+
+    command = commands.add_parser("monitor", help="Score new submissions live and report High-Risk posts")
+    command.add_argument("--replay", help="Replay posts from a CSV/Parquet file instead of the Reddit stream")
+    command.add_argument("--rate", type=float, help="Replay speed in posts per second (default: as fast as possible)")
+    command.add_argument("--limit", type=int, help="Replay at most this many posts")
+    command.add_argument("--sink", action="append",
+                         help="Where alerts go: stdout, file[:PATH] or webhook[:URL] (repeatable; default stdout)")
+    command.add_argument("--skip-geolocation", action="store_true", help="Do not look up locations of flagged posts")
+    command.set_defaults(handler=monitor)
+
+    for command in commands.choices.values():
+        add_metrics_options(command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    for spec in args.profile or []:
+        stage, _, mode = spec.partition(":")
+        try:
+            metrics.enable_profiling(stage, mode or "cprofile")
+        except ValueError as e:
+            raise SystemExit(str(e))
+    try:
+        args.handler(args)
+    finally:
+        metrics.print_summary()
+        if args.report:
+            metrics.write_report(args.report)
+        if args.prometheus_textfile:
+            metrics.write_prometheus(args.prometheus_textfile)
@@ -0,0 +1,185 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+from .paths import data_path
+
+# Estimated Jaccard similarity of Cleaned_Content word shingles above which posts are reposts
+DEFAULT_THRESHOLD = 0.85
+NUM_PERM = 128
+SHINGLE_SIZE = 3  # words per shingle; shorter posts are only collapsed when identical
+# Shingles hashed per numpy batch; NUM_PERM x this many uint64s (4 MB) stays cache-friendly
+MINHASH_BATCH = 1 << 12
+SEED = 1
+# Chance that a pair exactly at the threshold never shares an LSH bucket
+MAX_FALSE_NEGATIVE = 0.01
+DEDUP_COLUMNS = ['Cluster_ID', 'Cluster_Size']
+INPUT_PATH = data_path("reddit_mental_health_cleaned.parquet")
+
+
+def lsh_params(threshold, num_perm=NUM_PERM, max_false_negative=MAX_FALSE_NEGATIVE):
+    """(bands, rows) with the most rows per band whose chance of never bucketing a pair
+    exactly at the threshold, (1 - threshold**rows)**bands, is at most max_false_negative.
+
+    More rows per band mean fewer candidate pairs; candidates are checked afterwards,
+    so erring towards extra candidates only costs time.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1.0 - threshold ** rows) ** bands <= max_false_negative:
+            best = (bands, rows)
+    return best
+
+
+def shingle_hashes(texts, shingle_size=SHINGLE_SIZE):
+    """Hashes of every run of shingle_size words, concatenated, plus each text's shingle count."""
+    token_cache = {}
+    hashes, lengths = [], []
+    for text in texts:
+        tokens = text.split()
+        lengths.append(len(tokens))
+        for token in tokens:
+            value = token_cache.get(token)
+            if value is None:
+                value = token_cache[token] = zlib.crc32(token.encode('utf-8'))
+            hashes.append(value)
+    tokens = np.array(hashes, dtype=np.uint64)
+    lengths = np.array(lengths, dtype=np.int64)
+    counts = np.maximum(lengths - shingle_size + 1, 0)
+    if not counts.sum():
+        return np.empty(0, dtype=np.uint64), counts
+
+    # Roll the token hashes into one hash per window, then keep windows that lie inside one text
+    doc_of_token = np.repeat(np.arange(len(lengths)), lengths)
+    n_windows = len(tokens) - shingle_size + 1
+    combined = tokens[:n_windows].copy()
+    for offset in range(1, shingle_size):
+        combined = (combined * np.uint64(0x01000193) + tokens[offset:offset + n_windows]) & np.uint64(0xFFFFFFFF)
+    inside = doc_of_token[:n_windows] == doc_of_token[shingle_size - 1:]
+    return combined[inside], counts
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=SEED):
+    """(signatures, has_signature): a num_perm MinHash row for every text with at least one shingle."""
+    shingles, counts = shingle_hashes(texts, shingle_size)
+    # Multiply-shift hashing: (a * x + b) mod 2**64, top 32 bits; a is odd
+    rng = np.random.default_rng(seed)
+    a = (rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) | np.uint64(1))[:, None]
+    b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)[:, None]
+
+    has_signature = counts > 0
+    counts = counts[has_signature]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    signatures = np.empty((len(counts), num_perm), dtype=np.uint32)
+    first = 0
+    while first < len(counts):
+        # Take whole texts until the batch holds MINHASH_BATCH shingles (always at least one text)
+        last = max(first + 1, int(np.searchsorted(starts, starts[first] + MINHASH_BATCH, side='right')))
+        lo, hi = starts[first], starts[last - 1] + counts[last - 1]
+        permuted = a * shingles[lo:hi]
+        permuted += b
+        permuted >>= np.uint64(32)
+        signatures[first:last] = np.minimum.reduceat(permuted, starts[first:last] - lo, axis=1).T
+        first = last
+    return signatures, has_signature
+
+
+def near_duplicate_pairs(signatures, threshold=DEFAULT_THRESHOLD):
+    """Index pairs that share an LSH bucket and whose estimated Jaccard similarity is >= threshold."""
+    bands, rows = lsh_params(threshold, signatures.shape[1])
+    pairs = []
+    for band in range(bands):
+        keys = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * rows))).ravel()
+        _, bucket = np.unique(keys, return_inverse=True)
+        # Pair every member of a bucket with every later member: members sit next to each
+        # other once sorted, so compare each position with the one `offset` places on
+        order = np.argsort(bucket, kind='stable')
+        sorted_buckets = bucket[order]
+        for offset in range(1, len(order)):
+            same = sorted_buckets[offset:] == sorted_buckets[:-offset]
+            if not same.any():
+                break
+            pairs.append(np.stack([order[:-offset][same], order[offset:][same]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.unique(np.concatenate(pairs), axis=0)
+    similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+    return pairs[similarity >= threshold]
+
+
+def cluster_posts(posts, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE):
+    """Cluster_ID (PostID of the cluster's first post, in dataset order) and Cluster_Size for every post.
+
+    Posts with identical non-empty Content are collapsed first; MinHash-LSH over
+    Cleaned_Content then joins near-identical reposts. Posts with no text stay on their own.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    content = posts['Content'].fillna('').astype(str).to_numpy()
+    cleaned = posts['Cleaned_Content'].fillna('').astype(str).to_numpy()
+    n = len(posts)
+
+    # Exact collapse: one node per distinct non-empty Content, every empty post its own node
+    codes, uniques = pd.factorize(content)
+    is_empty = content == ''
+    codes[is_empty] = len(uniques) + np.arange(is_empty.sum())
+    n_nodes = len(uniques) + is_empty.sum()
+    node_text = np.full(n_nodes, '', dtype=object)
+    node_text[codes] = cleaned
+
+    signatures, has_signature = minhash_signatures(node_text, num_perm, shingle_size)
+    signed_nodes = np.flatnonzero(has_signature)
+    pairs = signed_nodes[near_duplicate_pairs(signatures, threshold)] if len(signatures) else np.empty((0, 2), int)
+
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n_nodes, n_nodes))
+    _, node_cluster = connected_components(graph, directed=False)
+    cluster = node_cluster[codes]
+
+    # The earliest post in each cluster represents it
+    _, first_row, cluster_code, sizes = np.unique(cluster, return_index=True, return_inverse=True, return_counts=True)
+    post_ids = posts['PostID'].astype(str).to_numpy()
+    result = pd.DataFrame({
+        'Cluster_ID': post_ids[first_row][cluster_code],
+        'Cluster_Size': sizes[cluster_code].astype(np.int64),
+    }, index=posts.index)
+    exact = n - len(np.unique(codes))
+    near = len(np.unique(codes)) - len(sizes)
+    print(f"Dedup: {n} posts in {len(sizes)} clusters ({exact} exact copies, {near} near-duplicates).")
+    metrics.count("dedup_exact_copies", exact)
+    metrics.count("dedup_near_duplicates", near)
+    return result
+
+
+def representatives(df):
+    """The rows that are analyzed: one per cluster (every row if the data has no clusters)."""
+    if 'Cluster_ID' not in df:
+        return df
+    return df[df['PostID'].astype(str) == df['Cluster_ID'].astype(str)]
+
+
+def fan_out(df, results):
+    """Copies each representative's results (indexed like representatives(df)) to every member of its cluster."""
+    if 'Cluster_ID' not in df:
+        return results.reindex(df.index)
+    by_cluster = results.set_axis(df.loc[results.index, 'PostID'].astype(str))
+    expanded = by_cluster.reindex(df['Cluster_ID'].astype(str))
+    expanded.index = df.index
+    return expanded
+
+
+# --- Main Execution ---
+@metrics.instrumented_stage("dedup")
+def run(threshold=DEFAULT_THRESHOLD, path=INPUT_PATH):
+    """Adds (or refreshes) the cluster columns of an existing cleaned dataset."""
+    from .storage import extend_dataset, read_dataset
+
+    df = read_dataset(path, columns=['PostID', 'Content', 'Cleaned_Content'])
+    clusters = cluster_posts(df, threshold)
+    extend_dataset(path, path, clusters)
+    print(f"Cluster columns written to '{path}'.")
+    return clusters
@@ -0,0 +1,272 @@
+import json
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+from .paths import data_path
+from .result_store import content_hash
+from .text_normalizer import NORMALIZER_VERSION
+
+DEFAULT_STORE_DIR = data_path("feature_store")
+# Size of the hashing space; terms are never refitted, so new posts always land in the same columns
+N_FEATURES = 1 << 20
+FEATURE_VERSION = 1
+# Terms in fewer than MIN_DF posts or in more than MAX_DF of them are left out of top terms and rollups
+MIN_DF = 2
+MAX_DF = 0.95
+TOP_TERMS = 10
+SHARD_ARRAYS = ("indptr", "indices", "data")
+# Every file the store writes (shards are named shard-00000, shard-00001, ...); nothing else is ever deleted
+SHARD_FILE_SUFFIXES = tuple(f".{array}.npy" for array in SHARD_ARRAYS) + (".doc_freq.npy", ".posts.parquet", ".terms.parquet")
+MANIFEST_FILES = ("manifest.json", "manifest.json.tmp")
+
+
+def is_store_file(name):
+    return name in MANIFEST_FILES or (name.startswith("shard-") and name.endswith(SHARD_FILE_SUFFIXES))
+
+
+def hash_terms(texts, n_features=N_FEATURES):
+    """(CSR term-count matrix, {term: column}) for whitespace-tokenized texts such as Cleaned_Content."""
+    from scipy.sparse import csr_matrix
+
+    columns = {}
+    indices, indptr = [], [0]
+    for text in texts:
+        for term in text.split():
+            column = columns.get(term)
+            if column is None:
+                column = columns[term] = zlib.crc32(term.encode('utf-8')) % n_features
+            indices.append(column)
+        indptr.append(len(indices))
+    matrix = csr_matrix((np.ones(len(indices), dtype=np.float32), np.array(indices, dtype=np.int32),
+                         np.array(indptr, dtype=np.int64)), shape=(len(indptr) - 1, n_features))
+    matrix.sum_duplicates()  # one entry per (post, term) holding the count, with sorted columns
+    return matrix, columns
+
+
+class FeatureStore:
+    """Per-post term counts in a fixed hashing space, stored as append-only CSR shards.
+
+    Each append writes one shard (indptr/indices/data .npy files, memory-mapped on read)
+    plus its PostIDs and content hashes. Posts already stored with the same Cleaned_Content
+    are skipped; a changed post gets a new row and its old row stops counting.
+    """
+
+    def __init__(self, directory=DEFAULT_STORE_DIR, n_features=N_FEATURES):
+        self.directory = directory
+        self.n_features = n_features
+        self.config = {'feature_version': FEATURE_VERSION, 'n_features': n_features, 'hash': 'crc32',
+                       'source': 'Cleaned_Content', 'normalizer_version': NORMALIZER_VERSION}
+        self.manifest = self._load_manifest()
+        self._shards = {}
+        self._posts = None
+        self._doc_freq = None
+        self._terms = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load_manifest(self):
+        if os.path.exists(self._path("manifest.json")):
+            with open(self._path("manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get('config') == self.config:
+                return manifest
+            print(f"Feature store settings changed; rebuilding '{self.directory}'.")
+        return {'config': self.config, 'shards': [], 'n_posts': 0}
+
+    def _save_manifest(self):
+        tmp_path = self._path("manifest.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self._path("manifest.json"))
+
+    def __len__(self):
+        return len(self.posts())
+
+    def shard(self, name):
+        """One shard as a CSR matrix over memory-mapped arrays."""
+        from scipy.sparse import csr_matrix
+
+        if name not in self._shards:
+            indptr, indices, data = (np.load(self._path(f"{name}.{array}.npy"), mmap_mode='r') for array in SHARD_ARRAYS)
+            self._shards[name] = csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, self.n_features))
+        return self._shards[name]
+
+    def posts(self):
+        """The live rows: PostID (index), _content_hash, shard and row, one per stored post."""
+        if self._posts is None:
+            tables = [pd.read_parquet(self._path(f"{shard['name']}.posts.parquet")).assign(shard=shard['name'])
+                      for shard in self.manifest['shards']]
+            if tables:
+                posts = pd.concat(tables, ignore_index=True)
+                posts['row'] = posts.groupby('shard').cumcount()
+                # A post appended again (its text changed) is represented by its latest row
+                posts = posts.drop_duplicates('PostID', keep='last')
+            else:
+                posts = pd.DataFrame({'PostID': pd.Series(dtype=str), '_content_hash': pd.Series(dtype=str),
+                                      'shard': pd.Series(dtype=str), 'row': pd.Series(dtype=np.int64)})
+            self._posts = posts.set_index('PostID')
+        return self._posts
+
+    def doc_freq(self):
+        """Number of live posts containing each column."""
+        if self._doc_freq is None:
+            if self.manifest['shards']:
+                self._doc_freq = np.load(self._path(f"{self.manifest['shards'][-1]['name']}.doc_freq.npy"))
+            else:
+                self._doc_freq = np.zeros(self.n_features, dtype=np.int64)
+        return self._doc_freq
+
+    def terms(self):
+        """{column: term}, the first term seen in each column (used to label columns)."""
+        if self._terms is None:
+            self._terms = {}
+            for shard in self.manifest['shards']:
+                table = pd.read_parquet(self._path(f"{shard['name']}.terms.parquet"))
+                for column, term in zip(table['Column'].tolist(), table['Term']):
+                    self._terms.setdefault(column, term)
+        return self._terms
+
+    def append(self, posts):
+        """Adds features for posts (PostID, Cleaned_Content) that are new or whose text changed.
+
+        Returns the number of posts vectorized.
+        """
+        if not self.manifest['shards'] and os.path.isdir(self.directory):
+            # Start clean: shards from other settings (or an interrupted first run) are not reused
+            for name in os.listdir(self.directory):
+                if is_store_file(name):
+                    os.remove(self._path(name))
+        os.makedirs(self.directory, exist_ok=True)
+
+        texts = posts['Cleaned_Content'].fillna('').astype(str)
+        post_ids = posts['PostID'].astype(str)
+        hashes = pd.Series([content_hash(text) for text in texts], index=posts.index)
+        stored = self.posts()['_content_hash'].reindex(post_ids.to_numpy()).to_numpy()
+        pending = (stored != hashes.to_numpy()) & ~post_ids.duplicated(keep='last').to_numpy()
+        print(f"[features] Reusing {len(posts) - pending.sum()} stored posts; vectorizing {pending.sum()}.")
+        metrics.count("features_reused", int(len(posts) - pending.sum()))
+        if not pending.any():
+            return 0
+
+        matrix, columns = hash_terms(texts[pending], self.n_features)
+        doc_freq = self.doc_freq().copy()
+        # Rows being replaced no longer count towards the document frequencies
+        replaced = self.posts().reindex(post_ids[pending].to_numpy()).dropna(subset=['shard'])
+        for shard_name, rows in replaced.groupby('shard')['row']:
+            old = self.shard(shard_name)[rows.astype(np.int64).to_numpy()]
+            np.subtract.at(doc_freq, old.indices, 1)
+        doc_freq += np.bincount(matrix.indices, minlength=self.n_features)
+
+        name = f"shard-{len(self.manifest['shards']):05d}"
+        for array in SHARD_ARRAYS:
+            np.save(self._path(f"{name}.{array}.npy"), getattr(matrix, array))
+        pd.DataFrame({'PostID': post_ids[pending].to_numpy(), '_content_hash': hashes[pending].to_numpy()}).to_parquet(
+            self._path(f"{name}.posts.parquet"), index=False)
+        # Document frequencies as of this shard; only the newest copy is kept
+        np.save(self._path(f"{name}.doc_freq.npy"), doc_freq)
+        # Labels for the columns this shard is the first to use
+        terms = self.terms()
+        new_terms = {column: term for term, column in columns.items() if column not in terms}
+        pd.DataFrame({'Column': list(new_terms), 'Term': list(new_terms.values())}).to_parquet(
+            self._path(f"{name}.terms.parquet"), index=False)
+
+        # The manifest is written last, so an interrupted append leaves the store as it was
+        previous = self.manifest['shards'][-1]['name'] if self.manifest['shards'] else None
+        self.manifest['shards'].append({'name': name, 'rows': int(matrix.shape[0])})
+        self._posts = None
+        self._doc_freq = doc_freq
+        for column, term in new_terms.items():
+            terms.setdefault(column, term)
+        self.manifest['n_posts'] = len(self.posts())
+        self._save_manifest()
+        if previous is not None:
+            os.remove(self._path(f"{previous}.doc_freq.npy"))
+        metrics.count("features_vectorized", int(pending.sum()))
+        return int(pending.sum())
+
+    def matrix(self, post_ids):
+        """Term counts of the given posts (in that order) as one CSR matrix; unknown PostIDs raise KeyError."""
+        from scipy.sparse import vstack
+
+        rows = self.posts().loc[pd.Index(post_ids).astype(str)]
+        parts, order = [], []
+        for shard_name, group in rows.reset_index().groupby('shard', sort=False):
+            parts.append(self.shard(shard_name)[group['row'].to_numpy(dtype=np.int64)])
+            order.append(group.index.to_numpy())
+        if not parts:
+            from scipy.sparse import csr_matrix
+            return csr_matrix((0, self.n_features), dtype=np.float32)
+        stacked = vstack(parts, format='csr')
+        return stacked[np.argsort(np.concatenate(order), kind='stable')]
+
+    def iter_batches(self):
+        """Yields (PostIDs, CSR matrix) per shard, live rows only, without loading other shards."""
+        posts = self.posts().reset_index()
+        for shard_name, group in posts.groupby('shard', sort=False):
+            yield group['PostID'].to_numpy(), self.shard(shard_name)[group['row'].to_numpy(dtype=np.int64)]
+
+    def idf(self):
+        """Smoothed inverse document frequency per column (as in sklearn's TfidfTransformer)."""
+        n = len(self.posts())
+        return (np.log((1.0 + n) / (1.0 + self.doc_freq())) + 1.0).astype(np.float32)
+
+    def term_mask(self, min_df=MIN_DF, max_df=MAX_DF):
+        """Columns eligible for top terms and rollups: in at least min_df and at most max_df of the posts."""
+        doc_freq = self.doc_freq()
+        return (doc_freq >= min_df) & (doc_freq <= max_df * max(len(self.posts()), 1))
+
+    def top_terms(self, post_ids, n=TOP_TERMS, min_df=MIN_DF, max_df=MAX_DF):
+        """The n highest TF-IDF terms of each post, as a list of [(term, weight), ...] per PostID."""
+        weights = self.matrix(post_ids).multiply(self.idf() * self.term_mask(min_df, max_df)).tocsr()
+        weights.eliminate_zeros()
+        terms = self.terms()
+        result = []
+        for i in range(weights.shape[0]):
+            start, end = weights.indptr[i], weights.indptr[i + 1]
+            columns, values = weights.indices[start:end], weights.data[start:end]
+            best = np.argsort(-values, kind='stable')[:n]
+            result.append([(terms.get(int(columns[j]), f"#{columns[j]}"), round(float(values[j]), 4)) for j in best])
+        return result
+
+    def rollup(self, labels, n=TOP_TERMS, min_df=MIN_DF, max_df=MAX_DF):
+        """Top terms per group, e.g. per Subreddit or Risk_Level.
+
+        labels is a Series of group labels indexed by PostID; posts missing from the store are ignored.
+        Returns a DataFrame with Group, Rank, Term, Weight (summed TF-IDF) and Posts (group posts using the term).
+        """
+        from scipy.sparse import csr_matrix
+
+        labels = labels.dropna()
+        labels = labels[labels.index.astype(str).isin(self.posts().index)]
+        labels.index = labels.index.astype(str)
+        if labels.empty:
+            return pd.DataFrame(columns=['Group', 'Rank', 'Term', 'Weight', 'Posts'])
+
+        codes, groups = pd.factorize(labels.astype(str))
+        matrix = self.matrix(labels.index)
+        # One sparse product sums every group's rows at once
+        membership = csr_matrix((np.ones(len(codes), dtype=np.float32), (codes, np.arange(len(codes)))),
+                                shape=(len(groups), len(codes)))
+        eligible = self.term_mask(min_df, max_df)
+        totals = (membership @ matrix.multiply(self.idf() * eligible).tocsr()).tocsr()
+        # Ineligible terms are multiplied by 0 but stay as explicit entries; they must not be ranked
+        totals.eliminate_zeros()
+        presence = matrix.copy()
+        presence.data[:] = 1
+        posts_using = (membership @ presence).tocsr()
+
+        terms = self.terms()
+        rows = []
+        for g, group in enumerate(groups):
+            start, end = totals.indptr[g], totals.indptr[g + 1]
+            columns, values = totals.indices[start:end], totals.data[start:end]
+            for rank, j in enumerate(np.argsort(-values, kind='stable')[:n], start=1):
+                column = int(columns[j])
+                rows.append((group, rank, terms.get(column, f"#{column}"), round(float(values[j]), 4),
+                             int(posts_using[g, column])))
+        return pd.DataFrame(rows, columns=['Group', 'Rank', 'Term', 'Weight', 'Posts'])
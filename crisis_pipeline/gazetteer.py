@@ -0,0 +1,204 @@
+import csv
+import hashlib
+import os
+import sys
+import unicodedata
+
+import numpy as np
+
+from .geocode_cache import normalize_place
+from .paths import data_path
+
+# Built index directory (see build_index below); task3 also accepts a raw GeoNames dump here
+DEFAULT_GAZETTEER_PATH = data_path("gazetteer")
+# Tiny hamlets named "Hell" or "Love" are the main source of false positives, so skip them
+MIN_POPULATION = 1000
+# Short alternate names are mostly codes and abbreviations ("LA", "Bed") that collide with words
+MIN_ALIAS_LENGTH = 3
+# GeoNames feature classes kept: A = countries/states/regions, P = cities/villages
+FEATURE_CLASSES = {"A", "P"}
+
+# Arrays behind NameIndex, saved as {name}.npy
+NAME_INDEX_ARRAYS = ("key_hashes", "key_bytes", "key_starts", "row_starts", "rows")
+
+csv.field_size_limit(sys.maxsize)
+
+
+def fold_place(place):
+    """normalize_place plus accent folding, so "São Paulo" and "Sao Paulo" share a key."""
+    key = normalize_place(place)
+    return unicodedata.normalize("NFKD", key).encode("ascii", "ignore").decode("ascii") or key
+
+
+def key_hash(key):
+    """Stable 64-bit hash of a folded name (the sort order of NameIndex)."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class NameIndex:
+    """Read-only {folded name: row indices} mapping over flat arrays, so it can be memory-mapped.
+
+    Names are sorted by key_hash; a lookup binary-searches key_hashes and compares the
+    UTF-8 bytes of the few names sharing that hash (key_bytes[key_starts[i]:key_starts[i + 1]]).
+    Rows of name i are rows[row_starts[i]:row_starts[i + 1]].
+    """
+
+    def __init__(self, key_hashes, key_bytes, key_starts, row_starts, rows):
+        self.key_hashes = key_hashes
+        self.key_bytes = key_bytes
+        self.key_starts = key_starts
+        self.row_starts = row_starts
+        self.rows = rows
+
+    @classmethod
+    def from_dict(cls, keys):
+        items = sorted(keys.items(), key=lambda item: (key_hash(item[0]), item[0]))
+        encoded = [key.encode("utf-8") for key, _ in items]
+        return cls(
+            np.array([key_hash(key) for key, _ in items], dtype=np.uint64),
+            np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            np.concatenate([[0], np.cumsum([len(key) for key in encoded], dtype=np.int64)]),
+            np.concatenate([[0], np.cumsum([len(rows) for _, rows in items], dtype=np.int64)]),
+            np.array([row for _, rows in items for row in rows], dtype=np.int32),
+        )
+
+    def __len__(self):
+        return len(self.key_hashes)
+
+    def get(self, key, default=()):
+        """Row indices for a folded name, or default."""
+        digest = np.uint64(key_hash(key))
+        encoded = key.encode("utf-8")
+        start = np.searchsorted(self.key_hashes, digest, side="left")
+        end = np.searchsorted(self.key_hashes, digest, side="right")
+        for i in range(start, end):
+            if self.key_bytes[self.key_starts[i]:self.key_starts[i + 1]].tobytes() == encoded:
+                return tuple(int(row) for row in self.rows[self.row_starts[i]:self.row_starts[i + 1]])
+        return default
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in NAME_INDEX_ARRAYS}
+
+
+class Gazetteer:
+    """In-memory gazetteer built from a GeoNames dump.
+
+    Per-place data lives in flat numpy arrays; `keys` (a NameIndex) maps every normalized
+    name and alias to the row indices sharing it, most populous first.
+    """
+
+    def __init__(self, names, latitudes, longitudes, populations, country_codes, admin1_codes, keys):
+        self.names = names
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.populations = populations
+        self.country_codes = country_codes
+        self.admin1_codes = admin1_codes
+        self.keys = keys
+
+    def __len__(self):
+        return len(self.names)
+
+    def candidates(self, place):
+        """Row indices for a place name, most populous first."""
+        return self.keys.get(fold_place(place), ())
+
+    def lookup(self, place, country_code=None):
+        """Returns (lat, lon) of the most populous match, or None. Optionally restricted to a country."""
+        for row in self.candidates(place):
+            if country_code is None or self.country_codes[row] == country_code:
+                return round(float(self.latitudes[row]), 5), round(float(self.longitudes[row]), 5)
+        return None
+
+    def describe(self, row):
+        return {
+            "name": str(self.names[row]),
+            "latitude": float(self.latitudes[row]),
+            "longitude": float(self.longitudes[row]),
+            "population": int(self.populations[row]),
+            "country_code": str(self.country_codes[row]),
+            "admin1_code": str(self.admin1_codes[row]),
+        }
+
+    def save(self, directory):
+        """Writes the index as .npy files, all of which load() can memory-map."""
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            "names": self.names, "latitudes": self.latitudes, "longitudes": self.longitudes,
+            "populations": self.populations, "country_codes": self.country_codes,
+            "admin1_codes": self.admin1_codes, **self.keys.arrays(),
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        def read(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+
+        if not os.path.exists(os.path.join(directory, "key_hashes.npy")):
+            raise ValueError(f"{directory} was built by an older version; rebuild it with "
+                             "python -m crisis_pipeline.gazetteer DUMP OUTPUT_DIR")
+        keys = NameIndex(*(read(name) for name in NAME_INDEX_ARRAYS))
+        return cls(read("names"), read("latitudes"), read("longitudes"), read("populations"),
+                   read("country_codes"), read("admin1_codes"), keys)
+
+
+def build_index(dump_paths, min_population=MIN_POPULATION, feature_classes=FEATURE_CLASSES):
+    """Builds a Gazetteer from one or more GeoNames tab-separated dumps (e.g. cities15000.txt)."""
+    if isinstance(dump_paths, str):
+        dump_paths = [dump_paths]
+
+    names, latitudes, longitudes, populations, country_codes, admin1_codes = [], [], [], [], [], []
+    keys = {}
+    for dump_path in dump_paths:
+        with open(dump_path, encoding="utf-8", newline="") as f:
+            for fields in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+                if len(fields) < 15 or fields[6] not in feature_classes:
+                    continue
+                population = int(fields[14] or 0)
+                if population < min_population:
+                    continue
+                row = len(names)
+                names.append(fields[1])
+                latitudes.append(float(fields[4]))
+                longitudes.append(float(fields[5]))
+                populations.append(population)
+                country_codes.append(fields[8])
+                admin1_codes.append(fields[10])
+
+                aliases = [a for a in fields[3].split(",") if len(a) >= MIN_ALIAS_LENGTH]
+                for alias in {fold_place(n) for n in [fields[1], fields[2], *aliases]}:
+                    if alias:
+                        keys.setdefault(alias, []).append(row)
+
+    populations = np.array(populations, dtype=np.int64)
+    # Disambiguate shared names by population: the biggest place wins by default
+    keys = NameIndex.from_dict({key: sorted(rows, key=lambda r: -populations[r]) for key, rows in keys.items()})
+    return Gazetteer(
+        np.array(names, dtype=str),
+        np.array(latitudes, dtype=np.float32),
+        np.array(longitudes, dtype=np.float32),
+        populations,
+        np.array(country_codes, dtype="U2"),
+        np.array(admin1_codes, dtype=str),
+        keys,
+    )
+
+
+def load_gazetteer(path=DEFAULT_GAZETTEER_PATH):
+    """Loads a saved index directory, or builds one in memory from a raw dump file."""
+    if os.path.isdir(path):
+        return Gazetteer.load(path)
+    return build_index(path)
+
+
+# --- Main Execution ---
+if __name__ == "__main__":
+    # Usage: python -m crisis_pipeline.gazetteer cities15000.txt [more dumps...] data/gazetteer
+    if len(sys.argv) < 3:
+        print("Usage: python -m crisis_pipeline.gazetteer DUMP [DUMP ...] OUTPUT_DIR")
+        sys.exit(1)
+    gazetteer = build_index(sys.argv[1:-1])
+    gazetteer.save(sys.argv[-1])
+    print(f"Indexed {len(gazetteer)} places under {len(gazetteer.keys)} names in {sys.argv[-1]}.")
@@ -0,0 +1,151 @@
+import re
+import sqlite3
+import time
+from collections import namedtuple
+
+from . import metrics
+from .paths import data_path
+
+# Where resolved places are persisted between runs
+DEFAULT_CACHE_PATH = data_path("geocode_cache.sqlite")
+# Found places rarely move; misses are retried sooner in case the geocoder learns them
+POSITIVE_TTL_SECONDS = 90 * 24 * 3600
+NEGATIVE_TTL_SECONDS = 7 * 24 * 3600
+# Nominatim's usage policy allows at most one request per second
+MIN_DELAY_SECONDS = 1.0
+GEOCODE_TIMEOUT = 10
+
+GeoPoint = namedtuple("GeoPoint", ["latitude", "longitude"])
+
+
+def normalize_place(place):
+    """Normalizes a place string into a cache key: lowercase, trimmed, single-spaced."""
+    if not isinstance(place, str):
+        return ""
+    place = re.sub(r"\s+", " ", place.lower())
+    return place.strip(" .,;:!?'\"()")
+
+
+def is_timeout(error):
+    """True for geopy's GeocoderTimedOut and the socket/requests timeouts it may wrap."""
+    return isinstance(error, TimeoutError) or any(
+        "Timeout" in cls.__name__ or "TimedOut" in cls.__name__ for cls in type(error).__mro__)
+
+
+class StubGeocoder:
+    """Offline stand-in for a geopy geocoder, backed by a {place: (lat, lon)} dict."""
+
+    def __init__(self, places):
+        self.places = {normalize_place(k): v for k, v in places.items()}
+        self.calls = 0
+
+    def geocode(self, query, timeout=None):
+        self.calls += 1
+        coords = self.places.get(normalize_place(query))
+        return GeoPoint(*coords) if coords else None
+
+
+class GeocodeCache:
+    """On-disk geocode cache in front of a geopy-style geocoder.
+
+    Both found places and misses are stored (each with its own TTL), and every
+    normalized place string is resolved at most once per process.
+    """
+
+    def __init__(self, geocoder, path=DEFAULT_CACHE_PATH, positive_ttl=POSITIVE_TTL_SECONDS,
+                 negative_ttl=NEGATIVE_TTL_SECONDS, min_delay=MIN_DELAY_SECONDS, timeout=GEOCODE_TIMEOUT):
+        self.geocoder = geocoder
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.min_delay = min_delay
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.timeouts = 0  # included in errors
+        self._memo = {}  # key -> (lat, lon) or None, for this process
+        self._last_request = 0.0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            " place TEXT PRIMARY KEY, latitude REAL, longitude REAL,"
+            " found INTEGER NOT NULL, resolved_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def _read(self, key):
+        row = self.conn.execute(
+            "SELECT latitude, longitude, found, resolved_at FROM geocode WHERE place = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return False, None
+        latitude, longitude, found, resolved_at = row
+        ttl = self.positive_ttl if found else self.negative_ttl
+        if time.time() - resolved_at > ttl:
+            return False, None
+        return True, (latitude, longitude) if found else None
+
+    def _write(self, key, coords):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO geocode (place, latitude, longitude, found, resolved_at) VALUES (?, ?, ?, ?, ?)",
+            (key, coords[0] if coords else None, coords[1] if coords else None, int(coords is not None), time.time()),
+        )
+        self.conn.commit()
+
+    def _geocode(self, place):
+        """Queries the geocoder, spacing requests out by min_delay. Raises on geocoder errors."""
+        wait = self._last_request + self.min_delay - time.monotonic()
+        if wait > 0:
+            metrics.count("geocoder_throttle_seconds", wait)
+            time.sleep(wait)
+        start = time.perf_counter()
+        try:
+            geo = self.geocoder.geocode(place, timeout=self.timeout)
+        finally:
+            self._last_request = time.monotonic()
+            metrics.observe("geocoder_request_seconds", time.perf_counter() - start)
+        return (geo.latitude, geo.longitude) if geo else None
+
+    def lookup(self, place):
+        """Returns (lat, lon) for a place, or None if it cannot be geocoded."""
+        key = normalize_place(place)
+        if not key:
+            return None
+        if key in self._memo:
+            self.hits += 1
+            metrics.count("geocode_cache_hits", layer="memory")
+            return self._memo[key]
+        cached, coords = self._read(key)
+        if cached:
+            self.hits += 1
+            metrics.count("geocode_cache_hits", layer="disk")
+            self._memo[key] = coords
+            return coords
+
+        self.misses += 1
+        try:
+            coords = self._geocode(place)
+        except Exception as e:
+            # Timeouts and service errors are transient, so they are not stored as misses
+            outcome = "timeout" if is_timeout(e) else "error"
+            self.errors += 1
+            if outcome == "timeout":
+                self.timeouts += 1
+            metrics.count("geocoder_requests", outcome=outcome)
+            print(f"Geocoding {outcome} for {place}: {e}")
+            self._memo[key] = None
+            return None
+        metrics.count("geocoder_requests", outcome="found" if coords else "not_found")
+        self._write(key, coords)
+        self._memo[key] = coords
+        return coords
+
+    def lookup_many(self, places):
+        """Resolves each unique place once; returns {place: (lat, lon) or None}."""
+        return {place: self.lookup(place) for place in dict.fromkeys(p for p in places if p)}
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "timeouts": self.timeouts}
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,340 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import metrics
+from .reddit_harvester import post_to_record
+
+# Posts waiting to be scored; a full queue makes the source wait
+SCORE_QUEUE_SIZE = 1000
+# Flagged posts waiting for a location; when full, new posts skip the lookup instead of waiting
+GEO_QUEUE_SIZE = 100
+# PostIDs remembered for spotting repeats; the least recently seen are forgotten first
+SEEN_IDS_SIZE = 100000
+ALERT_LEVELS = ("High-Risk",)
+# Replay speed for local feeds (posts per second); None replays as fast as possible
+REPLAY_RATE = None
+
+
+class ReplaySource:
+    """Replays posts from a CSV or Parquet dataset as if they were arriving live."""
+
+    def __init__(self, path, rate=REPLAY_RATE, limit=None):
+        self.path = path
+        self.rate = rate
+        self.limit = limit
+
+    async def produce(self, submit):
+        from .storage import read_dataset
+
+        posts = read_dataset(self.path)
+        if self.limit is not None:
+            posts = posts.head(self.limit)
+        for record in posts.to_dict('records'):
+            await submit(record)
+            # Even at full speed, yield so posts are scored while the feed is still being read
+            await asyncio.sleep(1.0 / self.rate if self.rate else 0)
+
+
+class RedditSource:
+    """New submissions from PRAW's stream over all subreddits (one combined listing).
+
+    PRAW is blocking, so the stream runs in a daemon thread; it waits whenever the scoring queue is full.
+    """
+
+    def __init__(self, reddit_factory, subreddits):
+        self.reddit_factory = reddit_factory
+        self.subreddits = subreddits
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+    async def produce(self, submit):
+        loop = asyncio.get_running_loop()
+
+        def pump():
+            reddit = self.reddit_factory()
+            if reddit is None:
+                return
+            subreddit = reddit.subreddit("+".join(self.subreddits))
+            # pause_after=0 yields None whenever there is nothing new, so stop() is noticed
+            for post in subreddit.stream.submissions(skip_existing=True, pause_after=0):
+                if self.stopped.is_set():
+                    return
+                if post is not None:
+                    record = post_to_record(post, post.subreddit.display_name)
+                    asyncio.run_coroutine_threadsafe(submit(record), loop).result()
+
+        done = loop.create_future()
+
+        def pump_until_stopped():
+            try:
+                pump()
+            except Exception as e:
+                print(f"Reddit stream stopped: {e}")
+            finally:
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(lambda: done.done() or done.set_result(None))
+
+        threading.Thread(target=pump_until_stopped, daemon=True).start()
+        try:
+            await done
+        finally:
+            self.stop()
+
+
+class StdoutSink:
+    name = "stdout"
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    async def emit(self, event):
+        if event["event"] == "alert":
+            print(f"[ALERT {event['latency_ms']:.0f} ms] r/{event['Subreddit']} {event['PostID']} "
+                  f"{event['Risk_Level']} (score {event['Risk_Score']:g}): {event['Risk_Matches']}", file=self.stream)
+        else:
+            print(f"[LOCATION {event['latency_ms']:.0f} ms] {event['PostID']}: {event['Location']}", file=self.stream)
+
+    def close(self):
+        self.stream.flush()
+
+
+class FileSink:
+    """Appends every event as one JSON line."""
+
+    name = "file"
+
+    def __init__(self, path):
+        self.file = open(path, "a", encoding="utf-8")
+
+    async def emit(self, event):
+        self.file.write(json.dumps(event, default=str) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class WebhookSink:
+    """POSTs each event as JSON to `url`; without a url it only records the payloads (for testing)."""
+
+    name = "webhook"
+
+    def __init__(self, url=None, timeout=5):
+        self.url = url
+        self.timeout = timeout
+        self.sent = []
+
+    def _post(self, event):
+        import requests
+
+        requests.post(self.url, data=json.dumps(event, default=str),
+                      headers={"Content-Type": "application/json"}, timeout=self.timeout)
+
+    async def emit(self, event):
+        if self.url:
+            await asyncio.get_running_loop().run_in_executor(None, self._post, event)
+        else:
+            self.sent.append(event)
+
+    def close(self):
+        pass
+
+
+def score_post(record):
+    """Cleaned_Content, sentiment and risk for one post (the same models as Tasks 1 and 2)."""
+    from .risk_lexicon import format_matches
+    from .sentiment_engine import get_analyzer, label_sentiment
+    from .task2_sentiment_risk import get_risk_lexicon
+    from .text_normalizer import normalize_text
+
+    content = record.get("Content")
+    content = content if isinstance(content, str) else ""
+    cleaned = normalize_text(content)
+    compound = get_analyzer().polarity_scores(cleaned)["compound"]
+    level, score, matches = get_risk_lexicon().score(content)
+    return {
+        "Cleaned_Content": cleaned,
+        "Sentiment": str(label_sentiment(compound)),
+        "Sentiment_Compound": compound,
+        "Risk_Level": level,
+        "Risk_Score": score,
+        "Risk_Matches": format_matches(matches),
+    }
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """{'p50': ms, ...} for a list of latencies in seconds."""
+    if not samples:
+        return {}
+    values = np.percentile(np.array(samples) * 1000.0, points)
+    return {f"p{point}": round(float(value), 2) for point, value in zip(points, values)}
+
+
+class LiveMonitor:
+    """Scores posts as they arrive and reports flagged ones to the sinks.
+
+    source -> [score queue] -> scoring -> alert sinks
+                                      \\-> [geo queue, drops when full] -> location lookup -> sinks
+    Latency is measured from the moment a post is received to the moment its event is emitted.
+    A failing sink is counted in sink_failures and does not stop delivery to the others.
+    """
+
+    def __init__(self, source, sinks, geolocate=True, alert_levels=ALERT_LEVELS,
+                 score_queue_size=SCORE_QUEUE_SIZE, geo_queue_size=GEO_QUEUE_SIZE, seen_ids_size=SEEN_IDS_SIZE):
+        self.source = source
+        self.sinks = sinks
+        self.geolocate = geolocate
+        self.alert_levels = set(alert_levels)
+        self.score_queue = asyncio.Queue(maxsize=score_queue_size)
+        self.geo_queue = asyncio.Queue(maxsize=geo_queue_size)
+        self.event_queue = asyncio.Queue()  # alerts are never dropped
+        self.seen_ids = OrderedDict()
+        self.seen_ids_size = seen_ids_size
+        # Sinks of the same kind are told apart by their position
+        names = [getattr(sink, "name", type(sink).__name__) for sink in sinks]
+        self.sink_names = [name if names.count(name) == 1 else f"{name}_{i}" for i, name in enumerate(names)]
+        self.sink_failures = Counter()
+        self.counts = {"received": 0, "duplicates": 0, "scored": 0, "alerts": 0, "located": 0, "geo_skipped": 0}
+        self.score_latency = []
+        self.alert_latency = []
+        self.location_latency = []
+
+    async def submit(self, record):
+        self.counts["received"] += 1
+        post_id = record["PostID"]
+        if post_id in self.seen_ids:
+            self.seen_ids.move_to_end(post_id)
+            self.counts["duplicates"] += 1
+            return
+        self.seen_ids[post_id] = None
+        if len(self.seen_ids) > self.seen_ids_size:
+            self.seen_ids.popitem(last=False)
+        await self.score_queue.put((time.monotonic(), record))
+
+    async def score_worker(self):
+        while True:
+            received, record = await self.score_queue.get()
+            try:
+                record.update(score_post(record))
+                self.counts["scored"] += 1
+                self.score_latency.append(time.monotonic() - received)
+                if record["Risk_Level"] in self.alert_levels:
+                    self.counts["alerts"] += 1
+                    await self.event_queue.put(("alert", received, record))
+                    if self.geolocate:
+                        try:
+                            self.geo_queue.put_nowait((received, record))
+                        except asyncio.QueueFull:
+                            # A slow geocoder must not hold up scoring; the alert has already gone out
+                            self.counts["geo_skipped"] += 1
+            except Exception as e:
+                print(f"Could not score post {record.get('PostID')}: {e}")
+            finally:
+                self.score_queue.task_done()
+            # Let the sinks deliver alerts between posts instead of after the whole backlog
+            await asyncio.sleep(0)
+
+    async def geo_worker(self, executor):
+        from .task3_geolocation_mapping import extract_locations
+
+        loop = asyncio.get_running_loop()
+        while True:
+            received, record = await self.geo_queue.get()
+            try:
+                location, coords = await loop.run_in_executor(executor, extract_locations, record.get("Content"))
+                record["Location"] = location
+                record["Latitude"], record["Longitude"] = coords if coords else (None, None)
+                self.counts["located"] += 1
+                await self.event_queue.put(("location", received, record))
+            except Exception as e:
+                print(f"Could not geolocate post {record.get('PostID')}: {e}")
+            finally:
+                self.geo_queue.task_done()
+
+    async def event_worker(self):
+        while True:
+            kind, received, record = await self.event_queue.get()
+            try:
+                latency = time.monotonic() - received
+                (self.alert_latency if kind == "alert" else self.location_latency).append(latency)
+                event = self.event(kind, record, latency)
+                for name, sink in zip(self.sink_names, self.sinks):
+                    try:
+                        await sink.emit(event)
+                    except Exception as e:
+                        self.sink_failures[name] += 1
+                        print(f"Could not deliver {kind} for post {record.get('PostID')} to {name}: {e}")
+            finally:
+                self.event_queue.task_done()
+
+    @staticmethod
+    def event(kind, record, latency):
+        fields = ["PostID", "Subreddit", "Title", "URL", "Timestamp", "Sentiment", "Sentiment_Compound",
+                  "Risk_Level", "Risk_Score", "Risk_Matches"]
+        if kind == "location":
+            fields = ["PostID", "Subreddit", "Location", "Latitude", "Longitude"]
+        event = {"event": kind, **{field: record.get(field) for field in fields}}
+        event["latency_ms"] = latency * 1000.0
+        return event
+
+    def stats(self):
+        return {
+            **self.counts,
+            "sink_failures": dict(self.sink_failures),
+            "score_latency_ms": percentiles(self.score_latency),
+            "alert_latency_ms": percentiles(self.alert_latency),
+            "location_latency_ms": percentiles(self.location_latency),
+        }
+
+    async def run(self):
+        """Runs until the source is exhausted (or cancelled) and every queued post is handled."""
+        # One geocoding thread: spaCy and the geocode cache's SQLite connection stay on it
+        executor = ThreadPoolExecutor(max_workers=1)
+        # Load the scoring models before the first post arrives, so its latency is not the load time
+        score_post({"Content": "warm up"})
+        workers = [asyncio.create_task(self.score_worker()), asyncio.create_task(self.event_worker())]
+        if self.geolocate:
+            workers.append(asyncio.create_task(self.geo_worker(executor)))
+        try:
+            await self.source.produce(self.submit)
+            await self.score_queue.join()
+            await self.geo_queue.join()
+            await self.event_queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            executor.shutdown(wait=False)
+            for sink in self.sinks:
+                sink.close()
+        return self.stats()
+
+
+# --- Main Execution ---
+@metrics.instrumented_stage("monitor", posts=lambda stats: stats["scored"])
+def run(source, sinks, geolocate=True):
+    """Runs a LiveMonitor to completion and prints its counters and latency percentiles."""
+    monitor = LiveMonitor(source, sinks, geolocate=geolocate)
+    try:
+        stats = asyncio.run(monitor.run())
+    except KeyboardInterrupt:
+        stats = monitor.stats()
+    print(f"Monitor stats: {json.dumps(stats)}")
+    for name, value in monitor.counts.items():
+        metrics.count(f"monitor_{name}", value)
+    for name, failures in monitor.sink_failures.items():
+        metrics.count("monitor_sink_failures", failures, sink=name)
+    for kind, samples in [("score", monitor.score_latency), ("alert", monitor.alert_latency),
+                          ("location", monitor.location_latency)]:
+        for latency in samples:
+            metrics.observe("monitor_latency_seconds", latency, event=kind)
+    return stats
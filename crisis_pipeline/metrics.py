@@ -0,0 +1,350 @@
+import contextlib
+import datetime as dt
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from .paths import data_path
+
+METRIC_PREFIX = "crisis_pipeline"
+# Histogram upper bounds in seconds (geocoder requests are rate-limited to about one per second)
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROFILE_DIR = data_path("profiles")
+# Stages the commands run (see instrumented_stage); only these can be profiled
+STAGE_NAMES = ("extract", "dedup", "analyze", "geolocate", "stream", "monitor")
+PROFILE_MODES = ("cprofile", "sample")
+# Seconds between stack samples of the sampling profiler
+SAMPLE_INTERVAL = 0.005
+PROFILE_TOP = 25
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, observations <= bound) pairs, ending with +Inf, as Prometheus expects."""
+        total, pairs = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((bound, total))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+
+class SamplingProfiler:
+    """Records the profiled thread's call stack every `interval` seconds from a background thread.
+
+    Much cheaper than cProfile on long runs; the output is in the folded-stack format that
+    flamegraph tools read.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread_id = None
+        self.thread = None
+
+    def enable(self):
+        self.thread_id = threading.get_ident()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+        self.thread.start()
+
+    def disable(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def _sample(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top(self, n=PROFILE_TOP):
+        """The functions the most samples ended in, with their share of all samples."""
+        total = sum(self.stacks.values()) or 1
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [(function, round(count / total, 4)) for function, count in leaves.most_common(n)]
+
+
+def labels_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Metrics:
+    """Stage timings, step timers, counters and histograms collected during one run.
+
+    Every metric is labelled with the stage that was running when it was recorded, so the
+    same helper (e.g. geolocate_posts) reports under "geolocate" or "stream" as appropriate.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.stages = []
+        self.stage_stack = []
+        self.counters = {}
+        self.timers = {}
+        self.histograms = {}
+        self.profiled_stages = {}  # stage -> profile mode
+
+    def current_stage(self):
+        return self.stage_stack[-1]["stage"] if self.stage_stack else "none"
+
+    def count(self, name, amount=1, **labels):
+        key = (name, labels_key({"stage": self.current_stage(), **labels}))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, labels_key({"stage": self.current_stage(), **labels}))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def add_time(self, step, seconds):
+        key = (self.current_stage(), step)
+        with self.lock:
+            total, calls = self.timers.get(key, (0.0, 0))
+            self.timers[key] = (total + seconds, calls + 1)
+
+    @contextlib.contextmanager
+    def step(self, name):
+        """Times a sub-step of the current stage; repeated steps (e.g. per chunk) add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Times a stage and runs its profiler if one was requested; set record["posts"] inside."""
+        record = {"stage": name, "started": dt.datetime.now().isoformat(timespec="seconds"), "posts": None}
+        profiler = self._start_profiler(name)
+        self.stage_stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 3)
+            self.stage_stack.pop()
+            if profiler is not None:
+                record["profile"] = self._save_profile(name, profiler)
+            posts = record["posts"]
+            record["posts_per_second"] = round(posts / record["seconds"], 1) if posts and record["seconds"] else None
+            self.stages.append(record)
+
+    def enable_profiling(self, stage, mode="cprofile"):
+        if stage not in STAGE_NAMES:
+            raise ValueError(f"Unknown stage {stage!r}; expected one of {STAGE_NAMES}")
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}; expected one of {PROFILE_MODES}")
+        self.profiled_stages[stage] = mode
+
+    def _start_profiler(self, stage):
+        mode = self.profiled_stages.get(stage)
+        if mode is None:
+            return None
+        if mode == "cprofile":
+            import cProfile
+            profiler = cProfile.Profile()
+        else:
+            profiler = SamplingProfiler()
+        profiler.enable()
+        return profiler
+
+    def _save_profile(self, stage, profiler):
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if isinstance(profiler, SamplingProfiler):
+            path = os.path.join(PROFILE_DIR, f"{stage}.folded")
+            profiler.dump(path)
+            print(f"Sampled profile of '{stage}' saved to '{path}'.")
+            return {"mode": "sample", "path": path, "top": profiler.top()}
+
+        import io
+        import pstats
+
+        path = os.path.join(PROFILE_DIR, f"{stage}.prof")
+        profiler.dump_stats(path)
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        with open(path + ".txt", "w", encoding="utf-8") as f:
+            f.write(text.getvalue())
+        print(f"cProfile of '{stage}' saved to '{path}' (top functions in '{path}.txt').")
+        return {"mode": "cprofile", "path": path}
+
+    def report(self):
+        """Everything collected so far as a JSON-serializable dict."""
+        with self.lock:
+            steps = {}
+            for (stage, step), (seconds, calls) in sorted(self.timers.items()):
+                steps.setdefault(stage, {})[step] = {"seconds": round(seconds, 3), "calls": calls}
+            return {
+                "started": dt.datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "finished": dt.datetime.now().isoformat(timespec="seconds"),
+                "stages": [{**record, "steps": steps.get(record["stage"], {})} for record in self.stages],
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                "histograms": [{"name": name, "labels": dict(labels), "sum": round(h.sum, 6), "count": h.count,
+                                "buckets": {str(bound): count for bound, count in h.cumulative()}}
+                               for (name, labels), h in sorted(self.histograms.items())],
+            }
+
+    def prometheus(self):
+        """The metrics in the Prometheus text exposition format."""
+        report = self.report()
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            if not samples:
+                return
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{METRIC_PREFIX}_{name}{suffix}{format_labels(labels)} {format_value(value)}")
+
+        family("stage_duration_seconds", "gauge", "Wall-clock duration of each stage in this run.",
+               [("", {"stage": r["stage"]}, r["seconds"]) for r in report["stages"]])
+        family("stage_posts", "gauge", "Posts handled by each stage in this run.",
+               [("", {"stage": r["stage"]}, r["posts"]) for r in report["stages"] if r["posts"] is not None])
+        family("stage_posts_per_second", "gauge", "Throughput of each stage in this run.",
+               [("", {"stage": r["stage"]}, r["posts_per_second"]) for r in report["stages"]
+                if r["posts_per_second"] is not None])
+        family("step_duration_seconds", "gauge", "Time spent in each sub-step of a stage.",
+               [("", {"stage": stage, "step": step}, timing["seconds"])
+                for r in report["stages"] for stage in [r["stage"]] for step, timing in r["steps"].items()])
+        for name in sorted({counter["name"] for counter in report["counters"]}):
+            family(f"{name}_total", "counter", f"Count of {name.replace('_', ' ')}.",
+                   [("", c["labels"], c["value"]) for c in report["counters"] if c["name"] == name])
+        for name in sorted({histogram["name"] for histogram in report["histograms"]}):
+            samples = []
+            for h in (h for h in report["histograms"] if h["name"] == name):
+                samples += [("_bucket", {**h["labels"], "le": bound}, count) for bound, count in h["buckets"].items()]
+                samples += [("_sum", h["labels"], h["sum"]), ("_count", h["labels"], h["count"])]
+            family(name, "histogram", f"Distribution of {name.replace('_', ' ')}.", samples)
+        family("last_run_timestamp_seconds", "gauge", "Unix time at which the run finished.",
+               [("", {}, round(time.time(), 3))])
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """One line per stage with its time, throughput and slowest steps."""
+        report = self.report()
+        lines = []
+        for record in report["stages"]:
+            rate = f", {record['posts_per_second']} posts/s" if record["posts_per_second"] else ""
+            steps = sorted(record["steps"].items(), key=lambda item: -item[1]["seconds"])[:4]
+            detail = ", ".join(f"{step} {timing['seconds']:.2f}s" for step, timing in steps)
+            lines.append(f"{record['stage']}: {record['seconds']:.2f}s{rate}" + (f" ({detail})" if detail else ""))
+        return lines
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+def format_value(value):
+    if value is None:
+        return "NaN"
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def write_atomic(path, text):
+    """Writes via a temporary file, so a scraper never reads a half-written file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# The metrics of this process' run; the helpers below record into it
+METRICS = Metrics()
+
+
+def count(name, amount=1, **labels):
+    METRICS.count(name, amount, **labels)
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    METRICS.observe(name, value, buckets, **labels)
+
+
+def step(name):
+    return METRICS.step(name)
+
+
+def stage(name):
+    return METRICS.stage(name)
+
+
+def instrumented_stage(name, posts=len):
+    """Decorator: runs the function as stage `name`; posts(result) gives the stage's post count."""
+    if name not in STAGE_NAMES:
+        raise ValueError(f"Stage {name!r} is missing from STAGE_NAMES")
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name) as record:
+                result = function(*args, **kwargs)
+                record["posts"] = posts(result) if result is not None else 0
+                return result
+        return wrapper
+    return decorator
+
+
+def enable_profiling(stage_name, mode="cprofile"):
+    METRICS.enable_profiling(stage_name, mode)
+
+
+def write_report(path):
+    write_atomic(path, json.dumps(METRICS.report(), indent=2, default=str))
+    print(f"Run report saved to '{path}'.")
+
+
+def write_prometheus(path):
+    write_atomic(path, METRICS.prometheus())
+    print(f"Prometheus metrics saved to '{path}'.")
+
+
+def print_summary():
+    lines = METRICS.summary()
+    if lines:
+        print("\nStage timings:")
+        for line in lines:
+            print(f"  {line}")
@@ -0,0 +1,19 @@
+import os
+
+# Repository root; data and plots live next to the package, whatever the working directory.
+# An installed package has no checkout around it, so it uses the working directory instead.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if not os.path.exists(os.path.join(ROOT_DIR, "pyproject.toml")):
+    ROOT_DIR = os.getcwd()
+DATA_DIR = os.environ.get("CRISIS_PIPELINE_DATA_DIR", os.path.join(ROOT_DIR, "data"))
+VISUALIZATION_DIR = os.environ.get("CRISIS_PIPELINE_VISUALIZATION_DIR", os.path.join(ROOT_DIR, "visualizations"))
+# Reddit credentials module (see README); environment variables take precedence
+CONFIG_PATH = os.path.join(ROOT_DIR, "scripts", "config.py")
+
+
+def data_path(*parts):
+    return os.path.join(DATA_DIR, *parts)
+
+
+def visualization_path(*parts):
+    return os.path.join(VISUALIZATION_DIR, *parts)
@@ -0,0 +1,215 @@
+import csv
+import datetime as dt
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+from .paths import data_path
+
+DEFAULT_STATE_PATH = data_path("harvest_state.json")
+# Reddit allows roughly 100 requests/minute for OAuth clients; stay a little below that
+REQUESTS_PER_SECOND = 1.5
+BURST = 5
+MAX_WORKERS = 4
+# Posts appended to disk per checkpoint
+CHECKPOINT_BATCH_SIZE = 200
+# PRAW fetches listings 100 items per request, so take one token per page
+PAGE_SIZE = 100
+
+FIELDNAMES = ["PostID", "Timestamp", "Subreddit", "Title", "Content", "Score", "Comments", "URL", "CreatedUTC"]
+
+
+def post_to_record(post, sub_name):
+    """Converts a PRAW submission into the row format used by task1."""
+    return {
+        "PostID": post.id,
+        "Timestamp": dt.datetime.utcfromtimestamp(post.created_utc),
+        "Subreddit": sub_name,
+        "Title": post.title,
+        # Combine title and body text for full content
+        "Content": post.title + " " + post.selftext,
+        "Score": post.score,  # Reddit's upvotes/downvotes score
+        "Comments": post.num_comments,
+        "URL": post.url,
+        "CreatedUTC": post.created_utc,
+    }
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CheckpointWriter:
+    """Appends records to a CSV in batches, skipping PostIDs already on disk or seen this run."""
+
+    def __init__(self, path, batch_size=CHECKPOINT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.written = 0
+        self.seen_ids = set()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, encoding="utf-8", newline="") as f:
+                self.seen_ids = {row["PostID"] for row in csv.DictReader(f)}
+
+    def add(self, record):
+        """Queues a record; returns False if its PostID was already harvested."""
+        with self.lock:
+            if record["PostID"] in self.seen_ids:
+                return False
+            self.seen_ids.add(record["PostID"])
+            self.buffer.append(record)
+            if len(self.buffer) >= self.batch_size:
+                self._flush()
+        return True
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        write_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            if write_header:
+                writer.writeheader()
+            writer.writerows(self.buffer)
+        self.written += len(self.buffer)
+        self.buffer = []
+
+
+class HarvestState:
+    """Per-subreddit high-water marks (newest created_utc and PostID), persisted as JSON."""
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.marks = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.marks = json.load(f)
+
+    def newest(self, sub_name):
+        return self.marks.get(sub_name, {}).get("created_utc", 0)
+
+    def advance(self, sub_name, created_utc, post_id):
+        with self.lock:
+            if created_utc > self.newest(sub_name):
+                self.marks[sub_name] = {"created_utc": created_utc, "post_id": post_id}
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.marks, f, indent=2)
+                os.replace(tmp_path, self.path)
+
+
+def harvest_subreddit(reddit, sub_name, query, limit, bucket, writer, state):
+    """Fetches posts newer than the subreddit's high-water mark; returns the number of new posts.
+
+    The first run takes the newest `limit` posts. Later runs page back until they reach the mark,
+    however many posts arrived in between, so no post newer than the mark is ever skipped.
+    """
+    since = state.newest(sub_name)
+    bucket.acquire()
+    submissions = reddit.subreddit(sub_name).search(query, limit=None if since else limit, sort='new')
+
+    count = 0
+    newest = None
+    for i, post in enumerate(submissions):
+        if i and i % PAGE_SIZE == 0:
+            bucket.acquire()
+        # Results come newest first, so everything from here on was harvested by an earlier run
+        if post.created_utc < since:
+            break
+        if newest is None:
+            newest = post
+        if writer.add(post_to_record(post, sub_name)):
+            count += 1
+
+    # The scan either reached the old mark or exhausted the listing, so everything newer is covered.
+    # Only move the mark once this subreddit's posts are safely on disk
+    writer.flush()
+    if newest is not None:
+        state.advance(sub_name, newest.created_utc, newest.id)
+    return count
+
+
+def harvest(reddit_factory, subreddits, query, limit, output_path, state_path=DEFAULT_STATE_PATH,
+            max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND, batch_size=CHECKPOINT_BATCH_SIZE):
+    """Harvests subreddits concurrently into output_path (appending), sharing one rate limiter.
+
+    reddit_factory is called once per worker thread, since PRAW instances are not thread safe.
+    Returns the number of new posts written.
+    """
+    bucket = TokenBucket(rate=rate)
+    writer = CheckpointWriter(output_path, batch_size=batch_size)
+    state = HarvestState(state_path)
+    local = threading.local()
+
+    def work(sub_name):
+        if not hasattr(local, "reddit"):
+            local.reddit = reddit_factory()
+        try:
+            count = harvest_subreddit(local.reddit, sub_name, query, limit, bucket, writer, state)
+            print(f"-> Found {count} new posts in r/{sub_name}.")
+            metrics.count("posts_fetched", count, subreddit=sub_name)
+        except Exception as e:
+            print(f"An unexpected error occurred while processing r/{sub_name}: {e}")
+            metrics.count("fetch_errors", subreddit=sub_name)
+
+    print(f"Harvesting {len(subreddits)} subreddits with {max_workers} workers...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(work, subreddits))
+    writer.flush()
+    print(f"Finished harvesting. New posts written to {output_path}: {writer.written}")
+    return writer.written
+
+
+FakeSubmission = namedtuple("FakeSubmission", ["id", "created_utc", "title", "selftext", "score", "num_comments", "url"])
+
+
+class FakeReddit:
+    """Local stand-in for praw.Reddit, serving {subreddit: [FakeSubmission, ...]}."""
+
+    def __init__(self, posts_by_subreddit):
+        self.posts_by_subreddit = posts_by_subreddit
+        self.searches = []
+
+    def subreddit(self, name):
+        return _FakeSubreddit(self, name)
+
+
+class _FakeSubreddit:
+    def __init__(self, reddit, name):
+        self.reddit = reddit
+        self.name = name
+
+    def search(self, query, limit=None, sort='new'):
+        self.reddit.searches.append(self.name)
+        posts = sorted(self.reddit.posts_by_subreddit.get(self.name, []), key=lambda p: -p.created_utc)
+        return iter(posts[:limit])
@@ -0,0 +1,53 @@
+import functools
+
+# NLTK 3.9 replaced the pickled 'punkt' models with 'punkt_tab'
+PUNKT_RESOURCES = (('tokenizers/punkt_tab', 'punkt_tab'), ('tokenizers/punkt', 'punkt'))
+
+
+@functools.lru_cache(maxsize=None)
+def ensure_nltk_data(resource, package):
+    """Downloads an NLTK package only if `resource` (e.g. 'corpora/stopwords') is not installed yet.
+
+    Returns whether the resource is available afterwards (the download fails offline).
+    """
+    import nltk
+
+    try:
+        nltk.data.find(resource)
+        return True
+    except LookupError:
+        print(f"Downloading NLTK data '{package}'...")
+        return bool(nltk.download(package, quiet=True))
+
+
+@functools.lru_cache(maxsize=None)
+def ensure_punkt():
+    """Punkt tokenizer data for word_tokenize: 'punkt_tab' on NLTK >= 3.9, 'punkt' before that.
+
+    Returns whether it is available.
+    """
+    import nltk
+
+    for resource, package in PUNKT_RESOURCES:
+        try:
+            nltk.data.find(resource)
+            return True
+        except LookupError:
+            pass
+    if hasattr(nltk.tokenize, 'PunktTokenizer'):
+        return ensure_nltk_data(*PUNKT_RESOURCES[0])
+    return ensure_nltk_data(*PUNKT_RESOURCES[1])
+
+
+@functools.lru_cache(maxsize=None)
+def load_spacy_model(name):
+    """Loads a spaCy pipeline once per process, downloading it first if it is not installed."""
+    import spacy
+
+    try:
+        return spacy.load(name)
+    except OSError:
+        print("Downloading spaCy model...")
+        spacy.cli.download(name)
+        return spacy.load(name)
+
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .paths import data_path
+from .storage import COMPRESSION, to_table
+
+# One file per stage, next to the datasets
+DEFAULT_STORE_DIR = data_path("stage_store")
+KEY_COLUMNS = ["PostID", "_content_hash", "_config"]
+
+
+def content_hash(*values):
+    """Stable hash of a row's input text(s); missing values hash like empty strings."""
+    digest = hashlib.sha1()
+    for value in values:
+        digest.update(("" if pd.isna(value) else str(value)).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def config_fingerprint(config):
+    """Short hash of a stage's configuration (model names, lexicon, thresholds, ...)."""
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultStore:
+    """Stored per-post results of one pipeline stage.
+
+    A stored row is reused only if its PostID, the hash of the stage's input
+    columns and the stage config fingerprint all match the current run.
+    """
+
+    def __init__(self, stage, config, result_columns, input_columns=("Content",), directory=DEFAULT_STORE_DIR):
+        self.stage = stage
+        self.fingerprint = config_fingerprint(config)
+        self.result_columns = list(result_columns)
+        self.input_columns = list(input_columns)
+        # Parquet (see storage.py), so reused results keep their types: '' stays '', floats stay floats
+        self.path = os.path.join(directory, f"{stage}.parquet")
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=KEY_COLUMNS + self.result_columns)
+        return pd.read_parquet(self.path)
+
+    def save(self, stored):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        pq.write_table(to_table(stored), tmp_path, compression=COMPRESSION)
+        os.replace(tmp_path, self.path)
+
+    def run(self, df, compute):
+        """Fills self.result_columns on df, calling compute() only on new or changed rows.
+
+        compute(pending_df) must return a DataFrame with the result columns, indexed like pending_df.
+        """
+        df = df.copy()
+        keys = pd.DataFrame({
+            "PostID": df["PostID"].astype(str),
+            "_content_hash": [content_hash(*row) for row in df[self.input_columns].itertuples(index=False)],
+            "_config": self.fingerprint,
+        }, index=df.index)
+
+        stored = self.load()
+        stored = stored[stored["_config"] == self.fingerprint]
+        lookup = {
+            (post_id, digest): results
+            for post_id, digest, results in zip(
+                stored["PostID"], stored["_content_hash"],
+                stored[self.result_columns].itertuples(index=False),
+            )
+        }
+        found = [lookup.get(key) for key in zip(keys["PostID"], keys["_content_hash"])]
+        is_pending = [results is None for results in found]
+        pending = df.loc[is_pending]
+        print(f"[{self.stage}] Reusing {len(df) - len(pending)} stored results; computing {len(pending)} new or changed posts.")
+
+        for i, column in enumerate(self.result_columns):
+            df[column] = [None if results is None else results[i] for results in found]
+        if len(pending):
+            computed = compute(pending)
+            for column in self.result_columns:
+                df.loc[is_pending, column] = computed[column].values
+
+            fresh = keys.loc[is_pending].join(df.loc[is_pending, self.result_columns])
+            # Changed posts replace their old entry; posts no longer in the input are kept
+            stored = stored[~stored["PostID"].isin(fresh["PostID"])]
+            self.save(pd.concat([stored, fresh], ignore_index=True))
+        return df
@@ -0,0 +1,157 @@
+import json
+from collections import deque, namedtuple
+
+# Label used when no lexicon phrase matches
+DEFAULT_LABEL = "Low Concern"
+# Apostrophe styles folded together, so "don't", "don’t" and "dont" all match each other
+APOSTROPHES = ("'", "’")
+
+Tier = namedtuple("Tier", ["label", "weight", "phrases"])
+Match = namedtuple("Match", ["start", "end", "phrase", "tier"])
+
+
+def fold_phrase(phrase):
+    """Lowercased phrase with apostrophes dropped, the form phrases are matched in."""
+    phrase = phrase.lower().strip()
+    for a in APOSTROPHES:
+        phrase = phrase.replace(a, "")
+    return phrase
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over a set of phrases.
+
+    Built once per lexicon; find_all() scans a text in a single pass no matter
+    how many phrases there are, and reports every (possibly overlapping) hit.
+    Apostrophes are ignored on both sides, so "dont" matches "don't" and vice versa.
+    Phrases that fold to the same form would hit the same span twice, so only the
+    first of them is kept.
+    """
+
+    def __init__(self, patterns):
+        # patterns: iterable of (phrase, payload); the payload is returned with each hit
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        added = set()
+        for phrase, payload in patterns:
+            folded = fold_phrase(phrase)
+            if folded and folded not in added:
+                added.add(folded)
+                self._add(folded, (len(folded), phrase, payload))
+        self._build_failure_links()
+
+    def _add(self, folded, entry):
+        state = 0
+        for ch in folded:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        if entry not in self.output[state]:
+            self.output[state].append(entry)
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find_all(self, text):
+        """Returns [(start, end, phrase, payload), ...] for every match in text (case-insensitive)."""
+        goto, fail, output = self.goto, self.fail, self.output
+        matches = []
+        consumed = []  # text offset of every non-apostrophe character, to map hits back
+        state = 0
+        for i, ch in enumerate(text.lower()):
+            if ch in APOSTROPHES:
+                continue
+            consumed.append(i)
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, phrase, payload in output[state]:
+                matches.append((consumed[-length], i + 1, phrase, payload))
+        return matches
+
+
+class RiskLexicon:
+    """Tiered risk lexicon: an ordered list of (label, weight, phrases), most severe first."""
+
+    def __init__(self, tiers, default_label=DEFAULT_LABEL, version=None):
+        self.tiers = [Tier(label, float(weight), list(phrases)) for label, weight, phrases in tiers]
+        self.default_label = default_label
+        self.version = version
+        self._rank = {tier.label: rank for rank, tier in enumerate(self.tiers)}
+        self._weight = {tier.label: tier.weight for tier in self.tiers}
+        # Tiers go in most severe first, so a phrase listed in several tiers counts for the most severe one
+        self.matcher = PhraseMatcher(
+            (phrase, tier.label) for tier in self.tiers for phrase in tier.phrases
+        )
+
+    def matches(self, text):
+        """All lexicon hits in text as Match(start, end, phrase, tier), in text order."""
+        if not isinstance(text, str):
+            return []
+        return [Match(*m) for m in self.matcher.find_all(text)]
+
+    def score(self, text):
+        """Returns (label, weighted score, matches).
+
+        The label is the most severe tier with any hit (same as a first-hit check
+        over the tiers in order); the score sums the tier weight of every hit.
+        """
+        found = self.matches(text)
+        if not found:
+            return self.default_label, 0.0, found
+        label = min((m.tier for m in found), key=self._rank.__getitem__)
+        return label, sum(self._weight[m.tier] for m in found), found
+
+    def classify(self, text):
+        return self.score(text)[0]
+
+
+def format_matches(matches):
+    """Explanation string for a list of matches, e.g. "want to die@12-23; relapse@40-47"."""
+    return "; ".join(f"{m.phrase}@{m.start}-{m.end}" for m in matches)
+
+
+def load_lexicon(path, default_label=DEFAULT_LABEL):
+    """Loads a RiskLexicon from a JSON file.
+
+    Expected format (tiers listed most severe first):
+        {"version": "2024-05", "tiers": [
+            {"label": "High-Risk", "weight": 3, "phrases": ["want to die", ...]},
+            {"label": "Moderate Concern", "weight": 1, "phrases": ["relapse", ...]}]}
+
+    Raises ValueError if the file does not follow this format.
+    """
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    if not isinstance(spec, dict) or not isinstance(spec.get("tiers"), list) or not spec["tiers"]:
+        raise ValueError(f"{path}: expected an object with a non-empty 'tiers' list")
+    tiers = []
+    for i, t in enumerate(spec["tiers"]):
+        if not isinstance(t, dict) or not isinstance(t.get("label"), str) or not t["label"]:
+            raise ValueError(f"{path}: tier {i} needs a 'label' string")
+        weight = t.get("weight", 1)
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+            raise ValueError(f"{path}: tier {t['label']!r} has an invalid weight {weight!r}")
+        phrases = t.get("phrases")
+        if not isinstance(phrases, list) or not all(isinstance(phrase, str) for phrase in phrases):
+            raise ValueError(f"{path}: tier {t['label']!r} needs a 'phrases' list of strings")
+        tiers.append((t["label"], weight, phrases))
+    labels = [label for label, _, _ in tiers]
+    if len(set(labels)) != len(labels):
+        raise ValueError(f"{path}: tier labels must be unique")
+    return RiskLexicon(tiers, default_label=spec.get("default_label", default_label), version=spec.get("version"))
@@ -0,0 +1,72 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# VADER's recommended cut-offs on the compound score
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+# Unique texts per task handed to each worker in the process-pool mode
+DEFAULT_CHUNKSIZE = 2000
+SCORE_KEYS = ['neg', 'neu', 'pos', 'compound']
+SCORE_COLUMNS = ['Sentiment_Neg', 'Sentiment_Neu', 'Sentiment_Pos', 'Sentiment_Compound']
+
+_analyzer = None  # one per process, created on first use
+
+
+def get_analyzer():
+    """The process-wide VADER analyzer (the lexicon is only read on first use)."""
+    global _analyzer
+    if _analyzer is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def _score_chunk(texts):
+    """VADER scores for a list of texts as an (n, 4) float64 array in SCORE_KEYS order."""
+    analyzer = get_analyzer()
+    scores = np.empty((len(texts), len(SCORE_KEYS)), dtype=np.float64)
+    for i, text in enumerate(texts):
+        polarity = analyzer.polarity_scores(text)
+        scores[i] = [polarity[key] for key in SCORE_KEYS]
+    return scores
+
+
+def label_sentiment(compound, positive_threshold=POSITIVE_THRESHOLD, negative_threshold=NEGATIVE_THRESHOLD):
+    """Vectorized Positive/Negative/Neutral labels for an array of compound scores."""
+    compound = np.asarray(compound)
+    return np.select(
+        [compound >= positive_threshold, compound <= negative_threshold],
+        ['Positive', 'Negative'],
+        default='Neutral',
+    )
+
+
+def score_sentiment(texts, n_workers=1, chunksize=DEFAULT_CHUNKSIZE,
+                    positive_threshold=POSITIVE_THRESHOLD, negative_threshold=NEGATIVE_THRESHOLD):
+    """Scores texts with VADER; returns a DataFrame of SCORE_COLUMNS (float32) plus a Sentiment label.
+
+    Identical texts (reposts) are scored once. With n_workers > 1 the unique texts are
+    split into chunks over a process pool, each worker building its analyzer once.
+    """
+    texts = pd.Series(texts, dtype=object).fillna('').astype(str)
+    codes, uniques = pd.factorize(texts)
+    uniques = list(uniques)
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_workers <= 1 or len(uniques) <= chunksize:
+        unique_scores = _score_chunk(uniques)
+    else:
+        chunks = [uniques[i:i + chunksize] for i in range(0, len(uniques), chunksize)]
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            unique_scores = np.concatenate(list(executor.map(_score_chunk, chunks)))
+
+    scores = unique_scores.reshape(-1, len(SCORE_KEYS))[codes]
+    result = pd.DataFrame(scores.astype(np.float32), columns=SCORE_COLUMNS, index=texts.index)
+    # Label from the unrounded compound, so float32 rounding never moves a post across a threshold
+    result['Sentiment'] = label_sentiment(scores[:, 3], positive_threshold, negative_threshold)
+    return result
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+BIN_MODES = ("grid", "geohash")
+DEFAULT_GRID_DEGREES = 0.25  # roughly 25 km cells at the equator
+DEFAULT_GEOHASH_PRECISION = 4  # roughly 39 x 20 km cells
+# How much one post counts towards its cell, by Task 2 risk tier
+RISK_WEIGHTS = {"High-Risk": 3.0, "Moderate Concern": 2.0, "Low Concern": 1.0}
+DEFAULT_RISK_WEIGHT = 1.0
+TIME_SLICES = {"day": "D", "week": "W"}
+CELL_COLUMNS = ["Cell", "Latitude", "Longitude"]
+GEOHASH_ALPHABET = np.frombuffer(b"0123456789bcdefghjkmnpqrstuvwxyz", dtype=np.uint8)
+
+
+def _quantize(values, low, high, bits):
+    """Index of the 2**bits equal intervals of [low, high] each value falls in."""
+    scaled = np.floor((values - low) / (high - low) * (1 << bits))
+    return np.clip(scaled, 0, (1 << bits) - 1).astype(np.uint64)
+
+
+def grid_cells(lat, lon, degrees=DEFAULT_GRID_DEGREES):
+    """Cell ids ("row_col") and cell-center coordinates on a regular lat/lon grid."""
+    rows = np.clip(np.floor((lat + 90.0) / degrees), 0, np.ceil(180.0 / degrees) - 1).astype(np.int64)
+    cols = np.clip(np.floor((lon + 180.0) / degrees), 0, np.ceil(360.0 / degrees) - 1).astype(np.int64)
+    cells = pd.Series(rows).astype(str) + "_" + pd.Series(cols).astype(str)
+    return cells.to_numpy(), -90.0 + (rows + 0.5) * degrees, -180.0 + (cols + 0.5) * degrees
+
+
+def geohash_cells(lat, lon, precision=DEFAULT_GEOHASH_PRECISION):
+    """Geohash strings and cell-center coordinates; the loops run over bits, not rows."""
+    total_bits = 5 * precision
+    lon_bits, lat_bits = (total_bits + 1) // 2, total_bits // 2
+    lat_q = _quantize(lat, -90.0, 90.0, lat_bits)
+    lon_q = _quantize(lon, -180.0, 180.0, lon_bits)
+
+    # Interleave the bits, longitude first, most significant first
+    code = np.zeros(len(lat_q), dtype=np.uint64)
+    for i in range(total_bits):
+        source, bits = (lon_q, lon_bits) if i % 2 == 0 else (lat_q, lat_bits)
+        bit = (source >> np.uint64(bits - 1 - i // 2)) & np.uint64(1)
+        code = (code << np.uint64(1)) | bit
+
+    chars = np.empty((len(code), precision), dtype=np.uint8)
+    for k in range(precision):
+        chars[:, k] = GEOHASH_ALPHABET[(code >> np.uint64(5 * (precision - 1 - k))) & np.uint64(31)]
+    cells = chars.view(f"S{precision}").ravel().astype(str)
+
+    center_lat = -90.0 + (lat_q + 0.5) * (180.0 / (1 << lat_bits))
+    center_lon = -180.0 + (lon_q + 0.5) * (360.0 / (1 << lon_bits))
+    return cells, center_lat, center_lon
+
+
+def aggregate_cells(df, mode="grid", resolution=None, time_slice=None, risk_weights=RISK_WEIGHTS):
+    """Bins geocoded posts into cells and returns one row per cell (and period, if time_slice is set).
+
+    `resolution` is the cell size in degrees for "grid" and the geohash length for "geohash".
+    Columns: [Period,] Cell, Latitude, Longitude (cell center), Posts, Weight (sum of the
+    posts' risk weights) and one post count per Risk_Level. Posts without a valid Timestamp
+    are kept, with a missing (NaT) Period.
+    """
+    if mode not in BIN_MODES:
+        raise ValueError(f"Unknown binning mode {mode!r}; expected one of {BIN_MODES}")
+    if time_slice is not None and time_slice not in TIME_SLICES:
+        raise ValueError(f"Unknown time slice {time_slice!r}; expected one of {tuple(TIME_SLICES)}")
+
+    geo = df.dropna(subset=["Latitude", "Longitude"])
+    lat = geo["Latitude"].to_numpy(dtype=np.float64)
+    lon = geo["Longitude"].to_numpy(dtype=np.float64)
+    if mode == "grid":
+        cells, center_lat, center_lon = grid_cells(lat, lon, resolution or DEFAULT_GRID_DEGREES)
+    else:
+        cells, center_lat, center_lon = geohash_cells(lat, lon, int(resolution or DEFAULT_GEOHASH_PRECISION))
+
+    frame = pd.DataFrame({"Cell": cells, "Latitude": center_lat, "Longitude": center_lon})
+    keys = list(CELL_COLUMNS)
+    if time_slice is not None:
+        timestamps = pd.to_datetime(geo["Timestamp"], errors="coerce").to_numpy()
+        frame["Period"] = pd.Series(timestamps).dt.to_period(TIME_SLICES[time_slice]).dt.start_time
+        keys = ["Period"] + keys
+    if "Risk_Level" in geo:
+        frame["Risk_Level"] = geo["Risk_Level"].astype("string").fillna("Unknown").to_numpy()
+        frame["Weight"] = frame["Risk_Level"].map(risk_weights).fillna(DEFAULT_RISK_WEIGHT).astype(np.float64)
+    else:
+        frame["Weight"] = DEFAULT_RISK_WEIGHT
+
+    grouped = frame.groupby(keys, sort=True, dropna=False)
+    table = grouped.agg(Posts=("Weight", "size"), Weight=("Weight", "sum"))
+    if "Risk_Level" in frame:
+        levels = frame.groupby(keys + ["Risk_Level"], dropna=False).size()
+        table = table.join(levels.unstack("Risk_Level", fill_value=0))
+    return table.reset_index()
+
+
+def merge_cells(tables):
+    """Combines cell tables built from different batches of posts (e.g. stream chunks)."""
+    tables = [table for table in tables if table is not None and len(table)]
+    if not tables:
+        return pd.DataFrame(columns=CELL_COLUMNS + ["Posts", "Weight"])
+    combined = pd.concat(tables, ignore_index=True)
+    keys = [column for column in ["Period"] + CELL_COLUMNS if column in combined]
+    counts = [column for column in combined.columns if column not in keys and column != "Weight"]
+    combined[counts] = combined[counts].fillna(0).astype(np.int64)
+    return combined.groupby(keys, as_index=False, sort=True, dropna=False).sum()
+
+
+def heat_points(cells):
+    """[lat, lon, weight] per cell, summed over periods and scaled so the heaviest cell is 1."""
+    totals = cells.groupby(["Latitude", "Longitude"], as_index=False)["Weight"].sum()
+    if len(totals):
+        totals["Weight"] /= totals["Weight"].max()
+    return totals[["Latitude", "Longitude", "Weight"]].to_numpy().tolist()
+
+
+def time_slice_points(cells):
+    """(period labels, [lat, lon, weight] lists per period), all scaled against the heaviest cell-period.
+
+    Cells of posts without a timestamp (NaT Period) are left out of the frames.
+    """
+    if "Period" not in cells or not len(cells):
+        return [], []
+    scale = cells["Weight"].max()
+    labels, frames = [], []
+    for period, group in cells.groupby("Period", sort=True):
+        labels.append(period.strftime("%Y-%m-%d"))
+        points = group[["Latitude", "Longitude"]].assign(Weight=group["Weight"] / scale)
+        frames.append(points.to_numpy().tolist())
+    return labels, frames
@@ -0,0 +1,114 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import metrics
+
+# Low-cardinality columns stored dictionary-encoded
+CATEGORICAL_COLUMNS = ['Subreddit', 'Sentiment', 'Risk_Level']
+FLOAT_COLUMNS = ['Latitude', 'Longitude', 'Risk_Score']
+FLOAT32_COLUMNS = ['Sentiment_Neg', 'Sentiment_Neu', 'Sentiment_Pos', 'Sentiment_Compound']
+TIMESTAMP_COLUMNS = ['Timestamp']
+STRING_COLUMNS = ['PostID', 'Cluster_ID']
+# Free-text columns that may be entirely missing in a chunk; kept as nullable strings
+TEXT_COLUMNS = ['Location', 'Risk_Matches', 'Cleaned_Content', 'Title', 'Content', 'URL']
+# Derivable from Latitude/Longitude, so never stored in columnar files
+DERIVED_COLUMNS = ['Coordinates']
+COMPRESSION = 'zstd'
+
+
+def is_columnar(path):
+    return path.endswith('.parquet')
+
+
+def csv_path(path):
+    """The CSV counterpart of a dataset path (used for exports and as a read fallback)."""
+    return os.path.splitext(path)[0] + '.csv'
+
+
+def typed(df):
+    """Returns df with the pipeline's column types applied (categoricals, timestamps, floats)."""
+    df = df.copy()
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype('category')
+        elif column in FLOAT_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+        elif column in FLOAT32_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float32')
+        elif column in TIMESTAMP_COLUMNS:
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+        elif column in STRING_COLUMNS:
+            df[column] = df[column].astype(str)
+        elif column in TEXT_COLUMNS:
+            df[column] = df[column].astype('string')
+    return df
+
+
+def dataset_columns(path):
+    """Column names of a dataset (or of its CSV fallback), without loading any rows."""
+    if is_columnar(path) and os.path.exists(path):
+        return pq.read_schema(path).names
+    return list(pd.read_csv(csv_path(path) if is_columnar(path) else path, nrows=0).columns)
+
+
+def read_dataset(path, columns=None):
+    """Reads a dataset, loading only `columns` if given.
+
+    Falls back to the CSV counterpart when the Parquet file does not exist yet.
+    """
+    if is_columnar(path) and os.path.exists(path):
+        return pd.read_parquet(path, columns=columns)
+    source = csv_path(path)
+    if source != path:
+        print(f"{path} not found, reading {source} instead.")
+    return typed(pd.read_csv(source, usecols=columns, dtype={'PostID': str}))
+
+
+def to_table(df):
+    df = typed(df.drop(columns=[c for c in DERIVED_COLUMNS if c in df.columns]))
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def write_dataset(df, path, export_csv=False):
+    """Writes df as compressed Parquet (or CSV if path ends in .csv); optionally also exports CSV."""
+    if is_columnar(path):
+        pq.write_table(to_table(df), path, compression=COMPRESSION)
+    else:
+        df.to_csv(path, index=False, encoding='utf-8')
+    metrics.count("rows_written", len(df), dataset=os.path.basename(path))
+    if export_csv and is_columnar(path):
+        df.to_csv(csv_path(path), index=False, encoding='utf-8')
+        metrics.count("rows_written", len(df), dataset=os.path.basename(csv_path(path)))
+
+
+def extend_dataset(source_path, output_path, new_columns, export_csv=False):
+    """Writes the source dataset plus new_columns (a DataFrame in the same row order) to output_path.
+
+    With Parquet on both sides the source columns are copied as Arrow data, so the
+    text columns a stage never loaded are not parsed into Python objects.
+    """
+    new_columns = new_columns.reset_index(drop=True)
+    if not (is_columnar(source_path) and os.path.exists(source_path) and is_columnar(output_path)):
+        df = read_dataset(source_path)
+        for column in new_columns.columns:
+            df[column] = new_columns[column].values
+        write_dataset(df, output_path, export_csv=export_csv)
+        return
+
+    table = pq.read_table(source_path)
+    if table.num_rows != len(new_columns):
+        raise ValueError(f"{source_path} has {table.num_rows} rows but {len(new_columns)} new values were given")
+    additions = to_table(new_columns)
+    for name in additions.column_names:
+        if name in table.column_names:
+            table = table.drop_columns([name])
+        table = table.append_column(additions.schema.field(name), additions.column(name))
+    pq.write_table(table, output_path, compression=COMPRESSION)
+    metrics.count("rows_written", table.num_rows, dataset=os.path.basename(output_path))
+    if export_csv:
+        frame = table.to_pandas()
+        frame.to_csv(csv_path(output_path), index=False, encoding='utf-8')
+        metrics.count("rows_written", table.num_rows, dataset=os.path.basename(csv_path(output_path)))
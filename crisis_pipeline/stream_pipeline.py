@@ -0,0 +1,155 @@
+import os
+from collections import Counter
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from . import metrics
+from .paths import data_path, visualization_path
+from .spatial_bins import aggregate_cells, merge_cells
+from .storage import csv_path, is_columnar, typed, to_table
+from .text_normalizer import normalize_many
+
+# Posts held in memory at a time
+CHUNK_SIZE = 1000
+DEFAULT_INPUT_PATH = data_path("reddit_mental_health_raw.csv")
+DEFAULT_OUTPUT_PATH = data_path("reddit_mental_health_geocoded.parquet")
+DEFAULT_HEATMAP_PATH = visualization_path("crisis_heatmap.html")
+DEFAULT_CELLS_PATH = data_path("crisis_cells.parquet")
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yields the dataset at path as DataFrames of at most chunk_size rows."""
+    if is_columnar(path) and os.path.exists(path):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+    source = csv_path(path) if is_columnar(path) else path
+    for chunk in pd.read_csv(source, chunksize=chunk_size, dtype={'PostID': str}):
+        yield typed(chunk)
+
+
+def clean_chunks(chunks):
+    """Task 1 step: adds Cleaned_Content."""
+    for chunk in chunks:
+        with metrics.step("preprocess"):
+            chunk['Content'] = chunk['Content'].astype(str)
+            chunk['Cleaned_Content'] = normalize_many(chunk['Content'])
+        yield chunk
+
+
+def analyze_chunks(chunks):
+    """Task 2 step: adds sentiment and risk columns."""
+    from .task2_sentiment_risk import ANALYSIS_COLUMNS, analyze_posts
+
+    for chunk in chunks:
+        with metrics.step("analyze"):
+            chunk[ANALYSIS_COLUMNS] = analyze_posts(chunk)
+        yield chunk
+
+
+def geolocate_chunks(chunks):
+    """Task 3 step: adds Location, Latitude and Longitude (the geocode cache persists across chunks)."""
+    from .task3_geolocation_mapping import GEOLOCATION_COLUMNS, geolocate_posts
+
+    for chunk in chunks:
+        with metrics.step("geolocate"):
+            chunk[GEOLOCATION_COLUMNS] = geolocate_posts(chunk)
+        yield chunk
+
+
+class StreamAggregates:
+    """Summaries that only grow with the number of distinct values, not with the number of posts."""
+
+    def __init__(self, bin_mode="grid", bin_resolution=None, time_slice=None):
+        self.rows = 0
+        self.sentiment_risk = Counter()
+        self.locations = Counter()
+        self.bin_options = (bin_mode, bin_resolution, time_slice)
+        self.cells = merge_cells([])
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        self.sentiment_risk.update(zip(chunk['Sentiment'], chunk['Risk_Level']))
+        if 'Location' in chunk:
+            self.locations.update(chunk['Location'].dropna())
+            self.cells = merge_cells([self.cells, aggregate_cells(chunk, *self.bin_options)])
+
+    def sentiment_risk_table(self):
+        """Same layout as pd.crosstab(df['Sentiment'], df['Risk_Level'])."""
+        if not self.sentiment_risk:
+            return pd.DataFrame()
+        counts = pd.Series(self.sentiment_risk)
+        counts.index.names = ['Sentiment', 'Risk_Level']
+        return counts.unstack(fill_value=0).astype(int)
+
+
+class ChunkWriter:
+    """Writes chunks as they complete: Parquet row groups, or CSV appends."""
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+        self.rows = 0
+
+    def write(self, chunk):
+        if is_columnar(self.path):
+            table = to_table(chunk)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema, compression='zstd')
+            self.writer.write_table(table.cast(self.writer.schema))
+        else:
+            chunk.to_csv(self.path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0,
+                         index=False, encoding='utf-8')
+        self.rows += len(chunk)
+        metrics.count("rows_written", len(chunk), dataset=os.path.basename(self.path))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+@metrics.instrumented_stage("stream", posts=lambda aggregates: aggregates.rows)
+def run_stream(input_path=DEFAULT_INPUT_PATH, output_path=DEFAULT_OUTPUT_PATH, chunk_size=CHUNK_SIZE,
+               geolocate=True, heatmap_path=DEFAULT_HEATMAP_PATH, cells_path=DEFAULT_CELLS_PATH,
+               bin_mode="grid", bin_resolution=None, time_slice=None, time_heatmap_path=None):
+    """Pushes posts through preprocessing, scoring and (optionally) geolocation one chunk at a time.
+
+    With time_slice, the animated heatmap goes to time_heatmap_path (by default next to
+    heatmap_path, as <name>_time.html). Returns the StreamAggregates collected along the way.
+    """
+    chunks = analyze_chunks(clean_chunks(read_chunks(input_path, chunk_size)))
+    if geolocate:
+        chunks = geolocate_chunks(chunks)
+
+    aggregates = StreamAggregates(bin_mode, bin_resolution, time_slice)
+    writer = ChunkWriter(output_path)
+    try:
+        for chunk in chunks:
+            with metrics.step("write"):
+                writer.write(chunk)
+            with metrics.step("aggregate"):
+                aggregates.update(chunk)
+            print(f"Processed {aggregates.rows} posts...")
+    finally:
+        writer.close()
+    print(f"Streamed {aggregates.rows} posts to '{output_path}'.")
+
+    print("\nDistribution of Posts by Sentiment and Risk Level:")
+    print(aggregates.sentiment_risk_table())
+    if geolocate:
+        print("\nTop 5 Locations with Highest Crisis Discussions:")
+        for location, count in aggregates.locations.most_common(5):
+            print(f"{location}: {count}")
+        if len(aggregates.cells):
+            from .task3_geolocation_mapping import save_cells, save_heatmap, save_time_heatmap
+            if cells_path:
+                save_cells(aggregates.cells, cells_path)
+            if heatmap_path:
+                save_heatmap(aggregates.cells, heatmap_path)
+            if time_slice:
+                if time_heatmap_path is None:
+                    time_heatmap_path = os.path.splitext(heatmap_path or DEFAULT_HEATMAP_PATH)[0] + "_time.html"
+                save_time_heatmap(aggregates.cells, time_heatmap_path)
+    return aggregates
+
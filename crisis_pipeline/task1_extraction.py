@@ -0,0 +1,215 @@
+import importlib.util
+import os
+import pandas as pd
+import re
+import time # To potentially add delays
+from . import metrics
+from .dedup import DEDUP_COLUMNS, DEFAULT_THRESHOLD, cluster_posts
+from .paths import CONFIG_PATH, data_path
+from .resources import ensure_punkt
+from .text_normalizer import NORMALIZER_VERSION, get_stop_words, normalize_many
+from .result_store import ResultStore
+from .storage import write_dataset
+from .reddit_harvester import harvest, post_to_record
+
+# --- Configuration ---
+# Credentials come from these environment variables, or from scripts/config.py (see README)
+CREDENTIAL_VARIABLES = ["REDDIT_CLIENT_ID", "REDDIT_CLIENT_SECRET", "REDDIT_USER_AGENT"]
+
+KEYWORDS = [
+    "depressed", "depression help", "anxiety attack", "feeling overwhelmed",
+    "suicidal thoughts", "want to die", "end my life", "lonely",
+    "addiction help", "substance abuse", "recovery support", "relapse",
+    "mental health struggle", "feeling alone", "need support", "cope with stress"
+]
+SEARCH_QUERY = " OR ".join(f'"{k}"' for k in KEYWORDS) # Use OR to combine keywords, quotes for exact phrases
+
+# Choose relevant subreddits (be mindful of subreddit rules & sensitivity)
+SUBREDDITS = ["mentalhealth", "depression", "anxiety", "addiction", "offmychest", "SuicideWatch", "lonely"] # Example list
+POST_LIMIT_PER_SUBREDDIT = 100 # Adjust as needed, mindful of API limits and processing time
+OUTPUT_FILENAME_RAW = data_path("reddit_mental_health_raw.csv")
+OUTPUT_FILENAME_CLEANED = data_path("reddit_mental_health_cleaned.parquet")
+# Worker processes for text preprocessing (1 = in-process; raise for large frames)
+PREPROCESS_WORKERS = 1
+# Estimated word-shingle Jaccard similarity above which posts are treated as reposts (see dedup.py)
+DEDUP_THRESHOLD = DEFAULT_THRESHOLD
+
+
+
+def load_credentials(config_path=CONFIG_PATH):
+    """(client_id, client_secret, user_agent) from the environment or config.py.
+
+    Raises RuntimeError if neither provides them.
+    """
+    if all(os.environ.get(name) for name in CREDENTIAL_VARIABLES):
+        return tuple(os.environ[name] for name in CREDENTIAL_VARIABLES)
+    if not os.path.exists(config_path):
+        raise RuntimeError(f"{config_path} not found and {', '.join(CREDENTIAL_VARIABLES)} are not set. "
+                           "Please provide your Reddit API credentials.")
+    spec = importlib.util.spec_from_file_location("config", config_path)
+    config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config)
+    return tuple(getattr(config, name) for name in CREDENTIAL_VARIABLES)
+
+def setup_reddit_api():
+    """Initializes and returns a PRAW Reddit instance."""
+    try:
+        import praw
+
+        client_id, client_secret, user_agent = load_credentials()
+        reddit = praw.Reddit(
+            client_id=client_id,
+            client_secret=client_secret,
+            user_agent=user_agent,
+        )
+        reddit.read_only = True # Good practice if you're only reading data
+        print("Reddit API connection successful (Read-Only Mode).")
+        return reddit
+    except Exception as e:
+        print(f"Error connecting to Reddit API: {e}")
+        return None
+
+def fetch_posts(reddit, subreddits, query, limit):
+    """Fetches posts from specified subreddits based on a query."""
+    import praw
+
+    all_posts_data = []
+    if not reddit:
+        return all_posts_data
+
+    print(f"Fetching up to {limit} posts per subreddit for query: '{query}'...")
+    for sub_name in subreddits:
+        print(f"Searching in r/{sub_name}...")
+        try:
+            subreddit = reddit.subreddit(sub_name)
+            # Using search; alternatives exist (e.g., iterating through new posts)
+            # Sort by relevance or new - 'new' might be better for recent distress
+            submissions = subreddit.search(query, limit=limit, sort='new')
+
+            count = 0
+            for post in submissions:
+                all_posts_data.append(post_to_record(post, sub_name))
+                count += 1
+            print(f"-> Found {count} posts in r/{sub_name}.")
+            metrics.count("posts_fetched", count, subreddit=sub_name)
+            # Optional: Add a small delay to be nice to the API
+            time.sleep(1)
+
+        except praw.exceptions.PRAWException as e:
+            print(f"Error accessing subreddit r/{sub_name}: {e}")
+            metrics.count("fetch_errors", subreddit=sub_name)
+        except Exception as e:
+            print(f"An unexpected error occurred while processing r/{sub_name}: {e}")
+            metrics.count("fetch_errors", subreddit=sub_name)
+
+    print(f"Finished fetching. Total posts collected: {len(all_posts_data)}")
+    return all_posts_data
+
+def preprocess_text(text):
+    """Cleans text data: lowercase, remove URLs, emojis, special chars, stopwords.
+
+    Reference implementation; text_normalizer.normalize_text gives the same output much faster.
+    """
+    if not isinstance(text, str):
+        return ""
+    import emoji # Using 'emoji' library
+    from nltk.tokenize import word_tokenize
+    has_punkt = ensure_punkt()
+    stop_words = get_stop_words()
+    
+    # Combine multiple re.sub operations
+    text = text.lower()
+    # Combine URL and social media patterns
+    text = re.sub(r'(http\S+|www\S+|https\S+|\@\w+|\#)', '', text, flags=re.MULTILINE)
+    text = emoji.demojize(text)
+    # Combine special characters and numbers removal
+    text = re.sub(r'(:[a-zA-Z_]+:|[^\w\s]|\d+)', '', text)
+    
+    # Tokenize and remove stopwords in one step
+    # Without Punkt data (offline), skip sentence splitting: punctuation is gone, so the tokens are the same
+    tokens = [word for word in word_tokenize(text, preserve_line=not has_punkt)
+             if word not in stop_words and len(word) > 1]
+    
+    return " ".join(tokens)
+
+
+def clean_posts(posts):
+    """Cleaned_Content for a frame of posts."""
+    cleaned = normalize_many(posts['Content'], n_workers=PREPROCESS_WORKERS)
+    return pd.DataFrame({'Cleaned_Content': cleaned}, index=posts.index)
+
+def preprocess_and_save(df, incremental=False, export_csv=False, dedup_threshold=DEDUP_THRESHOLD):
+    """Adds Cleaned_Content and the repost clusters, and writes the cleaned dataset."""
+    # The same post can match several subreddit searches
+    duplicates = df['PostID'].duplicated()
+    if duplicates.any():
+        print(f"Dropping {duplicates.sum()} posts fetched more than once.")
+        df = df[~duplicates].reset_index(drop=True)
+
+    # --- Preprocess Content ---
+    print("Preprocessing text content...")
+    # Ensure 'Content' is string type before applying preprocessing
+    df['Content'] = df['Content'].astype(str)
+    with metrics.step("preprocess"):
+        if incremental:
+            # Only posts that are new or whose text changed are preprocessed again
+            config = {'normalizer_version': NORMALIZER_VERSION, 'stopwords': sorted(get_stop_words())}
+            df = ResultStore('extract', config, ['Cleaned_Content']).run(df, clean_posts)
+        else:
+            df['Cleaned_Content'] = clean_posts(df)['Cleaned_Content']
+    print("Preprocessing complete.")
+
+    # --- Group Reposts ---
+    # Later tasks analyze one post per cluster and copy the results to the rest
+    with metrics.step("dedup"):
+        df[DEDUP_COLUMNS] = cluster_posts(df, dedup_threshold)
+
+    # Select and reorder columns for final cleaned output
+    cleaned_df = df[['PostID', 'Timestamp', 'Subreddit', 'Score', 'Comments', 'URL', 'Cleaned_Content', 'Title', 'Content'] + DEDUP_COLUMNS] # Keep raw content for reference if needed
+
+    # --- Store Cleaned Data ---
+    print(f"Saving cleaned data to {OUTPUT_FILENAME_CLEANED}...")
+    with metrics.step("write"):
+        write_dataset(cleaned_df, OUTPUT_FILENAME_CLEANED, export_csv=export_csv)
+    # Alternatively, save to JSON:
+    # cleaned_df.to_json("reddit_mental_health_cleaned.json", orient="records", lines=True, date_format="iso")
+
+    print(f"\nFirst 5 rows of cleaned data:\n{cleaned_df.head().to_string()}")
+    return cleaned_df
+
+
+def read_raw_posts(path=OUTPUT_FILENAME_RAW):
+    """The harvested raw CSV, with PostIDs kept as strings (base-36 IDs like "1e5" are not numbers)."""
+    return pd.read_csv(path, dtype={'PostID': str})
+
+
+# --- Main Execution ---
+@metrics.instrumented_stage("extract")
+def run(harvest_mode=False, incremental=False, export_csv=False, dedup_threshold=DEDUP_THRESHOLD):
+    """Fetches posts (or harvests new ones into the raw CSV) and writes the cleaned dataset.
+
+    Returns the cleaned DataFrame, or None if nothing was fetched.
+    """
+    if harvest_mode:
+        # Resumable mode: new posts are checkpointed into the raw file, then the whole file is cleaned
+        with metrics.step("fetch"):
+            harvest(setup_reddit_api, SUBREDDITS, SEARCH_QUERY, POST_LIMIT_PER_SUBREDDIT, OUTPUT_FILENAME_RAW)
+        if os.path.exists(OUTPUT_FILENAME_RAW):
+            return preprocess_and_save(read_raw_posts(), incremental=incremental, export_csv=export_csv,
+                               dedup_threshold=dedup_threshold)
+        print("No posts were fetched. Exiting.")
+        return None
+
+    reddit_instance = setup_reddit_api()
+    if not reddit_instance:
+        print("Could not establish Reddit connection. Exiting.")
+        return None
+
+    with metrics.step("fetch"):
+        raw_posts = fetch_posts(reddit_instance, SUBREDDITS, SEARCH_QUERY, POST_LIMIT_PER_SUBREDDIT)
+    if not raw_posts:
+        print("No posts were fetched. Exiting.")
+        return None
+    # Create DataFrame
+    return preprocess_and_save(pd.DataFrame(raw_posts), incremental=incremental, export_csv=export_csv,
+                               dedup_threshold=dedup_threshold)
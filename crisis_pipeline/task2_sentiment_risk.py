@@ -0,0 +1,198 @@
+import functools
+import pandas as pd
+import os
+from . import metrics
+from .dedup import DEDUP_COLUMNS, fan_out, representatives
+from .feature_store import FeatureStore
+from .paths import VISUALIZATION_DIR, data_path
+from .risk_lexicon import RiskLexicon, format_matches, load_lexicon
+from .result_store import ResultStore
+from .sentiment_engine import NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD, SCORE_COLUMNS, get_analyzer, score_sentiment
+from .storage import dataset_columns, extend_dataset, read_dataset, write_dataset
+
+# Load the cleaned dataset
+INPUT_PATH = data_path("reddit_mental_health_cleaned.parquet")
+OUTPUT_PATH = data_path("reddit_mental_health_analyzed.parquet")
+PLOT_OUTPUT_DIR = VISUALIZATION_DIR
+# Optional JSON lexicon (see risk_lexicon.load_lexicon); the keyword lists below are used if it is absent
+RISK_LEXICON_PATH = data_path("risk_lexicon.json")
+# Top terms per Subreddit and per Risk_Level, from the feature store (see feature_store.py)
+TERM_ROLLUPS_PATH = data_path("term_rollups.parquet")
+ROLLUP_COLUMNS = ['Subreddit', 'Risk_Level']
+RISK_COLUMNS = ['Risk_Level', 'Risk_Score', 'Risk_Matches']
+ANALYSIS_COLUMNS = ['Sentiment', *SCORE_COLUMNS, *RISK_COLUMNS]
+# Worker processes for VADER scoring (1 = in-process; raise for large datasets)
+SENTIMENT_WORKERS = 1
+
+# Step 1: Sentiment Analysis with VADER
+def get_sentiment(text):
+    scores = get_analyzer().polarity_scores(text)
+    compound = scores['compound']
+    if compound >= POSITIVE_THRESHOLD:
+        return 'Positive'
+    elif compound <= NEGATIVE_THRESHOLD:
+        return 'Negative'
+    else:
+        return 'Neutral'
+
+# Step 2: Risk Classification using TF-IDF and Keyword Matching
+# Define high-risk and moderate-risk keywords
+HIGH_RISK_KEYWORDS = [
+    "want to die", "end my life", "suicidal thoughts", "dont want to be here",
+    "kill myself", "cant go on", "no reason to live"
+]
+MODERATE_RISK_KEYWORDS = [
+    "feeling overwhelmed", "need support", "cope with stress", "feeling alone",
+    "mental health struggle", "relapse", "depression help", "addiction help"
+]
+# Weight of each hit in the Risk_Score column
+HIGH_RISK_WEIGHT = 3
+MODERATE_RISK_WEIGHT = 1
+
+@functools.lru_cache(maxsize=None)
+def get_risk_lexicon():
+    """The risk lexicon, built once per process from RISK_LEXICON_PATH or the keyword lists."""
+    if os.path.exists(RISK_LEXICON_PATH):
+        print(f"Loaded risk lexicon from {RISK_LEXICON_PATH}.")
+        return load_lexicon(RISK_LEXICON_PATH)
+    return RiskLexicon([
+        ("High-Risk", HIGH_RISK_WEIGHT, HIGH_RISK_KEYWORDS),
+        ("Moderate Concern", MODERATE_RISK_WEIGHT, MODERATE_RISK_KEYWORDS),
+    ])
+
+# Function to classify risk level
+def classify_risk(text):
+    """Most severe tier with a matching phrase, or 'Low Concern' if no crisis language is detected."""
+    return get_risk_lexicon().classify(text)
+
+def score_risk(posts):
+    """Risk columns (RISK_COLUMNS) for a frame of posts."""
+    # Single pass per post over the whole lexicon: label, weighted score and which phrases matched where
+    # Use raw 'Content' to catch phrases before preprocessing
+    risk_lexicon = get_risk_lexicon()
+    risk_results = [risk_lexicon.score(text) for text in posts['Content']]
+    return pd.DataFrame({
+        'Risk_Level': [label for label, _, _ in risk_results],
+        'Risk_Score': [score for _, score, _ in risk_results],
+        'Risk_Matches': [format_matches(matches) for _, _, matches in risk_results],
+    }, index=posts.index)
+
+def analyze_posts(posts):
+    """Sentiment and risk columns (ANALYSIS_COLUMNS) for a frame of posts."""
+    # Batch VADER: label plus the neg/neu/pos/compound scores, each distinct text scored once
+    with metrics.step("sentiment"):
+        analysis = score_sentiment(posts['Cleaned_Content'], n_workers=SENTIMENT_WORKERS)
+    with metrics.step("risk"):
+        analysis[RISK_COLUMNS] = score_risk(posts)
+    return analysis[ANALYSIS_COLUMNS]
+
+def analysis_config():
+    """Everything analyze_posts' output depends on, for the incremental result store."""
+    risk_lexicon = get_risk_lexicon()
+    return {
+        'sentiment_model': 'vader',
+        'sentiment_thresholds': (POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD),
+        'lexicon_version': risk_lexicon.version,
+        # 2: phrases that fold to the same form are counted once
+        'risk_scoring': 2,
+        'lexicon': [tuple(tier) for tier in risk_lexicon.tiers],
+    }
+
+def save_and_show_plot(plt, filename):
+    """Helper function to save and display plots"""
+    plt.savefig(os.path.join(PLOT_OUTPUT_DIR, filename), dpi=300, bbox_inches='tight')
+    plt.show()
+    plt.close()  # Clean up memory
+
+def plot_distributions(df, sentiment_risk_dist):
+    """Saves the sentiment, risk level and sentiment-vs-risk plots."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Plot 1: Sentiment Distribution
+    plt.figure(figsize=(8, 5))
+    sns.countplot(data=df, x='Sentiment', palette='viridis')
+    plt.title('Distribution of Posts by Sentiment')
+    plt.xlabel('Sentiment')
+    plt.ylabel('Number of Posts')
+    save_and_show_plot(plt, 'sentiment_distribution.png')
+
+    # Plot 2: Risk Level Distribution
+    plt.figure(figsize=(8, 5))
+    sns.countplot(data=df, x='Risk_Level', palette='magma')
+    plt.title('Distribution of Posts by Risk Level')
+    plt.xlabel('Risk Level')
+    plt.ylabel('Number of Posts')
+    save_and_show_plot(plt, 'risk_level_distribution.png')
+
+    # Plot 3: Sentiment vs Risk Level (Heatmap)
+    plt.figure(figsize=(8, 5))
+    sns.heatmap(sentiment_risk_dist, annot=True, fmt='d', cmap='Blues')
+    plt.title('Sentiment vs Risk Level Distribution')
+    save_and_show_plot(plt, 'sentiment_vs_risk_heatmap.png')
+
+
+def save_term_rollups(feature_store, df, path=TERM_ROLLUPS_PATH):
+    """Writes the top terms per Subreddit and per Risk_Level and prints the ones per risk level."""
+    by_post = df.set_index(df['PostID'].astype(str))
+    rollups = [feature_store.rollup(by_post[column]).assign(Group_By=column)
+               for column in ROLLUP_COLUMNS if column in by_post]
+    rollups = pd.concat(rollups, ignore_index=True)[['Group_By', 'Group', 'Rank', 'Term', 'Weight', 'Posts']]
+    write_dataset(rollups, path)
+    print("\nTop terms by risk level:")
+    for level, group in rollups[rollups['Group_By'] == 'Risk_Level'].groupby('Group', sort=False):
+        print(f"{level}: {', '.join(group['Term'])}")
+    print(f"Term rollups saved to '{path}'.")
+
+# --- Main Execution ---
+@metrics.instrumented_stage("analyze")
+def run(incremental=False, export_csv=False):
+    """Scores the cleaned dataset, saves the plots and term rollups and writes the analyzed dataset."""
+    # Only the columns used here are loaded; the rest are carried over when the output is written
+    with metrics.step("load"):
+        optional = [column for column in DEDUP_COLUMNS + ['Subreddit'] if column in dataset_columns(INPUT_PATH)]
+        df = read_dataset(INPUT_PATH, columns=['PostID', 'Cleaned_Content', 'Content'] + optional)
+
+    # Ensure 'Cleaned_Content' is a string and handle missing values
+    df['Cleaned_Content'] = df['Cleaned_Content'].astype(str).fillna('')
+
+    # Term features are stored per post; only new or changed posts are vectorized
+    with metrics.step("features"):
+        feature_store = FeatureStore()
+        feature_store.append(df)
+
+    # Reposts (see dedup.py) are scored once per cluster and the results copied to every copy
+    posts = representatives(df)
+    if incremental:
+        # Reuse stored results for posts whose text, lexicon and model are unchanged
+        store = ResultStore('analyze', analysis_config(), ANALYSIS_COLUMNS, input_columns=('Cleaned_Content', 'Content'))
+        analysis = store.run(posts, analyze_posts)[ANALYSIS_COLUMNS]
+    else:
+        analysis = analyze_posts(posts)
+    df[ANALYSIS_COLUMNS] = fan_out(df, analysis)
+    # The lexicon scan is cheap and a repost can add crisis language, so every copy keeps its own risk result
+    copies = df.index.difference(posts.index)
+    if len(copies):
+        with metrics.step("risk"):
+            df.loc[copies, RISK_COLUMNS] = score_risk(df.loc[copies])
+
+    # Step 3: Generate Distribution Table and Plots
+    # Distribution table
+    sentiment_risk_dist = pd.crosstab(df['Sentiment'], df['Risk_Level'])
+    print("\nDistribution of Posts by Sentiment and Risk Level:")
+    print(sentiment_risk_dist)
+    for level, posts_at_level in df['Risk_Level'].value_counts().items():
+        metrics.count("posts_by_risk_level", int(posts_at_level), level=level)
+
+    with metrics.step("plots"):
+        plot_distributions(df, sentiment_risk_dist)
+
+    # Step 4: Top Terms per Subreddit and Risk Level
+    with metrics.step("rollups"):
+        save_term_rollups(feature_store, df)
+
+    # Save the updated dataset with sentiment and risk levels
+    with metrics.step("write"):
+        extend_dataset(INPUT_PATH, OUTPUT_PATH, df[ANALYSIS_COLUMNS], export_csv=export_csv)
+    print(f"Updated dataset saved to '{OUTPUT_PATH}'.")
+    return df
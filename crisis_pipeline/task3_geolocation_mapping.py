@@ -0,0 +1,364 @@
+import functools
+import hashlib
+import pandas as pd
+import os
+import re
+from . import metrics
+from .dedup import DEDUP_COLUMNS, fan_out, representatives
+from .geocode_cache import GeocodeCache, normalize_place
+from .gazetteer import DEFAULT_GAZETTEER_PATH, load_gazetteer
+from .paths import data_path, visualization_path
+from .resources import load_spacy_model
+from .result_store import ResultStore
+from .spatial_bins import aggregate_cells, heat_points, time_slice_points
+from .storage import dataset_columns, extend_dataset, read_dataset, write_dataset
+
+# Load the dataset with sentiment and risk levels
+INPUT_PATH = data_path("reddit_mental_health_analyzed.parquet")
+OUTPUT_PATH = data_path("reddit_mental_health_geocoded.parquet")
+HEATMAP_PATH = visualization_path("crisis_heatmap.html")
+TIME_HEATMAP_PATH = visualization_path("crisis_heatmap_time.html")
+# Per-cell aggregates behind the heatmaps, for dashboards
+CELLS_PATH = data_path("crisis_cells.parquet")
+# Heatmap cells: "grid" (BIN_RESOLUTION in degrees) or "geohash" (BIN_RESOLUTION = geohash length);
+# None uses the defaults in spatial_bins.py
+BIN_MODE = "grid"
+BIN_RESOLUTION = None
+# "day" or "week" also writes an animated heatmap with one frame per period
+TIME_SLICE = None
+# Offline GeoNames index (see gazetteer.py); used before any network lookup when present
+GAZETTEER_PATH = DEFAULT_GAZETTEER_PATH
+# Set to False for air-gapped runs: only the gazetteer is consulted
+USE_NETWORK_GEOCODER = True
+# spaCy NER batching; raise NER_N_PROCESS (e.g. to os.cpu_count()) on multi-core batch nodes
+NER_BATCH_SIZE = 128
+NER_N_PROCESS = 1
+SPACY_MODEL = "en_core_web_sm"  # Optionally: "en_core_web_md"
+GEOLOCATION_COLUMNS = ['Location', 'Latitude', 'Longitude']
+
+# Step 1: Extract Locations using spaCy NER and Regex
+@functools.lru_cache(maxsize=None)
+def get_nlp():
+    """spaCy's English model (consider using 'en_core_web_md' for better accuracy), loaded on first use."""
+    nlp = load_spacy_model(SPACY_MODEL)
+    # Only the entity recognizer is used, so switch off everything it does not depend on
+    # (tagger, parser, lemmatizer, ... and any tok2vec that the NER does not listen to)
+    ner_dependencies = {
+        name for name, pipe in nlp.pipeline
+        if "ner" in getattr(pipe, "listening_components", [])
+    }
+    nlp.select_pipes(disable=[name for name in nlp.pipe_names if name != "ner" and name not in ner_dependencies])
+    return nlp
+
+# List of known non-locations to exclude before any lookup. LOCATION_PATTERN ignores case, so everyday
+# phrases ("in hell", "in summer") are candidates too, and the gazetteer's alternate names match many of them.
+NON_LOCATIONS = {
+    'my life', 'life', 'bed', 'school', 'my', 'the past', 'the moment', 'reality', 'silence',
+    'the hospital', 'the mirror', 'the family', 'class', 'the psych ward', 'the back of ambulances',
+    'my room', 'the past year', 'the middle of', 'the world', 'the morning', 'the head', 'the public',
+    'my consciousness', 'the relationship', 'high school', 'the elementary school lobby', 'the store',
+    'my hometown', 'the country', 'the group', 'the wrong place', 'this sub', 'summer', 'the roster',
+    'the apartment', 'this world', 'my class', 'general', 'different states', 'this big city',
+    'every moment', 'my own life', 'the corners of the room', 'pain minute by minute', 'my own body',
+    'this empty routine', 'all of that', 'these few years', 'college in', 'january this year',
+    'this life cost money', 'my automatically generated screen name is astounding and wonderfully',
+    'the same place', 'my classes', 'my eyes being fat is worse than being depressed', 'mental pain',
+    'this house is like and they', 'two weeks with so much left to do and party in the next month otherwise',
+    'my sleep', 'any way', 'drunk fits of rage', 'hell', 'my mid', 'years', 'that moment but still somehow exist afterward',
+    'hopes that', 'october', 'the beginning was care about the gender and', 'pinocchio', 'my car for',
+    'the dumps anybody wanna talk', 'the back of the head before driving off with', 'like', 'silence with',
+    'my experience', 'your face that something is off for couple of months', 'was toxic',
+    'relationships who only turn to me when there', 'instructions on how to communicate yet', 'real life',
+    'person but', 'december and', 'between', 'it', 'dryer which', 'every thing play football',
+    'this vast world', 'her life up to', 'my senior year of high school', 'my dream uni',
+    'the grand scheme of things', 'the whole world', 'the world where people would just leave me alone',
+    'my relationships and life in general', 'my life even if', 'the darkness and have been through',
+    'schools is tortuous', 'terms of my depression lately is just the complete lack of desire to do anything at all',
+    'skin suits and the fact that', 'my life and got caught up with bad people', 'times my anxiety spikes is',
+    'my lates', 'me', 'order to maintain sanity', 'the thick of their panic', 'and feel comfortable and accepted and wanted by people',
+    'with my parents', 'my adult life', 'the long run', 'public or social settings', 'healing anxiety',
+    'relationships', 'talking to someone who is also going through the struggles of anxiety', 'customer support',
+    'terror with chest pressure', 'advance because', 'place with my heart racing and trying to find anyone to reassure me',
+    'my life when', 'my daily life at work', 'the home stretch of my junior year of college at', 'pain bye',
+    'all this', 'the middle of the night', 'this state', 'the year', 'heaven or hell',
+    'the morning she wrote me that she has some problems', 'small doses or will there be', 'my throat',
+    'one week', 'the middle of somewhere', 'my head and my brain screams that', 'with them just under',
+    'almost', 'the mid afternoon', 'front of boyfriend', 'fear of my next mistake every day at work',
+    'my head that tells me', 'even doing all this', 'advance but', 'university and', 'one place',
+    'advance', 'college and almost', 'translation', 'the parking lot', 'nursing school and studying with',
+    'the system for saying that', 'conjuction with social phobia diagnosis',
+    'an especially depressive episode and im too emotionally and mentally exhausted to even think maybe sad reel will make me cry',
+    'the past but nothing that', 'relation to', 'your head and that you',
+    'love with weed again and forget about drinking and pills', 'january and things were so great between us',
+    'doesn\'t', 'constant fear of it getting to the point of an anxiety attack', 'foster care until',
+    'full time school', 'fact', 'my head', 'my attempt at', 'my chest', 'sibo', 'time',
+    'waves throughour the day and it', 'the coming times', 'my truck listening to mac miller tunes',
+    'the back of mind', 'both my psych classes and sociology classes', 'high school for being effeminate',
+    'the right way', 'medical school', 'my exams', 'my life that changed everything for me',
+    'therapy and to my friends so much but it doesn', 'life since', 'love', 'out of guilt',
+    'too many ways', 'so many ways and', 'my first week', 'some definitions', 'general grieving over me terrifies me',
+    'bed without paying for it', 'some random university because', 'on it', 'my early',
+    'the same state ever since then we', 'these specific people', 'so many ways', 'touch with reality',
+    'the hospital where', 'this place', 'jan and', 'sixth form together too', 'love with',
+    'her depressive state', 'my feels', 'the best place', 'an abusive household with',
+    'high school makes me feel terrible', 'love with my best friend oh my lord im here again about this cause',
+    'person', 'those two and', 'trouble and to never respond to her', 'the moment it seems funny',
+    'next month', 'my life and narcissistic in many ways', 'my family because thats the only day in the year where you are the main character',
+    'everything', 'the military at', 'it are as well', 'every now and then', 'the first place',
+    'my living room after the', 'my own way', 'love with him ive', 'one of the intelligence communities',
+    'the mental hospital twice and got rid of the help', 'her shadow at times', 'this context is',
+    'being kind', 'something worse', 'the friend zone', 'my mouth once', 'me improved but',
+    'the way', 'front of us shouting since', 'love nor relationships', 'my family has it',
+    'months and', 'hand living in', 'me feeling like shit', 'my own skills', 'hindsight is',
+    'the same situation', 'my house', 'her truck with her arguing over radio stations', 'my chest',
+    'circles', 'on my dead body so', 'group settings', 'icu after five months',
+    'my life that wants to hang out with me edit', 'god and', 'my stupid daydreams',
+    'class during this', 'november', 'the last few weeks', 'constant fear of the pain coming back',
+    'life it', 'your bones and tells you this is all there will ever be', 'highschool', 'this shit',
+    'the same house with my abusive ex partner', 'the mirror and not hate myself',
+    'this knowing life is about to end', 'an irrational way', 'so much pain', 'university',
+    'awhile', 'these autistic meltdowns and they start spiraling out of control every single day',
+    'my ear as', 'front of me and is all sweet', 'silence for', 'my main developmental years',
+    'my last relationship', 'my entire life no matter how badly', 'living anymore if this is all that is going to happen to me',
+    'carrying on living my wife just passed away', 'his life saw how truly happy he was for the first time ever',
+    'my classes and', 'so much pain', 'sth completely unrelated but my depression has made me unable to get',
+    'my chest isn', 'mental pain and because of that', 'and out of the psych ward for over half',
+    'me is sexual and even then it', 'school and naturally super smart', 'my head is', 'anything',
+    'hospital for', 'thousands of dollars in debt trying to seek help and it didn', 'the process of putting them behind me',
+    'detail right now', 'your life', 'school growing up and', 'the mirror and get praise for became distorted looking overnight',
+    'my room and cry because', 'bed and binge eating', 'overcast', 'bed all day with no motivation and easy tasks are hard for me',
+    'so many aspects of myself and my life even though', 'comparison', 'january and the thought of staying in new york state for the next two years is making me want to jump off of',
+    'my room', 'countless cities across the us', 'some hobbies or things it makes me feel disgusted with myself and full of hatred',
+    'advance for any tips', 'the worst way possible', 'the middle of the night wake to her calls about problems mostly everyday for the past',
+    'males the early', 'my room to get away from her', 'trouble', 'the matter and basically just causing',
+    'life and confused as to what', 'my room bedrotting and watching youtube vids for hours bc no one',
+    'these twelve years it hasn', 'with him', 'my first', 'and become', 'this', 'bandages bc',
+    'my mind like', 'my life has gotten worse', 'therapy trying to work through it',
+    'my car before class and more money down the drain', 'public will be envious of me',
+    'the last few years we', 'therapy and never getting any better', 'my stomach when reacting with media',
+    'me isolating myself', 'mental illness and me not being able to see', 'relationship with other adults and other mental health issues',
+    'over', 'the field', 'everyone', 'divorce', 'about', 'my grandma',
+    'the middle of the day if anyone has some suggestions as to how', 'at the moment',
+    'prison his whole life', 'nonstop rumination', 'kinda', 'the book', 'healthy ways and',
+    'advance but', 'the attic for years doesn', 'touch with', 'teaching', 'and day out',
+    'hopes that the games', 'communication', 'the world do you balance being chronically depressed and hygiene',
+    'time set apart for meals and exercise', 'therapy okay', 'recent years', 'few months',
+    'my line of work', 'me for not trying hard enough', 'the psych ward because of my weed tattoo'
+}
+
+@functools.lru_cache(maxsize=None)
+def get_gazetteer():
+    """The offline gazetteer if one has been built, else None."""
+    if not os.path.exists(GAZETTEER_PATH):
+        return None
+    gazetteer = load_gazetteer(GAZETTEER_PATH)
+    print(f"Loaded gazetteer with {len(gazetteer)} places from {GAZETTEER_PATH}.")
+    return gazetteer
+
+@functools.lru_cache(maxsize=None)
+def get_geocode_cache():
+    """Nominatim behind the on-disk cache, so each place is only ever looked up once (None if disabled)."""
+    if not USE_NETWORK_GEOCODER:
+        return None
+    from geopy.geocoders import Nominatim
+
+    geolocator = Nominatim(user_agent="crisis_mapping_app")
+    return GeocodeCache(geolocator)
+
+LOCATION_PATTERN = re.compile(r'\b(?:in|from|at)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b', re.IGNORECASE)
+
+def validate_location(location):
+    """Geocode a candidate location; return (lat, lon) if valid, None otherwise.
+
+    Known non-locations are skipped; the gazetteer is tried first and the network geocoder is only a fallback.
+    """
+    if not location:
+        return None
+    if normalize_place(location) in NON_LOCATIONS:
+        metrics.count("non_locations_skipped")
+        return None
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        coords = gazetteer.lookup(location)
+        metrics.count("gazetteer_lookups", outcome="hit" if coords else "miss")
+        if coords:
+            return coords
+    geocode_cache = get_geocode_cache()
+    if geocode_cache is None:
+        return None
+    return geocode_cache.lookup(location)
+
+def regex_location_candidate(text):
+    """Catch patterns like "in London" or "from India"."""
+    if not isinstance(text, str):
+        return None
+    regex_match = LOCATION_PATTERN.search(text)
+    return regex_match.group(1) if regex_match else None
+
+def ner_location_candidates(text):
+    """Return every GPE entity spaCy finds in the text."""
+    doc = get_nlp()(text)
+    return [ent.text for ent in doc.ents if ent.label_ == "GPE"]
+
+def batch_ner_location_candidates(texts, batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS):
+    """Stream texts through nlp.pipe; yields the list of GPE entities for each text, in order."""
+    for doc in get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process):
+        yield [ent.text for ent in doc.ents if ent.label_ == "GPE"]
+
+def extract_locations(text):
+    """Return (location, (lat, lon)) for the first valid location in a post, or (None, None)."""
+    if not isinstance(text, str):
+        return None, None
+
+    # Step 1: Use regex to catch patterns like "in London" or "from India"
+    location = regex_location_candidate(text)
+    coords = validate_location(location)
+    if coords:
+        metrics.count("location_regex_hits")
+        return location, coords
+
+    # Step 2: Fallback to spaCy NER
+    metrics.count("location_ner_fallbacks")
+    for loc in ner_location_candidates(text):
+        coords = validate_location(loc)
+        if coords:
+            metrics.count("location_ner_hits")
+            return loc, coords
+    metrics.count("location_unresolved")
+    return None, None
+
+def resolve_locations(texts):
+    """Batch version of extract_locations: every unique candidate is geocoded once for the whole batch."""
+    texts = list(texts)
+    results = [(None, None)] * len(texts)
+
+    # Pass 1: regex candidates for every post
+    with metrics.step("regex"):
+        regex_candidates = [regex_location_candidate(text) for text in texts]
+    with metrics.step("geocode"):
+        resolved = {loc: validate_location(loc) for loc in dict.fromkeys(c for c in regex_candidates if c)}
+    for i, loc in enumerate(regex_candidates):
+        if loc and resolved[loc]:
+            results[i] = (loc, resolved[loc])
+
+    # Pass 2: spaCy NER only for posts the regex could not resolve
+    pending = [i for i, (loc, _) in enumerate(results) if loc is None and isinstance(texts[i], str)]
+    print(f"Regex resolved {len(texts) - len(pending)} posts; running NER on {len(pending)}...")
+    metrics.count("location_regex_hits", len(texts) - len(pending))
+    metrics.count("location_ner_fallbacks", len(pending))
+    with metrics.step("ner"):
+        ner_candidates = dict(zip(pending, batch_ner_location_candidates(texts[i] for i in pending)))
+    with metrics.step("geocode"):
+        for loc in dict.fromkeys(c for cands in ner_candidates.values() for c in cands):
+            if loc not in resolved:
+                resolved[loc] = validate_location(loc)
+    ner_hits = 0
+    for i, cands in ner_candidates.items():
+        for loc in cands:
+            if resolved[loc]:
+                results[i] = (loc, resolved[loc])
+                ner_hits += 1
+                break
+    metrics.count("location_ner_hits", ner_hits)
+    metrics.count("location_unresolved", len(pending) - ner_hits)
+    return results
+
+def geolocate_posts(posts):
+    """Location, Latitude and Longitude columns for a frame of posts."""
+    location_results = resolve_locations(posts['Content'])
+    return pd.DataFrame({
+        'Location': [loc for loc, _ in location_results],
+        'Latitude': [coords[0] if coords else None for _, coords in location_results],
+        'Longitude': [coords[1] if coords else None for _, coords in location_results],
+    }, index=posts.index)
+
+def geolocation_config():
+    """Everything geolocate_posts' output depends on, for the incremental result store.
+
+    Nothing is loaded here: the spaCy model is only needed if some posts have to be recomputed.
+    """
+    import spacy
+
+    return {
+        'spacy_model': SPACY_MODEL,
+        'spacy_version': spacy.util.get_package_version(SPACY_MODEL),
+        'gazetteer': GAZETTEER_PATH if os.path.exists(GAZETTEER_PATH) else None,
+        'network_geocoder': USE_NETWORK_GEOCODER,
+        # 2: the skip list also applies to the gazetteer
+        'validation_version': 2,
+        'non_locations': hashlib.sha1('\n'.join(sorted(NON_LOCATIONS)).encode('utf-8')).hexdigest(),
+    }
+
+def save_heatmap(cells, path=HEATMAP_PATH):
+    """Writes a folium heatmap with one risk-weighted point per cell (see spatial_bins.aggregate_cells)."""
+    import folium
+    from folium.plugins import HeatMap
+
+    m = folium.Map(location=[0, 0], zoom_start=2)
+    HeatMap(heat_points(cells)).add_to(m)
+    m.save(path)
+    print(f"Heatmap saved to '{path}'. Open in a browser to view.")
+
+def save_time_heatmap(cells, path=TIME_HEATMAP_PATH):
+    """Writes an animated heatmap with one frame per Period of a time-sliced cell table."""
+    import folium
+    from folium.plugins import HeatMapWithTime
+
+    labels, frames = time_slice_points(cells)
+    undated = int(cells.loc[cells["Period"].isna(), "Posts"].sum()) if "Period" in cells else 0
+    if undated:
+        print(f"{undated} geocoded posts have no timestamp; they are in the cell table but not in the time-sliced heatmap.")
+    if not frames:
+        print("No timestamped cells; skipping the time-sliced heatmap.")
+        return
+    m = folium.Map(location=[0, 0], zoom_start=2)
+    HeatMapWithTime(frames, index=labels).add_to(m)
+    m.save(path)
+    print(f"Time-sliced heatmap ({len(labels)} periods) saved to '{path}'.")
+
+def save_cells(cells, path=CELLS_PATH):
+    write_dataset(cells, path)
+    print(f"{len(cells)} heatmap cells saved to '{path}'.")
+
+
+# --- Main Execution ---
+@metrics.instrumented_stage("geolocate")
+def run(incremental=False, export_csv=False, bin_mode=BIN_MODE, bin_resolution=BIN_RESOLUTION, time_slice=TIME_SLICE):
+    """Geolocates the analyzed dataset, saves the heatmap(s) and cell table and writes the geocoded dataset."""
+    # Only the columns used here are loaded; the rest are carried over when the output is written
+    with metrics.step("load"):
+        clusters = [column for column in DEDUP_COLUMNS if column in dataset_columns(INPUT_PATH)]
+        df = read_dataset(INPUT_PATH, columns=['PostID', 'Content', 'Timestamp', 'Risk_Level'] + clusters)
+
+    # Step 2: Resolve and geocode locations in one pass (the cache also rate-limits network lookups)
+    # Reposts (see dedup.py) are geolocated once per cluster
+    posts = representatives(df)
+    if incremental:
+        # Reuse stored locations for posts whose text and location settings are unchanged
+        store = ResultStore('geolocate', geolocation_config(), GEOLOCATION_COLUMNS)
+        locations = store.run(posts, geolocate_posts)[GEOLOCATION_COLUMNS]
+    else:
+        locations = geolocate_posts(posts)
+    df[GEOLOCATION_COLUMNS] = fan_out(df, locations)
+    if get_geocode_cache() is not None:
+        print(f"Geocode cache: {get_geocode_cache().stats()}")
+
+    # Step 3: Display Top 5 Locations
+    location_counts = df['Location'].value_counts().head(5)
+    print("\nTop 5 Locations with Highest Crisis Discussions:")
+    print(location_counts)
+
+    # Step 4: Bin coordinates into risk-weighted cells and map the cells, not the individual posts
+    with metrics.step("binning"):
+        cells = aggregate_cells(df, bin_mode, bin_resolution, time_slice)
+    save_cells(cells)
+    with metrics.step("heatmap"):
+        save_heatmap(cells)
+        if time_slice:
+            save_time_heatmap(cells)
+
+    # Save the dataset with geolocation data
+    with metrics.step("write"):
+        extend_dataset(INPUT_PATH, OUTPUT_PATH, df[GEOLOCATION_COLUMNS], export_csv=export_csv)
+    print(f"Geocoded dataset saved to '{OUTPUT_PATH}'.")
+    return df
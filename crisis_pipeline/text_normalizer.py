@@ -0,0 +1,165 @@
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .paths import data_path
+from .resources import ensure_nltk_data
+
+# Same patterns as task1's preprocess_text, compiled once
+URL_PATTERN = re.compile(r'(http\S+|www\S+|https\S+|\@\w+|\#)')
+SPECIAL_PATTERN = re.compile(r'(:[a-zA-Z_]+:|[^\w\s]|\d+)')
+# The only word_tokenize (Treebank) rules that can still fire once punctuation is gone:
+# "cannot" -> "can not", "gonna" -> "gon na", ...
+CONTRACTION_PATTERN = re.compile(
+    r'\b(?:(can)(not)|(gim)(me)|(gon)(na)|(got)(ta)|(lem)(me))\b|\b(wan)(na)(?=\s|$)'
+)
+# Bump whenever normalize_text's output changes, so stored results are recomputed
+NORMALIZER_VERSION = 2
+# Rows per task handed to each worker in the process-pool mode
+DEFAULT_CHUNKSIZE = 2000
+PARITY_DATA_PATH = data_path("reddit_mental_health_cleaned.csv")
+
+_stop_words = None  # loaded on first use
+_emoji_tables = None
+
+
+def get_stop_words():
+    """NLTK's English stopwords, downloaded only if missing and read once per process."""
+    global _stop_words
+    if _stop_words is None:
+        ensure_nltk_data('corpora/stopwords', 'stopwords')
+        from nltk.corpus import stopwords
+
+        _stop_words = frozenset(stopwords.words('english'))
+    return _stop_words
+
+
+def _emoji_residue(name):
+    """What preprocess_text leaves behind for an emoji once demojize has turned it into :name:."""
+    return SPECIAL_PATTERN.sub('', name)
+
+
+def _build_emoji_trie(emoji_data):
+    """Prefix trie over every emoji sequence; '' marks the end of a complete emoji."""
+    trie = {}
+    for emj in emoji_data:
+        node = trie
+        for ch in emj:
+            node = node.setdefault(ch, {})
+        node[''] = emj
+    return trie
+
+
+def get_emoji_tables():
+    """(trie, residue by emoji), built from the emoji package on first use."""
+    global _emoji_tables
+    if _emoji_tables is None:
+        import emoji
+
+        residue = {emj: _emoji_residue(data['en']) for emj, data in emoji.EMOJI_DATA.items() if 'en' in data}
+        _emoji_tables = (_build_emoji_trie(emoji.EMOJI_DATA), residue)
+    return _emoji_tables
+
+
+# Every emoji has a non-ASCII character; keycaps are the only ones that start with an ASCII one
+KEYCAP_PATTERN = re.compile('[#*0-9]\ufe0f?\u20e3')
+NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7f]')
+
+
+def strip_emoji(text):
+    """Replaces each emoji (longest match first) by its demojize residue, without building :name: strings."""
+    if text.isascii():
+        return text
+    emoji_trie, emoji_residue = get_emoji_tables()
+    text = KEYCAP_PATTERN.sub(lambda m: emoji_residue.get(m.group(), ''), text)
+    pieces = []
+    pos = 0
+    for match in NON_ASCII_PATTERN.finditer(text):
+        start = match.start()
+        node = emoji_trie.get(text[start])
+        if start < pos or node is None:
+            continue
+        end, emj = start + 1, node.get('')
+        i = start + 1
+        while i < len(text) and text[i] in node:
+            node = node[text[i]]
+            i += 1
+            if '' in node:
+                end, emj = i, node['']
+        if emj is not None:
+            pieces.append(text[pos:start])
+            pieces.append(emoji_residue.get(emj, ''))
+            pos = end
+    pieces.append(text[pos:])
+    return ''.join(pieces)
+
+
+def _split_contraction(match):
+    return ' ' + ' '.join(g for g in match.groups() if g) + ' '
+
+
+def normalize_text(text):
+    """Fast drop-in for task1's preprocess_text: same Cleaned_Content, no Punkt and (unless a colon
+    comes before an emoji) no demojize."""
+    if not isinstance(text, str):
+        return ""
+
+    text = URL_PATTERN.sub('', text.lower())
+    if ':' in text and not text.isascii():
+        # A colon before an emoji pairs with the one demojize opens the emoji's :name: with
+        # ("feeling:sad:grinning_face:" loses ":sad:"), so these rare texts take the reference route
+        import emoji
+
+        text = emoji.demojize(text)
+    else:
+        # Remove emoji directly (keeping whatever the :name: round trip would have left)
+        text = strip_emoji(text)
+    text = SPECIAL_PATTERN.sub('', text)
+    # Only word characters and whitespace remain, so tokenizing is a whitespace split
+    text = CONTRACTION_PATTERN.sub(_split_contraction, text)
+    stop_words = get_stop_words()
+    return " ".join(word for word in text.split() if word not in stop_words and len(word) > 1)
+
+
+def _normalize_chunk(texts):
+    return [normalize_text(text) for text in texts]
+
+
+def normalize_many(texts, n_workers=1, chunksize=DEFAULT_CHUNKSIZE):
+    """Normalizes a sequence of texts, optionally split into chunks over a process pool."""
+    texts = list(texts)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_workers <= 1 or len(texts) <= chunksize:
+        return _normalize_chunk(texts)
+
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return [cleaned for chunk in executor.map(_normalize_chunk, chunks) for cleaned in chunk]
+
+
+def check_parity(path=PARITY_DATA_PATH, show=5):
+    """Compares normalize_text against task1's preprocess_text on a dataset's Content column.
+
+    Returns the number of rows whose output differs.
+    """
+    import pandas as pd
+    from .task1_extraction import preprocess_text
+
+    contents = pd.read_csv(path)['Content']
+    mismatches = 0
+    for text in contents:
+        expected, actual = preprocess_text(text), normalize_text(text)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= show:
+                print(f"Mismatch:\n  expected: {expected[:200]}\n  actual:   {actual[:200]}")
+    print(f"{mismatches} of {len(contents)} rows differ from preprocess_text.")
+    return mismatches
+
+
+# --- Main Execution ---
+if __name__ == "__main__":
+    # Usage: python -m crisis_pipeline.text_normalizer [dataset.csv]
+    sys.exit(1 if check_parity(*sys.argv[1:2]) else 0)
@@ -0,0 +1,10 @@
+"""Kept for existing cron jobs and docs; equivalent to `python -m crisis_pipeline stream`."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crisis_pipeline.cli import main
+
+if __name__ == "__main__":
+    main(["stream", *sys.argv[1:]])
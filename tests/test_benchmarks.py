@@ -0,0 +1,50 @@
+import copy
+
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.suite import STAGES, compare, run_suite, save_results, with_dependencies
+from crisis_pipeline.storage import read_dataset
+
+N_POSTS = 50
+
+
+@pytest.fixture(scope="module")
+def bench_run(tmp_path_factory):
+    """A tiny run of every stage: 50 synthetic posts, the stub geocoder and no spaCy model download."""
+    workdir = tmp_path_factory.mktemp("bench")
+    results = run_suite(N_POSTS, sample=5, workdir=str(workdir))
+    return workdir, results
+
+
+def test_every_stage_runs_on_a_tiny_corpus(bench_run):
+    workdir, results = bench_run
+    assert list(results["stages"]) == list(STAGES)
+    assert results["meta"]["posts"] == N_POSTS
+    for name, stage in results["stages"].items():
+        assert stage["posts"] == N_POSTS, name
+        assert stage["seconds"] >= 0
+    assert results["stages"]["geolocate"]["ner_backend"] is not None
+    # The stub geocoder resolved the places the generator put into the posts
+    assert read_dataset(str(workdir / "geocoded.parquet"))["Location"].notna().any()
+
+
+def test_results_compare_cleanly_with_themselves(bench_run, tmp_path):
+    _, results = bench_run
+    path = str(tmp_path / "latest.json")
+    save_results(results, path)
+    assert main(["compare", path, path]) == 0
+
+
+def test_compare_flags_regressions(bench_run):
+    _, results = bench_run
+    baseline = copy.deepcopy(results)
+    baseline["stages"]["risk"]["posts_per_second"] = results["stages"]["risk"]["posts_per_second"] * 2
+    regressions = compare(results, baseline, tolerance=0.2)
+    assert len(regressions) == 1 and regressions[0].startswith("risk: posts/s")
+
+
+def test_stage_dependencies():
+    assert with_dependencies(["binning"]) == ["preprocess", "dedup", "risk", "geolocate", "binning"]
+    with pytest.raises(ValueError):
+        with_dependencies(["nope"])
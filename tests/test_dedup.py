@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from crisis_pipeline.dedup import NUM_PERM, cluster_posts, fan_out, lsh_params, near_duplicate_pairs, representatives
+
+WORDS = [f"word{i}" for i in range(5000)]
+
+
+def random_text(rng, n_words):
+    return " ".join(rng.choice(WORDS, n_words, replace=False))
+
+
+def posts_frame(texts, ids=None):
+    ids = ids or [f"p{i}" for i in range(len(texts))]
+    return pd.DataFrame({'PostID': ids, 'Content': texts, 'Cleaned_Content': texts})
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.85, 0.9, 0.95])
+def test_lsh_params_rarely_miss_pairs_at_the_threshold(threshold):
+    bands, rows = lsh_params(threshold)
+    assert bands * rows <= NUM_PERM
+    assert (1 - threshold ** rows) ** bands <= 0.01
+
+
+def test_exact_duplicates_collapse_onto_the_first_post():
+    rng = np.random.default_rng(0)
+    text, other = random_text(rng, 30), random_text(rng, 30)
+    clusters = cluster_posts(posts_frame([other, text, text, text]))
+    assert clusters['Cluster_ID'].tolist() == ["p0", "p1", "p1", "p1"]
+    assert clusters['Cluster_Size'].tolist() == [1, 3, 3, 3]
+
+
+def test_crossposts_with_a_line_added_are_joined():
+    # 80 words plus 5 more: 78 of 83 shingles shared, a Jaccard similarity of about 0.94
+    rng = np.random.default_rng(1)
+    texts, ids = [], []
+    for i in range(20):
+        text = random_text(rng, 80)
+        texts += [text, text + " " + random_text(rng, 5)]
+        ids += [f"orig{i}", f"cross{i}"]
+    clusters = cluster_posts(posts_frame(texts, ids))
+    assert clusters['Cluster_ID'].tolist() == [f"orig{i}" for i in range(20) for _ in range(2)]
+    assert (clusters['Cluster_Size'] == 2).all()
+
+
+def test_unrelated_posts_stay_apart():
+    rng = np.random.default_rng(2)
+    clusters = cluster_posts(posts_frame([random_text(rng, 40) for _ in range(50)]))
+    assert (clusters['Cluster_Size'] == 1).all()
+
+
+def test_empty_and_short_posts():
+    texts = ["", "", "help me", "help me", "help me now", "help me now please", None]
+    clusters = cluster_posts(posts_frame(texts))
+    # Empty posts stay on their own; short posts are only collapsed when identical
+    assert clusters['Cluster_ID'].tolist() == ["p0", "p1", "p2", "p2", "p4", "p5", "p6"]
+
+
+def test_pairs_are_checked_within_the_whole_bucket():
+    bands, rows = lsh_params(0.85)
+    rng = np.random.default_rng(3)
+    a = rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64).astype(np.uint32)
+    # b differs from a in one column of every band but the first, so the pair only meets there
+    b = a.copy()
+    for band in range(1, bands):
+        b[band * rows] += 1
+    # The first signature shares that bucket but nothing else
+    leader = rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64).astype(np.uint32)
+    leader[:rows] = a[:rows]
+    pairs = near_duplicate_pairs(np.stack([leader, a, b]), 0.85)
+    assert pairs.tolist() == [[1, 2]]
+
+
+def test_fan_out_copies_representative_results():
+    rng = np.random.default_rng(4)
+    text, other = random_text(rng, 30), random_text(rng, 30)
+    df = posts_frame([text, other, text], ids=["a", "b", "c"])
+    df = df.join(cluster_posts(df))
+    reps = representatives(df)
+    assert reps['PostID'].tolist() == ["a", "b"]
+
+    results = pd.DataFrame({'Score': [0.5, -0.2]}, index=reps.index)
+    expanded = fan_out(df, results)
+    assert expanded.index.equals(df.index)
+    assert expanded['Score'].tolist() == [0.5, -0.2, 0.5]
+
+
+def test_fan_out_without_clusters_reindexes():
+    df = posts_frame(["x", "y"])
+    results = pd.DataFrame({'Score': [1.0, 2.0]}, index=df.index)
+    assert fan_out(df, results)['Score'].tolist() == [1.0, 2.0]
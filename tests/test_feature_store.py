@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from crisis_pipeline.feature_store import FeatureStore
+
+POSTS = pd.DataFrame({
+    "PostID": ["a", "b", "c", "d"],
+    "Cleaned_Content": ["feel alone tonight", "feel alone again", "want die tonight", "unique words here"],
+})
+LABELS = pd.Series(["Low", "Low", "High", "Other"], index=POSTS["PostID"])
+
+
+@pytest.fixture
+def store_dir(tmp_path):
+    return str(tmp_path / "feature_store")
+
+
+def recount_doc_freq(store):
+    doc_freq = np.zeros(store.n_features, dtype=np.int64)
+    for _, counts in store.iter_batches():
+        doc_freq += np.bincount(counts.indices, minlength=store.n_features)
+    return doc_freq
+
+
+def test_only_new_or_changed_posts_are_vectorized(store_dir):
+    assert FeatureStore(store_dir).append(POSTS) == 4
+    store = FeatureStore(store_dir)
+    assert store.append(POSTS) == 0
+
+    changed = POSTS.copy()
+    changed.loc[0, "Cleaned_Content"] = "feel better today"
+    added = pd.DataFrame({"PostID": ["e"], "Cleaned_Content": ["alone tonight"]})
+    assert store.append(pd.concat([changed, added], ignore_index=True)) == 2
+    assert len(store) == 5
+
+    reopened = FeatureStore(store_dir)
+    assert (recount_doc_freq(reopened) == reopened.doc_freq()).all()
+    assert [term for term, _ in reopened.top_terms(["a"], n=5)[0]] == ["feel"]
+
+
+def test_rollup_ranks_only_eligible_terms(store_dir):
+    store = FeatureStore(store_dir)
+    store.append(POSTS)
+    rollup = store.rollup(LABELS, n=10)
+    # Terms used by a single post fall below MIN_DF, so "Other" has nothing to rank
+    assert set(rollup["Group"]) == {"Low", "High"}
+    assert (rollup["Weight"] > 0).all()
+    assert set(rollup.loc[rollup["Group"] == "Low", "Term"]) == {"feel", "alone", "tonight"}
+    assert set(rollup.loc[rollup["Group"] == "High", "Term"]) == {"tonight"}
+    assert rollup.set_index(["Group", "Term"])["Posts"].to_dict()[("Low", "feel")] == 2
+
+
+def test_rebuild_only_deletes_store_files(store_dir):
+    FeatureStore(store_dir).append(POSTS)
+    unrelated = os.path.join(store_dir, "notes.txt")
+    with open(unrelated, "w", encoding="utf-8") as f:
+        f.write("keep me")
+
+    rebuilt = FeatureStore(store_dir, n_features=1 << 10)
+    assert rebuilt.append(POSTS) == 4
+    assert os.path.exists(unrelated)
+    assert sorted(name for name in os.listdir(store_dir) if name.startswith("shard-")) == [
+        "shard-00000.data.npy", "shard-00000.doc_freq.npy", "shard-00000.indices.npy",
+        "shard-00000.indptr.npy", "shard-00000.posts.parquet", "shard-00000.terms.parquet"]
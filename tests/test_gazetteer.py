@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from crisis_pipeline import gazetteer as gazetteer_module
+from crisis_pipeline.gazetteer import Gazetteer, NameIndex, build_index
+
+# GeoNames rows: id, name, ascii name, alternate names, lat, lon, feature class, feature code,
+# country, cc2, admin1, admin2, admin3, admin4, population
+GEONAMES_ROWS = [
+    ["3448439", "São Paulo", "Sao Paulo", "Sampa,SP,Сан-Паулу", "-23.5475", "-46.63611", "P", "PPLA", "BR", "", "27", "", "", "", "10021295"],
+    ["4119617", "London", "London", "", "35.32897", "-93.25296", "P", "PPLA2", "US", "", "AR", "", "", "", "10000"],
+    ["2643743", "London", "London", "Londres,Londra", "51.50853", "-0.12574", "P", "PPLC", "GB", "", "ENG", "", "", "", "8961989"],
+    ["0000002", "Tinyville", "Tinyville", "", "10.0", "10.0", "P", "PPL", "US", "", "TX", "", "", "", "20"],
+    ["0000003", "Ocean Spot", "Ocean Spot", "", "0.0", "0.0", "H", "BAY", "US", "", "", "", "", "", "5000"],
+]
+
+
+@pytest.fixture
+def dump(tmp_path):
+    path = tmp_path / "geonames.txt"
+    path.write_text("\n".join("\t".join(row) for row in GEONAMES_ROWS) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_lookup_prefers_the_most_populous_place(dump):
+    gazetteer = build_index(dump)
+    assert len(gazetteer) == 3  # below MIN_POPULATION and non-A/P features are dropped
+    assert gazetteer.lookup("London") == (51.50853, -0.12574)
+    assert gazetteer.lookup("london", country_code="US") == (35.32897, -93.25296)
+    assert gazetteer.lookup("Sao Paulo") == gazetteer.lookup("são paulo") == gazetteer.lookup("Sampa")
+    assert gazetteer.lookup("SP") is None  # aliases shorter than MIN_ALIAS_LENGTH are dropped
+    assert gazetteer.lookup("Tinyville") is None
+    assert gazetteer.lookup("Ocean Spot") is None
+
+
+def test_saved_index_is_memory_mapped(dump, tmp_path):
+    built = build_index(dump)
+    built.save(str(tmp_path / "index"))
+    loaded = Gazetteer.load(str(tmp_path / "index"))
+    assert all(isinstance(getattr(loaded.keys, name), np.memmap) for name in ("key_hashes", "key_bytes", "rows"))
+    assert loaded.keys.key_bytes.dtype == np.uint8
+    for place in ["London", "Londres", "São Paulo", "Сан-Паулу", "Atlantis"]:
+        assert loaded.lookup(place) == built.lookup(place)
+    assert len(loaded.keys) == len(built.keys)
+
+
+def test_names_sharing_a_hash_are_told_apart(monkeypatch):
+    monkeypatch.setattr(gazetteer_module, "key_hash", lambda key: 7)
+    index = NameIndex.from_dict({"paris": [0], "london": [2, 1], "rome": [3]})
+    assert index.get("london") == (2, 1)
+    assert index.get("rome") == (3,)
+    assert index.get("berlin") == ()
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from crisis_pipeline.geocode_cache import GeocodeCache, StubGeocoder, normalize_place
+
+PLACES = {"London": (51.5074, -0.1278), "Toronto": (43.6532, -79.3832)}
+
+
+class FlakyGeocoder(StubGeocoder):
+    """Times out on the first `failures` requests, then answers like StubGeocoder."""
+
+    def __init__(self, places, failures=1):
+        super().__init__(places)
+        self.failures = failures
+
+    def geocode(self, query, timeout=None):
+        if self.failures:
+            self.failures -= 1
+            self.calls += 1
+            raise TimeoutError("timed out")
+        return super().geocode(query, timeout)
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "geocode_cache.sqlite")
+
+
+def open_cache(path, geocoder=None, **options):
+    options.setdefault("min_delay", 0)
+    return GeocodeCache(geocoder or StubGeocoder(PLACES), path=path, **options)
+
+
+def age_entries(cache, seconds):
+    """Moves every stored entry `seconds` into the past."""
+    cache.conn.execute("UPDATE geocode SET resolved_at = resolved_at - ?", (seconds,))
+    cache.conn.commit()
+
+
+def test_normalize_place():
+    assert normalize_place("  New   York, ") == "new york"
+    assert normalize_place(None) == ""
+
+
+def test_memo_resolves_each_place_once_per_process(cache_path):
+    cache = open_cache(cache_path)
+    assert cache.lookup("London") == PLACES["London"]
+    assert cache.lookup(" london.") == PLACES["London"]
+    assert cache.lookup_many(["London", "Toronto", "Toronto", None]) == {
+        "London": PLACES["London"], "Toronto": PLACES["Toronto"]}
+    assert cache.geocoder.calls == 2
+    assert cache.stats() == {"hits": 2, "misses": 2, "errors": 0, "timeouts": 0}
+
+
+def test_found_places_persist_until_positive_ttl(cache_path):
+    first = open_cache(cache_path)
+    first.lookup("London")
+    first.close()
+
+    second = open_cache(cache_path, positive_ttl=3600)
+    assert second.lookup("London") == PLACES["London"]
+    assert second.geocoder.calls == 0
+
+    age_entries(second, 7200)
+    third = open_cache(cache_path, positive_ttl=3600)
+    assert third.lookup("London") == PLACES["London"]
+    assert third.geocoder.calls == 1
+
+
+def test_misses_are_cached_until_negative_ttl(cache_path):
+    first = open_cache(cache_path)
+    assert first.lookup("Atlantis") is None
+    first.close()
+
+    second = open_cache(cache_path, negative_ttl=3600)
+    assert second.lookup("Atlantis") is None
+    assert second.geocoder.calls == 0
+    assert second.hits == 1
+
+    age_entries(second, 7200)
+    third = open_cache(cache_path, negative_ttl=3600)
+    assert third.lookup("Atlantis") is None
+    assert third.geocoder.calls == 1
+
+
+def test_timeouts_are_not_stored(cache_path):
+    first = open_cache(cache_path, FlakyGeocoder(PLACES))
+    assert first.lookup("London") is None
+    assert first.lookup("London") is None  # memoized for the rest of the process
+    assert first.stats() == {"hits": 1, "misses": 1, "errors": 1, "timeouts": 1}
+    first.close()
+
+    second = open_cache(cache_path)
+    assert second.lookup("London") == PLACES["London"]
+    assert second.geocoder.calls == 1
+
+
+def test_requests_are_spaced_by_min_delay(cache_path):
+    cache = open_cache(cache_path, min_delay=0.05)
+    start = time.monotonic()
+    for place in ["London", "Toronto", "Atlantis"]:
+        cache.lookup(place)
+    assert time.monotonic() - start >= 0.1
+
+    # Cached lookups do not wait
+    start = time.monotonic()
+    cache.lookup_many(["London", "Toronto", "Atlantis"])
+    assert time.monotonic() - start < 0.05
@@ -0,0 +1,91 @@
+import pytest
+
+from crisis_pipeline import task3_geolocation_mapping as task3
+from crisis_pipeline.gazetteer import build_index
+from crisis_pipeline.geocode_cache import GeocodeCache, StubGeocoder
+
+# GeoNames rows: id, name, ascii name, alternate names, lat, lon, feature class, feature code,
+# country, cc2, admin1, admin2, admin3, admin4, population
+GEONAMES_ROWS = [
+    ["3153623", "Hell", "Hell", "Hell", "63.44", "10.9", "P", "PPL", "NO", "", "21", "", "", "", "1500"],
+    ["2643743", "London", "London", "Londres", "51.50853", "-0.12574", "P", "PPLC", "GB", "", "ENG", "", "", "", "8961989"],
+    ["0000001", "Summerside", "Summerside", "Summer", "46.39", "-63.79", "P", "PPL", "CA", "", "09", "", "", "", "16000"],
+]
+
+
+@pytest.fixture
+def gazetteer(tmp_path, monkeypatch):
+    dump = tmp_path / "geonames.txt"
+    dump.write_text("\n".join("\t".join(row) for row in GEONAMES_ROWS) + "\n", encoding="utf-8")
+    gazetteer = build_index(str(dump))
+    monkeypatch.setattr(task3, "get_gazetteer", lambda: gazetteer)
+    monkeypatch.setattr(task3, "get_geocode_cache", lambda: None)
+    return gazetteer
+
+
+def test_gazetteer_resolves_places(gazetteer):
+    assert task3.validate_location("London") == (51.50853, -0.12574)
+    assert task3.validate_location("londres") == (51.50853, -0.12574)
+
+
+@pytest.mark.parametrize("phrase", ["hell", "Hell", "summer", "October", "like"])
+def test_non_locations_skip_the_gazetteer(gazetteer, phrase):
+    assert gazetteer.lookup("hell") is not None
+    assert task3.validate_location(phrase) is None
+
+
+def test_non_locations_skip_the_geocoder(tmp_path, monkeypatch):
+    geocoder = StubGeocoder({"hell": (63.44, 10.9), "Toronto": (43.6532, -79.3832)})
+    cache = GeocodeCache(geocoder, path=str(tmp_path / "cache.sqlite"), min_delay=0)
+    monkeypatch.setattr(task3, "get_gazetteer", lambda: None)
+    monkeypatch.setattr(task3, "get_geocode_cache", lambda: cache)
+    assert task3.validate_location("Hell") is None
+    assert task3.validate_location("Toronto") == (43.6532, -79.3832)
+    assert geocoder.calls == 1
+
+
+@pytest.fixture
+def entity_ruler_nlp(tmp_path, monkeypatch):
+    """A blank English pipeline whose entity_ruler tags a few places, in place of en_core_web_sm."""
+    spacy = pytest.importorskip("spacy")
+    nlp = spacy.blank("en")
+    nlp.add_pipe("entity_ruler").add_patterns([
+        {"label": "GPE", "pattern": place} for place in ["Toronto", "Atlantis", "Paris"]])
+    geocoder = StubGeocoder({"Toronto": (43.6532, -79.3832), "Paris": (48.8566, 2.3522),
+                             "London": (51.5074, -0.1278)})
+    cache = GeocodeCache(geocoder, path=str(tmp_path / "cache.sqlite"), min_delay=0)
+    monkeypatch.setattr(task3, "get_nlp", lambda: nlp)
+    monkeypatch.setattr(task3, "get_gazetteer", lambda: None)
+    monkeypatch.setattr(task3, "get_geocode_cache", lambda: cache)
+    return nlp
+
+
+TEXTS = [
+    "Hello from London",
+    "Toronto winters make everything worse",
+    "Atlantis and then Paris, never settled anywhere",
+    "nothing to see here",
+    None,
+]
+
+
+def test_batched_ner_matches_per_post_extraction(entity_ruler_nlp):
+    expected = [task3.extract_locations(text) for text in TEXTS]
+    assert task3.resolve_locations(TEXTS) == expected
+    assert [location for location, _ in expected] == ["London", "Toronto", "Paris", None, None]
+
+
+def test_batch_ner_yields_candidates_in_order(entity_ruler_nlp):
+    texts = [text for text in TEXTS if text]
+    assert list(task3.batch_ner_location_candidates(texts, batch_size=2)) == [
+        [], ["Toronto"], ["Atlantis", "Paris"], []]
+
+
+def test_geolocation_config_does_not_load_the_model(monkeypatch):
+    def fail():
+        raise AssertionError("the spaCy model was loaded")
+
+    monkeypatch.setattr(task3, "get_nlp", fail)
+    monkeypatch.setattr(task3, "get_gazetteer", fail)
+    config = task3.geolocation_config()
+    assert config["spacy_model"] == task3.SPACY_MODEL
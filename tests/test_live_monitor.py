@@ -0,0 +1,137 @@
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+
+from crisis_pipeline import task3_geolocation_mapping as task3
+from crisis_pipeline.live_monitor import LiveMonitor, ReplaySource, WebhookSink
+
+HIGH_RISK = "I want to die, I cant go on"
+CALM = "Went for a walk in the park today"
+
+
+class RecordingSink:
+    """Keeps every event; calls on_event after each one."""
+
+    def __init__(self, on_event=None):
+        self.events = []
+        self.on_event = on_event
+        self.closed = False
+
+    async def emit(self, event):
+        self.events.append(event)
+        if self.on_event:
+            self.on_event(self.events)
+
+    def close(self):
+        self.closed = True
+
+
+class FailingSink(RecordingSink):
+    async def emit(self, event):
+        raise ConnectionError("sink is down")
+
+
+def write_feed(tmp_path, contents):
+    path = tmp_path / "feed.csv"
+    pd.DataFrame({
+        "PostID": [f"p{i}" for i in range(len(contents))],
+        "Subreddit": "lonely",
+        "Title": "title",
+        "Content": contents,
+        "Timestamp": "2024-01-01 00:00:00",
+        "URL": "https://example.com",
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def stalled_geocoder(monkeypatch):
+    """extract_locations blocks until the returned event is set."""
+    released = threading.Event()
+    calls = []
+
+    def extract_locations(text):
+        calls.append(text)
+        released.wait(timeout=30)
+        return "London", (51.5074, -0.1278)
+
+    monkeypatch.setattr(task3, "extract_locations", extract_locations)
+    released.calls = calls
+    return released
+
+
+def test_stalled_geocoder_does_not_hold_up_alerts(tmp_path, stalled_geocoder):
+    n_alerts = 10
+    feed = write_feed(tmp_path, [HIGH_RISK, CALM] * n_alerts)
+
+    def release_when_all_alerts_arrived(events):
+        # The geocoder only answers once every alert is out, so alerts cannot have waited for it
+        if sum(event["event"] == "alert" for event in events) == n_alerts:
+            stalled_geocoder.set()
+
+    sink = RecordingSink(release_when_all_alerts_arrived)
+    monitor = LiveMonitor(ReplaySource(feed), [sink], score_queue_size=2, geo_queue_size=2)
+    queue_sizes = []
+    submit = monitor.submit
+
+    async def recording_submit(record):
+        await submit(record)
+        queue_sizes.append(monitor.score_queue.qsize())
+
+    monitor.submit = recording_submit
+    stats = asyncio.run(monitor.run())
+
+    # Backpressure: the source waited for the scorer instead of overfilling the queue
+    assert max(queue_sizes) <= 2
+    assert stats["received"] == stats["scored"] == 2 * n_alerts
+    assert stats["alerts"] == n_alerts
+    # At most one lookup in progress plus a full geo queue; the rest skip the lookup
+    assert stats["geo_skipped"] >= n_alerts - 3
+    assert stats["located"] == n_alerts - stats["geo_skipped"] == len(stalled_geocoder.calls)
+
+    alerts = [event for event in sink.events if event["event"] == "alert"]
+    locations = [event for event in sink.events if event["event"] == "location"]
+    assert [event["PostID"] for event in alerts] == [f"p{i}" for i in range(0, 2 * n_alerts, 2)]
+    assert all(event["Risk_Level"] == "High-Risk" for event in alerts)
+    assert len(locations) == stats["located"]
+    assert all(event["Location"] == "London" for event in locations)
+    assert sink.closed
+
+
+def test_failing_sink_does_not_stop_the_others(tmp_path):
+    feed = write_feed(tmp_path, [HIGH_RISK, HIGH_RISK + " now", CALM])
+    good = RecordingSink()
+    monitor = LiveMonitor(ReplaySource(feed), [FailingSink(), good, FailingSink()], geolocate=False)
+    stats = asyncio.run(monitor.run())
+
+    assert [event["PostID"] for event in good.events] == ["p0", "p1"]
+    assert stats["sink_failures"] == {"FailingSink_0": 2, "FailingSink_2": 2}
+
+
+def test_repeated_posts_are_dropped_and_seen_ids_are_bounded():
+    monitor = LiveMonitor(None, [], seen_ids_size=3)
+
+    async def submit_all(post_ids):
+        for post_id in post_ids:
+            await monitor.submit({"PostID": post_id})
+
+    asyncio.run(submit_all(["a", "b", "a", "c", "d", "a"]))
+    # Seeing "a" again kept it remembered, so "b" was forgotten when "d" arrived
+    assert monitor.counts["duplicates"] == 2
+    assert list(monitor.seen_ids) == ["c", "d", "a"]
+    assert monitor.score_queue.qsize() == 4
+
+
+def test_webhook_sink_only_records_without_url(monkeypatch):
+    posted = []
+    sink = WebhookSink("https://example.com/hook")
+    monkeypatch.setattr(sink, "_post", posted.append)
+    asyncio.run(sink.emit({"event": "alert"}))
+    assert posted == [{"event": "alert"}]
+    assert sink.sent == []
+
+    recorder = WebhookSink()
+    asyncio.run(recorder.emit({"event": "alert"}))
+    assert recorder.sent == [{"event": "alert"}]
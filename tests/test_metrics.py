@@ -0,0 +1,106 @@
+import os
+import re
+
+import pytest
+
+from crisis_pipeline import metrics
+from crisis_pipeline.cli import main
+from crisis_pipeline.metrics import Histogram, Metrics
+
+
+def test_counters_are_labelled_with_the_running_stage():
+    m = Metrics()
+    m.count("posts_seen", 2)
+    with m.stage("analyze") as record:
+        m.count("posts_seen")
+        m.count("posts_seen", 3)
+        m.count("cache_hits", 4, source="memo")
+        record["posts"] = 10
+    counters = {(c["name"], tuple(sorted(c["labels"].items()))): c["value"] for c in m.report()["counters"]}
+    assert counters == {
+        ("posts_seen", (("stage", "none"),)): 2,
+        ("posts_seen", (("stage", "analyze"),)): 4,
+        ("cache_hits", (("source", "memo"), ("stage", "analyze"))): 4,
+    }
+    assert m.report()["stages"][0]["posts"] == 10
+
+
+def test_repeated_steps_add_up():
+    m = Metrics()
+    with m.stage("stream"):
+        for _ in range(3):
+            with m.step("chunk"):
+                pass
+    steps = m.report()["stages"][0]["steps"]
+    assert steps["chunk"]["calls"] == 3
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        h.observe(value)
+    assert h.cumulative() == [(0.1, 1), (1.0, 3), ("+Inf", 4)]
+    assert h.count == 4 and h.sum == pytest.approx(6.25)
+
+
+def test_prometheus_text_format():
+    m = Metrics()
+    with m.stage("geolocate") as record:
+        m.count("geocode_requests", 3, outcome='a "quoted"\nvalue')
+        m.observe("geocode_latency_seconds", 0.2, buckets=(0.1, 1.0))
+        m.observe("geocode_latency_seconds", 2.0, buckets=(0.1, 1.0))
+        record["posts"] = 5
+    lines = m.prometheus().splitlines()
+
+    # Every family is introduced by HELP and TYPE lines
+    for name, kind in [("stage_duration_seconds", "gauge"), ("geocode_requests_total", "counter"),
+                       ("geocode_latency_seconds", "histogram"), ("last_run_timestamp_seconds", "gauge")]:
+        help_line = lines.index(f"# TYPE crisis_pipeline_{name} {kind}") - 1
+        assert lines[help_line].startswith(f"# HELP crisis_pipeline_{name} ")
+
+    assert 'crisis_pipeline_geocode_requests_total{outcome="a \\"quoted\\"\\nvalue",stage="geolocate"} 3' in lines
+    assert 'crisis_pipeline_stage_posts{stage="geolocate"} 5' in lines
+    assert 'crisis_pipeline_geocode_latency_seconds_bucket{stage="geolocate",le="0.1"} 0' in lines
+    assert 'crisis_pipeline_geocode_latency_seconds_bucket{stage="geolocate",le="1.0"} 1' in lines
+    assert 'crisis_pipeline_geocode_latency_seconds_bucket{stage="geolocate",le="+Inf"} 2' in lines
+    assert 'crisis_pipeline_geocode_latency_seconds_sum{stage="geolocate"} 2.2' in lines
+    assert 'crisis_pipeline_geocode_latency_seconds_count{stage="geolocate"} 2' in lines
+
+    sample = re.compile(r'^[a-z_]+(\{[a-z_]+="(?:[^"\\]|\\.)*"(,[a-z_]+="(?:[^"\\]|\\.)*")*\})? \S+$')
+    assert all(line.startswith("#") or sample.match(line) for line in lines)
+
+
+def test_write_prometheus_replaces_the_file(tmp_path):
+    path = tmp_path / "metrics.prom"
+    path.write_text("old")
+    metrics.write_prometheus(str(path))
+    assert path.read_text().endswith("\n")
+    assert "old" not in path.read_text()
+    assert os.listdir(tmp_path) == ["metrics.prom"]
+
+
+def test_unknown_stages_and_modes_are_rejected():
+    m = Metrics()
+    with pytest.raises(ValueError, match="Unknown stage"):
+        m.enable_profiling("geolocation")
+    with pytest.raises(ValueError, match="Unknown profile mode"):
+        m.enable_profiling("geolocate", "perf")
+    assert m.profiled_stages == {}
+    with pytest.raises(ValueError):
+        metrics.instrumented_stage("not_a_stage")
+
+
+def test_cli_rejects_unknown_profile_stage():
+    with pytest.raises(SystemExit, match="Unknown stage 'geolocation'"):
+        main(["dedup", "--profile", "geolocation"])
+
+
+def test_profiled_stage_writes_a_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "PROFILE_DIR", str(tmp_path))
+    m = Metrics()
+    m.enable_profiling("dedup")
+    with m.stage("dedup"):
+        sum(range(1000))
+    profile = m.report()["stages"][0]["profile"]
+    assert profile["mode"] == "cprofile"
+    assert os.path.exists(profile["path"]) and os.path.exists(profile["path"] + ".txt")
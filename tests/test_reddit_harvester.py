@@ -0,0 +1,78 @@
+import csv
+import json
+
+import pytest
+
+from crisis_pipeline.reddit_harvester import FakeReddit, FakeSubmission, HarvestState, harvest
+from crisis_pipeline.task1_extraction import read_raw_posts
+
+QUERY = '"lonely"'
+START = 1700000000
+
+
+def submission(post_id, created_utc):
+    return FakeSubmission(post_id, created_utc, f"title {post_id}", "body", 1, 0, f"https://example.com/{post_id}")
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "raw.csv"), str(tmp_path / "harvest_state.json")
+
+
+def run_harvest(posts_by_subreddit, paths, limit=100, batch_size=2):
+    output_path, state_path = paths
+    reddit = FakeReddit(posts_by_subreddit)
+    written = harvest(lambda: reddit, list(posts_by_subreddit), QUERY, limit, output_path,
+                      state_path=state_path, max_workers=2, rate=1000, batch_size=batch_size)
+    return written, reddit
+
+
+def read_ids(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return [row["PostID"] for row in csv.DictReader(f)]
+
+
+def test_high_water_marks_are_persisted(paths):
+    run_harvest({"lonely": [submission("a1", START), submission("a2", START + 10)],
+                 "anxiety": [submission("b1", START + 5)]}, paths)
+    with open(paths[1], encoding="utf-8") as f:
+        marks = json.load(f)
+    assert marks == {"lonely": {"created_utc": START + 10, "post_id": "a2"},
+                     "anxiety": {"created_utc": START + 5, "post_id": "b1"}}
+    assert HarvestState(paths[1]).newest("lonely") == START + 10
+
+
+def test_crossposts_are_written_once(paths):
+    shared = submission("x1", START)
+    written, _ = run_harvest({"lonely": [shared, submission("a1", START + 1)],
+                              "depression": [shared, submission("d1", START + 2)]}, paths)
+    assert written == 3
+    assert sorted(read_ids(paths[0])) == ["a1", "d1", "x1"]
+
+
+def test_rerun_appends_only_new_posts(paths):
+    old = [submission(f"p{i}", START + i) for i in range(5)]
+    assert run_harvest({"lonely": old}, paths)[0] == 5
+
+    new = [submission(f"q{i}", START + 100 + i) for i in range(3)]
+    assert run_harvest({"lonely": old + new}, paths)[0] == 3
+    ids = read_ids(paths[0])
+    assert len(ids) == len(set(ids)) == 8
+    with open(paths[0], encoding="utf-8") as f:
+        assert f.read().count("PostID") == 1  # a single header across checkpointed appends
+
+
+def test_rerun_pages_back_to_the_mark_beyond_limit(paths):
+    first = [submission(f"p{i}", START + i) for i in range(3)]
+    assert run_harvest({"lonely": first}, paths, limit=2)[0] == 2
+
+    # More posts than `limit` arrived since the last run; none of them may be skipped
+    arrived = [submission(f"q{i}", START + 100 + i) for i in range(5)]
+    assert run_harvest({"lonely": first + arrived}, paths, limit=2)[0] == 5
+    assert set(read_ids(paths[0])) >= {post.id for post in arrived}
+    assert HarvestState(paths[1]).newest("lonely") == START + 104
+
+
+def test_raw_posts_keep_post_ids_as_strings(paths):
+    run_harvest({"lonely": [submission("1e5", START), submission("0123", START + 1)]}, paths)
+    assert sorted(read_raw_posts(paths[0])["PostID"]) == ["0123", "1e5"]
@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+import pytest
+
+from crisis_pipeline.result_store import ResultStore
+from crisis_pipeline.storage import read_dataset, typed
+from crisis_pipeline.task2_sentiment_risk import ANALYSIS_COLUMNS, INPUT_PATH, analysis_config, analyze_posts
+
+INPUT_COLUMNS = ('Cleaned_Content', 'Content')
+
+
+@pytest.fixture(scope="module")
+def posts():
+    if not os.path.exists(INPUT_PATH) and not os.path.exists(INPUT_PATH.replace('.parquet', '.csv')):
+        pytest.skip("bundled dataset not found")
+    posts = read_dataset(INPUT_PATH, columns=['PostID', 'Cleaned_Content', 'Content']).head(80)
+    posts['Cleaned_Content'] = posts['Cleaned_Content'].astype(str).fillna('')
+    return posts
+
+
+def analyze_incrementally(posts, directory):
+    store = ResultStore('analyze', analysis_config(), ANALYSIS_COLUMNS, input_columns=INPUT_COLUMNS,
+                        directory=str(directory))
+    return store.run(posts, analyze_posts)[ANALYSIS_COLUMNS]
+
+
+def assert_same_output(incremental, full):
+    # Compared as written to disk (storage.typed), where the two runs must agree exactly
+    pd.testing.assert_frame_equal(typed(incremental), typed(full))
+
+
+def test_reused_results_match_a_full_run(posts, tmp_path):
+    full = analyze_posts(posts)
+    assert (full['Risk_Matches'] == '').any()
+
+    assert_same_output(analyze_incrementally(posts, tmp_path), full)
+    # Second run: every row comes from the store
+    assert_same_output(analyze_incrementally(posts, tmp_path), full)
+
+
+def test_mixed_reused_and_changed_rows_match_a_full_run(posts, tmp_path):
+    analyze_incrementally(posts, tmp_path)
+    changed = posts.copy()
+    changed.loc[changed.index[:10], 'Content'] = "I want to die, nobody would notice"
+    changed.loc[changed.index[:10], 'Cleaned_Content'] = "want die nobody would notice"
+
+    assert_same_output(analyze_incrementally(changed, tmp_path), analyze_posts(changed))
+
+
+def test_stale_config_is_not_reused(tmp_path):
+    frame = pd.DataFrame({'PostID': ['a', 'b'], 'Content': ['one', 'two']})
+    calls = []
+
+    def compute(pending):
+        calls.append(len(pending))
+        return pd.DataFrame({'Length': pending['Content'].str.len().astype(float), 'Tag': ''}, index=pending.index)
+
+    ResultStore('demo', {'version': 1}, ['Length', 'Tag'], directory=str(tmp_path)).run(frame, compute)
+    reused = ResultStore('demo', {'version': 1}, ['Length', 'Tag'], directory=str(tmp_path)).run(frame, compute)
+    ResultStore('demo', {'version': 2}, ['Length', 'Tag'], directory=str(tmp_path)).run(frame, compute)
+    assert calls == [2, 2]
+    assert reused['Tag'].tolist() == ['', '']
+    assert reused['Length'].tolist() == [3.0, 3.0]
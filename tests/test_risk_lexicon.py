@@ -0,0 +1,84 @@
+import json
+import random
+
+import pytest
+
+from crisis_pipeline.risk_lexicon import APOSTROPHES, PhraseMatcher, RiskLexicon, fold_phrase, load_lexicon
+
+PHRASES = ["want to die", "die", "dont want to be here", "can't go on", "relapse", "lapse", "end my life", "my life"]
+FILLER = ["i", "really", "don't", "want", "to", "be", "here", "cant", "go", "on", "my", "life", "end",
+          "relapsed", "die", "diet", "’", "WANT", "Can’t", "the"]
+
+
+def brute_force(text, phrases):
+    """Every (start, end, phrase) hit found with str.find on the apostrophe-free lowercased text."""
+    kept = [i for i, ch in enumerate(text) if ch not in APOSTROPHES]
+    folded = "".join(text[i] for i in kept).lower()
+    hits = set()
+    for phrase in phrases:
+        target = fold_phrase(phrase)
+        start = folded.find(target)
+        while start != -1:
+            hits.add((kept[start], kept[start + len(target) - 1] + 1, phrase))
+            start = folded.find(target, start + 1)
+    return hits
+
+
+def test_matcher_agrees_with_brute_force():
+    matcher = PhraseMatcher((phrase, None) for phrase in PHRASES)
+    rng = random.Random(0)
+    for _ in range(300):
+        text = " ".join(rng.choice(FILLER) for _ in range(rng.randint(0, 25)))
+        found = {(start, end, phrase) for start, end, phrase, _ in matcher.find_all(text)}
+        assert found == brute_force(text, PHRASES), text
+
+
+def test_offsets_point_into_the_original_text():
+    matcher = PhraseMatcher([("dont want to be here", None)])
+    text = "I just DON'T want to be here anymore"
+    [(start, end, phrase, _)] = matcher.find_all(text)
+    assert text[start:end] == "DON'T want to be here"
+
+
+def test_most_severe_tier_wins():
+    lexicon = RiskLexicon([("High-Risk", 3, ["want to die"]), ("Moderate Concern", 1, ["relapse"])])
+    assert lexicon.score("had a relapse, i want to die") == ("High-Risk", 4.0, lexicon.matches("had a relapse, i want to die"))
+    assert lexicon.classify("worried about a relapse") == "Moderate Concern"
+    assert lexicon.classify("a good day") == "Low Concern"
+    assert lexicon.classify(None) == "Low Concern"
+
+
+def test_phrases_folding_alike_count_once_for_the_most_severe_tier():
+    lexicon = RiskLexicon([("High-Risk", 3, ["dont want to be here", "don't want to be here"]),
+                           ("Moderate Concern", 1, ["Don’t want to be here", "relapse"])])
+    label, score, matches = lexicon.score("I don't want to be here")
+    assert (label, score) == ("High-Risk", 3.0)
+    assert [(m.phrase, m.tier) for m in matches] == [("dont want to be here", "High-Risk")]
+
+
+def write_lexicon(tmp_path, spec):
+    path = tmp_path / "risk_lexicon.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+    return str(path)
+
+
+def test_load_lexicon(tmp_path):
+    lexicon = load_lexicon(write_lexicon(tmp_path, {"version": "2024-05", "tiers": [
+        {"label": "High-Risk", "weight": 3, "phrases": ["want to die"]},
+        {"label": "Moderate Concern", "phrases": ["relapse"]}]}))
+    assert lexicon.version == "2024-05"
+    assert [(tier.label, tier.weight) for tier in lexicon.tiers] == [("High-Risk", 3.0), ("Moderate Concern", 1.0)]
+    assert lexicon.classify("I want to die") == "High-Risk"
+
+
+@pytest.mark.parametrize("spec", [
+    [],
+    {"tiers": []},
+    {"tiers": [{"weight": 3, "phrases": ["x"]}]},
+    {"tiers": [{"label": "High-Risk", "weight": "3", "phrases": ["x"]}]},
+    {"tiers": [{"label": "High-Risk", "phrases": "want to die"}]},
+    {"tiers": [{"label": "A", "phrases": ["x"]}, {"label": "A", "phrases": ["y"]}]},
+])
+def test_load_lexicon_rejects_malformed_files(tmp_path, spec):
+    with pytest.raises(ValueError):
+        load_lexicon(write_lexicon(tmp_path, spec))
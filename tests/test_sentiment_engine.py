@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from crisis_pipeline import sentiment_engine
+from crisis_pipeline.sentiment_engine import SCORE_COLUMNS, SCORE_KEYS, score_sentiment
+
+TEXTS = [
+    "I feel great today, thank you all",
+    "everything is terrible and I hate it",
+    "the bus comes at nine",
+    "",
+    None,
+    "not bad at all :)",
+    "I feel great today, thank you all",
+    "NOT GOOD. not good at all!!!",
+] * 5 + [f"post number {i} feels {'awful' if i % 2 else 'lovely'}" for i in range(40)]
+
+
+def reference(texts):
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    analyzer = SentimentIntensityAnalyzer()
+    rows = []
+    for text in texts:
+        scores = analyzer.polarity_scores("" if text is None else text)
+        compound = scores["compound"]
+        label = "Positive" if compound >= 0.05 else "Negative" if compound <= -0.05 else "Neutral"
+        rows.append([scores[key] for key in SCORE_KEYS] + [label])
+    return pd.DataFrame(rows, columns=SCORE_COLUMNS + ["Sentiment"])
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_matches_per_post_vader(n_workers):
+    result = score_sentiment(TEXTS, n_workers=n_workers, chunksize=10)
+    expected = reference(TEXTS)
+    assert result["Sentiment"].tolist() == expected["Sentiment"].tolist()
+    for column in SCORE_COLUMNS:
+        assert result[column].dtype == np.float32
+        np.testing.assert_array_equal(result[column].to_numpy(), expected[column].to_numpy(dtype=np.float32))
+
+
+def test_keeps_the_input_index():
+    texts = pd.Series(["good", "bad"], index=[10, 20])
+    assert score_sentiment(texts).index.tolist() == [10, 20]
+
+
+def test_duplicate_texts_are_scored_once(monkeypatch):
+    analyzer = sentiment_engine.get_analyzer()
+    scored = []
+
+    class CountingAnalyzer:
+        def polarity_scores(self, text):
+            scored.append(text)
+            return analyzer.polarity_scores(text)
+
+    monkeypatch.setattr(sentiment_engine, "_analyzer", CountingAnalyzer())
+    score_sentiment(TEXTS, n_workers=1)
+    assert len(scored) == len(set(scored)) == len({"" if text is None else text for text in TEXTS})
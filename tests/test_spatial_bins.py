@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from crisis_pipeline.spatial_bins import aggregate_cells, geohash_cells, heat_points, merge_cells, time_slice_points
+
+POSTS = pd.DataFrame({
+    "Latitude": [51.5, 51.52, 40.7, 10.0, None],
+    "Longitude": [-0.1, -0.12, -74.0, 5.0, 3.0],
+    "Timestamp": pd.to_datetime(["2024-01-01 10:00", "2024-01-02 09:00", "2024-01-01 12:00", None, "2024-01-01 08:00"]),
+    "Risk_Level": ["High-Risk", "Low Concern", None, "High-Risk", "High-Risk"],
+})
+
+
+def test_geohash_cells_match_known_hashes():
+    cells, _, _ = geohash_cells(pd.Series([57.64911]).to_numpy(), pd.Series([10.40744]).to_numpy(), 6)
+    assert cells.tolist() == ["u4pruy"]
+
+
+def test_cells_sum_risk_weights():
+    cells = aggregate_cells(POSTS, resolution=1.0)
+    assert cells["Posts"].sum() == 4  # the post without coordinates is left out
+    london = cells[cells["Cell"] == "141_179"].iloc[0]
+    assert (london["Posts"], london["Weight"], london["High-Risk"], london["Low Concern"]) == (2, 4.0, 1, 1)
+
+
+def test_undated_posts_stay_in_time_sliced_cells():
+    cells = aggregate_cells(POSTS, resolution=1.0, time_slice="day")
+    assert cells["Posts"].sum() == 4
+    assert cells.loc[cells["Period"].isna(), "Posts"].sum() == 1
+    merged = merge_cells([cells, cells])
+    assert merged["Posts"].sum() == 8
+    assert merged.loc[merged["Period"].isna(), "Posts"].sum() == 2
+
+
+def test_time_slice_points_are_scaled_per_period():
+    cells = aggregate_cells(POSTS, resolution=1.0, time_slice="day")
+    labels, frames = time_slice_points(cells)
+    assert labels == ["2024-01-01", "2024-01-02"]
+    assert [len(frame) for frame in frames] == [2, 1]
+    weights = [point[2] for frame in frames for point in frame]
+    assert max(weights) == 1.0
+    assert sorted(weights) == pytest.approx([1 / 3, 1 / 3, 1.0])
+    assert cells["Weight"].max() == 3.0  # the cell table itself is not modified
+
+
+def test_heat_points_include_undated_cells():
+    points = heat_points(aggregate_cells(POSTS, resolution=1.0, time_slice="day"))
+    assert len(points) == 3
+    assert max(weight for _, _, weight in points) == 1.0
@@ -0,0 +1,85 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from crisis_pipeline.storage import csv_path, dataset_columns, extend_dataset, read_dataset, write_dataset
+
+FRAME = pd.DataFrame({
+    "PostID": ["1e5", "abc", "0123"],
+    "Timestamp": ["2025-04-08 08:28:07", "2025-04-08 07:45:05", "2025-04-07 23:01:00"],
+    "Subreddit": ["depression", "anxiety", "depression"],
+    "Content": ["first post", "", None],
+    "Sentiment": ["Negative", "Neutral", "Negative"],
+    "Sentiment_Compound": [-0.5, 0.0, -0.25],
+    "Sentiment_Neg": [0.5, 0.0, 0.25],
+    "Risk_Level": ["High-Risk", "Low Concern", "Low Concern"],
+    "Risk_Matches": ["want to die@0-11", "", ""],
+    "Latitude": ["51.5", None, "40.7"],
+    "Longitude": [-0.12, None, -74.0],
+    "Coordinates": ["(51.5, -0.12)", None, "(40.7, -74.0)"],
+})
+
+
+def test_parquet_schema(tmp_path):
+    path = str(tmp_path / "posts.parquet")
+    write_dataset(FRAME, path)
+    schema = pq.read_schema(path)
+    for column in ["Subreddit", "Sentiment", "Risk_Level"]:
+        assert pa.types.is_dictionary(schema.field(column).type)
+    assert pa.types.is_timestamp(schema.field("Timestamp").type)
+    assert schema.field("Sentiment_Compound").type == pa.float32()
+    assert schema.field("Sentiment_Neg").type == pa.float32()
+    assert schema.field("Latitude").type == pa.float64()
+    assert schema.field("Longitude").type == pa.float64()
+    assert pa.types.is_string(schema.field("PostID").type) or pa.types.is_large_string(schema.field("PostID").type)
+    assert "Coordinates" not in schema.names
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "posts.parquet")
+    write_dataset(FRAME, path)
+    df = read_dataset(path)
+    assert df["PostID"].tolist() == ["1e5", "abc", "0123"]
+    assert isinstance(df["Subreddit"].dtype, pd.CategoricalDtype)
+    assert df["Timestamp"].iloc[0] == pd.Timestamp("2025-04-08 08:28:07")
+    assert str(df["Sentiment_Compound"].dtype) == "float32"
+    assert df["Latitude"].iloc[0] == 51.5 and pd.isna(df["Latitude"].iloc[1])
+    assert df["Risk_Matches"].tolist() == ["want to die@0-11", "", ""]
+    assert pd.isna(df["Content"].iloc[2])
+
+
+def test_column_projection(tmp_path):
+    path = str(tmp_path / "posts.parquet")
+    write_dataset(FRAME, path)
+    df = read_dataset(path, columns=["PostID", "Risk_Level"])
+    assert df.columns.tolist() == ["PostID", "Risk_Level"]
+    assert dataset_columns(path) == [c for c in FRAME.columns if c != "Coordinates"]
+
+
+def test_export_csv(tmp_path):
+    path = str(tmp_path / "posts.parquet")
+    write_dataset(FRAME, path, export_csv=True)
+    assert os.path.exists(csv_path(path))
+    exported = pd.read_csv(csv_path(path), dtype={"PostID": str})
+    assert exported["PostID"].tolist() == ["1e5", "abc", "0123"]
+    assert len(exported) == 3
+
+
+def test_csv_fallback_is_typed(tmp_path):
+    path = str(tmp_path / "posts.parquet")
+    FRAME.to_csv(csv_path(path), index=False)
+    df = read_dataset(path, columns=["PostID", "Timestamp", "Sentiment_Compound"])
+    assert df["PostID"].tolist() == ["1e5", "abc", "0123"]
+    assert pd.api.types.is_datetime64_any_dtype(df["Timestamp"])
+    assert str(df["Sentiment_Compound"].dtype) == "float32"
+
+
+def test_extend_dataset_appends_columns(tmp_path):
+    source, output = str(tmp_path / "cleaned.parquet"), str(tmp_path / "analyzed.parquet")
+    write_dataset(FRAME[["PostID", "Content"]], source)
+    extend_dataset(source, output, FRAME[["Risk_Level", "Sentiment_Compound"]], export_csv=True)
+    assert dataset_columns(output) == ["PostID", "Content", "Risk_Level", "Sentiment_Compound"]
+    assert pa.types.is_dictionary(pq.read_schema(output).field("Risk_Level").type)
+    assert len(pd.read_csv(csv_path(output))) == 3
@@ -0,0 +1,66 @@
+import hashlib
+import os
+
+import pandas as pd
+import pytest
+
+from crisis_pipeline import task3_geolocation_mapping as task3
+from crisis_pipeline.geocode_cache import GeoPoint, GeocodeCache
+from crisis_pipeline.paths import data_path
+from crisis_pipeline.stream_pipeline import run_stream
+
+SAMPLE_PATH = data_path("reddit_mental_health_cleaned.csv")
+
+
+class HashGeocoder:
+    """Places every query at a fixed point derived from its text; a third of them are not found."""
+
+    def geocode(self, query, timeout=None):
+        digest = hashlib.sha1(query.lower().encode("utf-8")).digest()
+        if digest[0] % 3 == 0:
+            return None
+        return GeoPoint(digest[1] / 255 * 120 - 60, digest[2] / 255 * 300 - 150)
+
+
+@pytest.fixture
+def offline_geolocation(tmp_path, monkeypatch):
+    spacy = pytest.importorskip("spacy")
+    nlp = spacy.blank("en")
+    nlp.add_pipe("entity_ruler").add_patterns([{"label": "GPE", "pattern": "Canada"}])
+    cache = GeocodeCache(HashGeocoder(), path=str(tmp_path / "cache.sqlite"), min_delay=0)
+    monkeypatch.setattr(task3, "get_nlp", lambda: nlp)
+    monkeypatch.setattr(task3, "get_gazetteer", lambda: None)
+    monkeypatch.setattr(task3, "get_geocode_cache", lambda: cache)
+
+
+def stream_into(directory, chunk_size):
+    os.makedirs(directory)
+    paths = {name: os.path.join(directory, name) for name in ["out.parquet", "cells.parquet", "heatmap.html"]}
+    aggregates = run_stream(SAMPLE_PATH, paths["out.parquet"], chunk_size, heatmap_path=paths["heatmap.html"],
+                            cells_path=paths["cells.parquet"], time_slice="day")
+    return aggregates, paths
+
+
+def sorted_cells(path):
+    cells = pd.read_parquet(path)
+    return cells.sort_values(["Period", "Cell"], na_position="first").reset_index(drop=True)
+
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PATH), reason="bundled dataset not found")
+def test_chunked_run_matches_single_chunk(tmp_path, offline_geolocation):
+    whole, whole_paths = stream_into(str(tmp_path / "whole"), 100000)
+    chunked, chunked_paths = stream_into(str(tmp_path / "chunked"), 64)
+
+    assert chunked.rows == whole.rows == len(pd.read_csv(SAMPLE_PATH))
+    pd.testing.assert_frame_equal(chunked.sentiment_risk_table(), whole.sentiment_risk_table())
+    assert chunked.locations == whole.locations
+    assert sum(whole.locations.values()) > 0
+
+    pd.testing.assert_frame_equal(sorted_cells(chunked_paths["cells.parquet"]), sorted_cells(whole_paths["cells.parquet"]),
+                                  check_like=True)
+    output, expected = pd.read_parquet(chunked_paths["out.parquet"]), pd.read_parquet(whole_paths["out.parquet"])
+    assert len(output) == len(expected) == chunked.rows
+    pd.testing.assert_frame_equal(output.astype(str), expected.astype(str))
+
+    # The time-sliced heatmap follows --heatmap instead of the batch default
+    assert os.path.exists(os.path.join(str(tmp_path / "chunked"), "heatmap_time.html"))
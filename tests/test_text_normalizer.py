@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+from crisis_pipeline.task1_extraction import preprocess_text
+from crisis_pipeline.text_normalizer import PARITY_DATA_PATH, check_parity, normalize_text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Check https://example.com and @someone #help", "check help"),
+    ("I cannot sleep 😢 again!!", "sleep"),
+    ("gonna wanna lemme", "gon na wan na lem"),
+    ("Feeling 3️⃣ times worse 👍🏽 today", "feeling keycap_ times worse today"),
+    ("Don't  stop. Ever.", "dont stop ever"),
+    # demojize's ":name:" pairs with an earlier colon in preprocess_text's pattern
+    ("feeling:sad😀", "feelinggrinning_face"),
+    ("x:y😢z", "xcrying_facez"),
+    ("time: 10:30 😢 ok:", "time ok"),
+    (None, ""),
+])
+def test_normalize_text_matches_preprocess_text(text, expected):
+    assert normalize_text(text) == expected
+    assert preprocess_text(text) == expected
+
+
+@pytest.mark.skipif(not os.path.exists(PARITY_DATA_PATH), reason="bundled dataset not found")
+def test_parity_on_bundled_dataset():
+    assert check_parity(PARITY_DATA_PATH, show=3) == 0